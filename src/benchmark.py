@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+from configuration_manager.config_manager import ConfigManager
+from benchmarks.benchmark_runner import BenchmarkRunner, compare_with_baseline, load_results, save_results
+
+def print_summary(results):
+    for name, scale in results['scales'].items():
+        print(f"{name}: {scale['categories']} categories, {scale['transactions']} transactions, "
+              f"accuracy {scale['accuracy']}, F1 {scale['f1_score']}")
+        for stage, timing in scale['stages'].items():
+            rate = f"{timing['items_per_second']:.0f}/s" if timing['items_per_second'] else '-'
+            peak = f"{timing['peak_rss_mb']:.0f} MB" if timing['peak_rss_mb'] is not None else '-'
+            print(f"  {stage:<24}{timing['seconds']:>10.3f}s {rate:>14} {peak:>10}")
+
+def print_comparison(rows, threshold):
+    for row in rows:
+        changes = ', '.join(
+            f"{metric} {row[metric]['baseline']:.3f} -> {row[metric]['current']:.3f} ({row[metric]['change']:+.1%})"
+            for metric in ('seconds', 'peak_rss_mb') if metric in row
+        )
+        print(f"{'REGRESSION' if row['regression'] else 'ok':<11}{row['scale']}/{row['stage']}: {changes}")
+    regressions = sum(row['regression'] for row in rows)
+    print(f"{regressions} regression(s) beyond {threshold:.0%} across {len(rows)} compared stages")
+    return regressions
+
+def main():
+    benchmark_config = ConfigManager().benchmark_config
+    parser = argparse.ArgumentParser(description='Benchmark the evaluation pipeline offline on synthetic data')
+    parser.add_argument('--scales', nargs='*', help='Scales to run (defaults to benchmarks.default_scales)')
+    parser.add_argument('--list', action='store_true', help='List the configured scales and exit')
+    parser.add_argument('--output', help='Results file (defaults to <benchmarks.output_dir>/results.json)')
+    parser.add_argument('--baseline', default=benchmark_config.get('baseline_file', 'benchmarks/baseline.json'),
+                        help='Baseline results to compare against')
+    parser.add_argument('--threshold', type=float, default=benchmark_config.get('regression_threshold', 0.2),
+                        help='Relative slowdown or memory growth counted as a regression')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the new baseline')
+    args = parser.parse_args()
+
+    runner = BenchmarkRunner()
+    if args.list:
+        for scale in runner.scales.values():
+            print(f"{scale['name']}: {scale['categories']} categories, {scale['transactions']} transactions")
+        return
+
+    results = runner.run(args.scales)
+    print_summary(results)
+    print(f"Results written to {save_results(results, args.output or os.path.join(runner.output_dir, 'results.json'))}")
+
+    if args.save_baseline:
+        print(f"Baseline written to {save_results(results, args.baseline)}")
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return
+    rows = compare_with_baseline(
+        results, load_results(args.baseline), args.threshold, benchmark_config.get('min_regression_seconds', 0.05)
+    )
+    if print_comparison(rows, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
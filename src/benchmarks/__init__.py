@@ -0,0 +1,4 @@
+from .hashing_encoder import HashingEncoder
+from .synthetic_data import generate_categories, generate_transactions, write_dataset
+
+__all__ = ['HashingEncoder', 'generate_categories', 'generate_transactions', 'write_dataset']
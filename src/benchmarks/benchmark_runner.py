@@ -0,0 +1,249 @@
+import copy
+import json
+import os
+import platform
+import sys
+import time
+from contextlib import contextmanager
+import numpy as np
+from logger_service.logger import LoggerService
+from configuration_manager.config_manager import ConfigManager
+from embedding_manager.model_pool import PeakRSSMonitor
+from benchmarks.hashing_encoder import HashingEncoder
+from benchmarks.synthetic_data import write_dataset
+
+STUB_MODEL_NAME = 'benchmark/hashing-encoder'
+# Stages in run order; a scale's "skip" list may drop generate_all_plots and generate_report
+STAGES = [
+    'generate_data',
+    'encode_keywords',
+    'load_transactions',
+    'encode_queries',
+    'calculate_similarities',
+    'evaluate_all_metrics',
+    'generate_all_plots',
+    'generate_report',
+]
+TIME_METRIC = 'seconds'
+MEMORY_METRIC = 'peak_rss_mb'
+
+
+class StageTimer:
+    """Wall time, throughput and peak RSS for each named stage"""
+
+    def __init__(self, sample_interval_ms=20):
+        self.sample_interval_ms = sample_interval_ms
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name, items=None):
+        monitor = PeakRSSMonitor(self.sample_interval_ms)
+        start = time.perf_counter()
+        with monitor:
+            yield
+        seconds = time.perf_counter() - start
+        self.stages[name] = {
+            'seconds': seconds,
+            'items': items,
+            'items_per_second': items / seconds if items and seconds > 0 else None,
+            'peak_rss_mb': monitor.peak_mb,
+            'rss_growth_mb': (
+                monitor.peak_mb - monitor.start_mb
+                if monitor.peak_mb is not None and monitor.start_mb is not None else None
+            )
+        }
+
+
+@contextmanager
+def config_overrides(config, overrides):
+    """Temporarily merge ``{section: {key: value}}`` into the shared config, restoring it afterwards"""
+    saved = {section: copy.deepcopy(config.config_data.get(section)) for section in overrides}
+
+    def merge(target, values):
+        for key, value in values.items():
+            if isinstance(value, dict) and isinstance(target.get(key), dict):
+                merge(target[key], value)
+            else:
+                target[key] = value
+
+    try:
+        for section, values in overrides.items():
+            merge(config.config_data.setdefault(section, {}), values)
+        yield config
+    finally:
+        for section, value in saved.items():
+            if value is None:
+                config.config_data.pop(section, None)
+            else:
+                config.config_data[section] = value
+
+
+class BenchmarkRunner:
+    """Runs the evaluation pipeline on synthetic data with the hashing encoder.
+
+    Everything runs in-process and offline: the encoder replaces
+    SentenceTransformer through EmbeddingManager, the embedding cache and
+    keyword index persistence are switched off, and all files go under
+    ``output_dir``.
+    """
+
+    def __init__(self, output_dir=None):
+        self.logger = LoggerService()
+        self.config = ConfigManager()
+        self.benchmark_config = self.config.benchmark_config
+        self.output_dir = output_dir or self.benchmark_config.get('output_dir', 'output/benchmarks')
+        self.encoder_dim = self.benchmark_config.get('encoder_dim', 128)
+        self.seed = self.benchmark_config.get('seed', 0)
+        self.scales = {scale['name']: scale for scale in self.benchmark_config.get('scales', [])}
+
+    def _dataset(self, scale, timer):
+        """Generate the scale's files, reusing them when an identical dataset is already on disk"""
+        data_dir = os.path.join(self.output_dir, 'data', scale['name'])
+        spec = {
+            'categories': scale['categories'],
+            'transactions': scale['transactions'],
+            'keywords_per_category': scale.get('keywords_per_category', 10),
+            'seed': self.seed
+        }
+        spec_file = os.path.join(data_dir, 'dataset.json')
+        categories_file = os.path.join(data_dir, 'categories.json')
+        transactions_file = os.path.join(data_dir, 'testtxns.json')
+        try:
+            with open(spec_file, 'r') as f:
+                if json.load(f) == spec and os.path.exists(transactions_file):
+                    return categories_file, transactions_file
+        except (OSError, ValueError):
+            pass
+
+        with timer.stage('generate_data', items=scale['transactions']):
+            write_dataset(data_dir, spec['categories'], spec['transactions'], spec['keywords_per_category'], self.seed)
+        with open(spec_file, 'w') as f:
+            json.dump(spec, f)
+        return categories_file, transactions_file
+
+    @LoggerService.log_function(level='info')
+    def run_scale(self, name):
+        # Imported here so that listing scales does not load the pipeline
+        from embedding_manager.embedding_manager import EmbeddingManager
+        from results_validator.results_validator import ResultsValidator
+        from plot_generator.plot_generator import PlotGenerator
+        from plot_generator.model_comparison_plotter import ModelComparisonPlotter
+        from output_generator.output_generator import OutputGenerator
+
+        scale = self.scales[name]
+        skip = set(scale.get('skip', []))
+        timer = StageTimer(self.benchmark_config.get('rss_sample_interval_ms', 20))
+        categories_file, transactions_file = self._dataset(scale, timer)
+        with open(categories_file, 'r') as f:
+            categories = json.load(f)
+        n_keywords = sum(len(keywords) for keywords in categories.values())
+
+        scale_dir = os.path.join(self.output_dir, 'runs', name)
+        overrides = {
+            'test_data': {
+                'transactions_file': transactions_file,
+                'categories_file': categories_file,
+                'streaming': False
+            },
+            'embedding_settings': {'cache': {'enabled': False}},
+            'scoring': {'index': {'persist': False}},
+            'output': {
+                'output_file': os.path.join(scale_dir, 'index.html'),
+                'image_storage': os.path.join(scale_dir, 'images')
+            }
+        }
+        with config_overrides(self.config, overrides):
+            mgr = EmbeddingManager(STUB_MODEL_NAME, model=HashingEncoder(self.encoder_dim, self.seed))
+            with timer.stage('encode_keywords', items=n_keywords):
+                mgr.create_categorical_embeddings(categories)
+            with timer.stage('load_transactions', items=scale['transactions']):
+                validator = ResultsValidator(model_manager=mgr)
+            with timer.stage('encode_queries', items=scale['transactions']):
+                validator.generate_query_vectors()
+            with timer.stage('calculate_similarities', items=scale['transactions']):
+                raw_results = validator.calculate_similarities()
+            with timer.stage('evaluate_all_metrics', items=scale['transactions']):
+                final_results = validator.evaluate_all_metrics(raw_results)
+
+            model_results = {name: {'raw_results': raw_results, 'final_results': final_results}}
+            if 'generate_all_plots' not in skip:
+                with timer.stage('generate_all_plots', items=scale['transactions']):
+                    model_results[name]['plots'] = PlotGenerator(name).generate_all_plots(raw_results, final_results)
+            if 'generate_report' not in skip and 'plots' in model_results[name]:
+                with timer.stage('generate_report', items=scale['transactions']):
+                    comparison_plots = ModelComparisonPlotter(
+                        self.config.output_config['image_storage']
+                    ).generate_all_comparison_plots(model_results)
+                    OutputGenerator().generate_report(model_results, comparison_plots)
+            mgr.close()
+
+        self.logger.info(f"Benchmark scale '{name}' finished")
+        return {
+            'categories': scale['categories'],
+            'keywords': n_keywords,
+            'transactions': scale['transactions'],
+            'accuracy': final_results['basic_metrics']['accuracy'],
+            'f1_score': final_results['detailed_metrics']['f1_score'],
+            'stages': {stage: timer.stages[stage] for stage in STAGES if stage in timer.stages}
+        }
+
+    def run(self, scale_names=None):
+        scale_names = scale_names or self.benchmark_config.get('default_scales') or list(self.scales)
+        unknown = [name for name in scale_names if name not in self.scales]
+        if unknown:
+            raise ValueError(f"Unknown benchmark scales {unknown}; configured: {list(self.scales)}")
+        results = {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'environment': {
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count()
+            },
+            'encoder_dim': self.encoder_dim,
+            'scales': {name: self.run_scale(name) for name in scale_names}
+        }
+        # The hashing encoder must keep the whole run free of torch
+        results['environment']['torch_loaded'] = 'torch' in sys.modules
+        return results
+
+
+def save_results(results, file_path):
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    os.replace(temp_path, file_path)
+    return file_path
+
+
+def load_results(file_path):
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+
+def compare_with_baseline(results, baseline, threshold=0.2, min_seconds=0.05):
+    """One row per stage present in both runs; ``regression`` marks time or peak RSS growth beyond ``threshold``.
+
+    Time changes smaller than ``min_seconds`` are never regressions, so
+    millisecond stages do not flap on timer noise.
+    """
+    rows = []
+    for name, scale in results['scales'].items():
+        baseline_stages = baseline.get('scales', {}).get(name, {}).get('stages', {})
+        for stage, current in scale['stages'].items():
+            previous = baseline_stages.get(stage)
+            if not previous:
+                continue
+            row = {'scale': name, 'stage': stage, 'regression': False}
+            for metric in (TIME_METRIC, MEMORY_METRIC):
+                before, after = previous.get(metric), current.get(metric)
+                if not before or after is None:
+                    continue
+                change = after / before - 1
+                row[metric] = {'baseline': before, 'current': after, 'change': change}
+                noise_floor = min_seconds if metric == TIME_METRIC else 0
+                if change > threshold and after - before > noise_floor:
+                    row['regression'] = True
+            rows.append(row)
+    return rows
@@ -0,0 +1,58 @@
+import zlib
+import numpy as np
+
+
+class HashingEncoder:
+    """Deterministic, offline stand-in for SentenceTransformer.
+
+    Each word and character trigram is hashed (crc32) to a signed bucket of
+    a ``dim``-wide vector, so texts sharing words or spellings get similar
+    unit-length embeddings. No model download, no torch, same vectors on
+    every machine.
+    """
+
+    def __init__(self, dim=128, seed=0, max_cached_tokens=200000):
+        self.dim = int(dim)
+        self.seed = int(seed)
+        self.max_cached_tokens = max_cached_tokens
+        self._token_features = {}
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def _features(self, token):
+        features = self._token_features.get(token)
+        if features is None:
+            grams = [token] + [token[i:i + 3] for i in range(max(0, len(token) - 2))]
+            hashes = np.array([zlib.crc32(gram.encode('utf-8'), self.seed) for gram in grams], dtype=np.uint32)
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0).astype(np.float32)
+            # Whole-word matches weigh as much as all of the word's trigrams together
+            signs[0] *= max(1, len(grams) - 1)
+            features = ((hashes % self.dim).astype(np.int64), signs)
+            if len(self._token_features) >= self.max_cached_tokens:
+                # Reference numbers are unique per transaction; do not let them pile up
+                self._token_features.clear()
+            self._token_features[token] = features
+        return features
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, **kwargs):
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+        rows, cols, weights = [], [], []
+        for row, text in enumerate(texts):
+            for token in text.lower().split():
+                token_cols, token_signs = self._features(token)
+                rows.append(np.full(len(token_cols), row, dtype=np.int64))
+                cols.append(token_cols)
+                weights.append(token_signs)
+
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if rows:
+            flat = np.concatenate(rows) * self.dim + np.concatenate(cols)
+            vectors += np.bincount(
+                flat, weights=np.concatenate(weights), minlength=vectors.size
+            ).reshape(vectors.shape).astype(np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+        return vectors[0] if single else vectors
@@ -0,0 +1,91 @@
+import json
+import os
+import numpy as np
+
+SYLLABLES = [
+    'ka', 'ro', 'mi', 'tan', 'vel', 'sha', 'pur', 'den', 'lo', 'zi', 'mar', 'ne',
+    'bri', 'gol', 'tu', 'yas', 'fen', 'dor', 'chi', 'lek', 'sam', 'vo', 'ra', 'kin'
+]
+# Merchant noise seen in real bank narrations, shared by every category
+NOISE_WORDS = ['upi', 'pos', 'txn', 'payment', 'online', 'ltd', 'pvt', 'store', 'india', 'neft', 'imps', 'ref']
+
+
+def _words(rng, count, syllables_per_word=(2, 4)):
+    """``count`` distinct pronounceable pseudo-words"""
+    words = set()
+    while len(words) < count:
+        n = rng.integers(syllables_per_word[0], syllables_per_word[1] + 1)
+        words.add(''.join(rng.choice(SYLLABLES, size=n)))
+    return sorted(words)
+
+
+def generate_categories(n_categories, keywords_per_category=10, seed=0):
+    """A ``{category: [keyword, ...]}`` taxonomy of 1-3 word keywords.
+
+    Every category draws its keywords from a vocabulary of its own, so the
+    taxonomy is separable but not trivially so once noise is added.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = _words(rng, n_categories * 6)
+    rng.shuffle(vocabulary)
+    categories = {}
+    for index in range(n_categories):
+        own_words = vocabulary[index * 6:(index + 1) * 6]
+        keywords = set()
+        # Six words allow 156 distinct keywords; stop trying well before that
+        for _ in range(keywords_per_category * 20):
+            if len(keywords) >= keywords_per_category:
+                break
+            n_words = rng.integers(1, 4)
+            keywords.add(' '.join(rng.choice(own_words, size=n_words, replace=False)))
+        categories[f'Category {index:04d}'] = sorted(keywords)
+    return categories
+
+
+def generate_transactions(categories, n_transactions, seed=0, noise_words=2, label_noise=0.05):
+    """Yield unique ``(text, label)`` pairs built from the taxonomy's keywords.
+
+    Each text is a keyword of its category (sometimes truncated), a few
+    shared noise words and a unique reference number. A ``label_noise``
+    share of texts uses a keyword from another category, so no scoring
+    strategy reaches 100% accuracy.
+    """
+    rng = np.random.default_rng(seed + 1)
+    names = list(categories)
+    keywords = [categories[name] for name in names]
+    labels = rng.integers(0, len(names), size=n_transactions)
+    sources = np.where(rng.random(n_transactions) < label_noise, rng.integers(0, len(names), size=n_transactions), labels)
+    keyword_draws = rng.random(n_transactions)
+    noise = rng.integers(0, len(NOISE_WORDS), size=(n_transactions, max(0, noise_words)))
+    truncate = rng.random(n_transactions) < 0.2
+    for i in range(n_transactions):
+        source_keywords = keywords[sources[i]]
+        keyword = source_keywords[int(keyword_draws[i] * len(source_keywords))]
+        if truncate[i]:
+            # Narrations often cut merchant names short
+            keyword = keyword[:max(4, len(keyword) * 2 // 3)]
+        words = [NOISE_WORDS[j] for j in noise[i]]
+        yield f"{' '.join(words[:1])} {keyword} {' '.join(words[1:])} {i:07d}".strip(), names[labels[i]]
+
+
+def write_dataset(directory, n_categories, n_transactions, keywords_per_category=10, seed=0):
+    """Write ``categories.json`` and ``testtxns.json`` (the repo's formats) and return their paths.
+
+    Transactions are streamed to disk, so a million-row file never sits in
+    memory as one dict.
+    """
+    os.makedirs(directory, exist_ok=True)
+    categories = generate_categories(n_categories, keywords_per_category, seed)
+    categories_file = os.path.join(directory, 'categories.json')
+    with open(categories_file, 'w') as f:
+        json.dump(categories, f, indent=2)
+
+    transactions_file = os.path.join(directory, 'testtxns.json')
+    temp_path = transactions_file + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write('{\n')
+        for i, (text, label) in enumerate(generate_transactions(categories, n_transactions, seed)):
+            f.write(f"{',' if i else ''}  {json.dumps(text)}: {json.dumps(label)}\n")
+        f.write('}\n')
+    os.replace(temp_path, transactions_file)
+    return categories_file, transactions_file
@@ -0,0 +1,229 @@
+import time
+
+_STARTED = time.perf_counter()
+
+import argparse
+import json
+import sys
+from logger_service.logger import LoggerService
+from configuration_manager.config_manager import ConfigManager
+
+# Heavy modules each subcommand should only load when it really needs them
+HEAVY_MODULES = ('torch', 'sentence_transformers', 'sklearn', 'matplotlib', 'pandas', 'huggingface_hub')
+
+# Every subcommand imports what it needs inside its handler, so e.g. `report`
+# never imports torch and `classify` never imports matplotlib or pandas.
+
+
+def _load_categories():
+    with open(ConfigManager().test_data_config['categories_file'], 'r') as f:
+        return json.load(f)
+
+
+def _evaluated_models(model_names):
+    from pipeline.artifacts import models_with_artifacts
+
+    models = models_with_artifacts(model_names or ConfigManager().transformer_models)
+    if not models:
+        raise SystemExit("No evaluation artifacts found; run the evaluate step first")
+    return models
+
+
+def cmd_validate(args):
+    from model_validator.model_validator import ModelValidator
+
+    validator = ModelValidator(offline=True if args.offline else None)
+    models = validator.validate_models(args.models or ConfigManager().transformer_models)
+    print('\n'.join(models))
+
+
+def cmd_encode(args):
+    from embedding_manager.embedding_manager import EmbeddingManager
+
+    mgr = EmbeddingManager(args.model or ConfigManager().default_model)
+    mgr.create_categorical_embeddings(_load_categories())
+    print(mgr.dump_to_store(args.output, args.dtype))
+
+
+def cmd_classify(args):
+    from service.classification_service import ClassificationService
+
+    texts = list(args.texts)
+    if args.file:
+        with open(args.file, 'r', encoding='utf-8') as f:
+            texts.extend(line.rstrip('\n') for line in f if line.strip())
+    if not texts:
+        raise SystemExit("Nothing to classify: pass texts or --file")
+
+    service = ClassificationService(args.model)
+    if args.top_k:
+        service.top_k = args.top_k
+    service.load(args.embeddings)
+    try:
+        for text, result in zip(texts, service.classify_batch(texts)):
+            print(json.dumps(dict(result, text=text)))
+    finally:
+        service.executor.shutdown(wait=False)
+
+
+def cmd_evaluate(args):
+    from logger_service.tracer import Tracer
+    from pipeline.artifacts import save_model_artifact
+    from pipeline.incremental import evaluation_fingerprint
+    from pipeline.model_stages import evaluate_model
+
+    model_names = args.models or ConfigManager().transformer_models
+    if args.validate:
+        from model_validator.model_validator import ModelValidator
+        model_names = ModelValidator().validate_models(model_names)
+
+    categories_data = _load_categories()
+    for model_name in model_names:
+        evaluation = evaluate_model(model_name, categories_data)
+        # Stamped so that a later full run can reuse this artifact
+        evaluation['fingerprints'] = {'evaluation': evaluation_fingerprint(model_name)}
+        evaluation['spans'] = Tracer().drain() if Tracer.enabled else []
+        print(save_model_artifact(model_name, evaluation))
+
+
+def cmd_plot(args):
+    from logger_service.tracer import Tracer
+    from pipeline.artifacts import load_model_artifact, save_model_artifact
+    from pipeline.incremental import plot_fingerprint
+    from pipeline.model_stages import plot_model
+
+    for model_name in _evaluated_models(args.models):
+        evaluation = load_model_artifact(model_name)
+        spans = evaluation.pop('spans', [])
+        plotted = plot_model(model_name, evaluation)
+        fingerprints = plotted.get('fingerprints') or {}
+        if 'evaluation' in fingerprints:
+            plotted['fingerprints'] = dict(fingerprints, plots=plot_fingerprint(fingerprints['evaluation']))
+        plotted['spans'] = spans + (Tracer().drain() if Tracer.enabled else [])
+        print(save_model_artifact(model_name, plotted))
+
+
+def cmd_report(args):
+    from logger_service.tracer import Tracer
+    from pipeline.artifacts import load_model_artifact
+    from pipeline.model_stages import build_report
+
+    model_names = _evaluated_models(args.models)
+    model_results = []
+    for model_name in model_names:
+        result = load_model_artifact(model_name)
+        if 'plots' not in result:
+            raise SystemExit(f"'{model_name}' has no plots yet; run the plot step first")
+        Tracer().extend(result.pop('spans', []))
+        model_results.append(result)
+    # Read-only: the run was recorded when these models were evaluated
+    print(build_report(model_names, *model_results, record_run=False))
+
+
+def _warehouse():
+    from results_warehouse.results_warehouse import configured_warehouse
+
+    warehouse = configured_warehouse()
+    if warehouse is None:
+        raise SystemExit("The results warehouse is disabled (warehouse.enabled)")
+    return warehouse
+
+
+def cmd_runs(args):
+    for row in _warehouse().metrics_history(args.models, args.runs, args.limit):
+        print(json.dumps(row))
+
+
+def cmd_compare(args):
+    from pipeline.model_stages import render_model_plots, render_report
+
+    warehouse = _warehouse()
+    selections = warehouse.resolve_selections(args.runs or ['latest'])
+    # Models from different runs are told apart by their run id
+    several_runs = len({run_id for run_id, _ in selections}) > 1
+    model_results, performance = {}, {}
+    for (run_id, _), results in warehouse.load_model_results(selections).items():
+        name = f"{results['model_name']}@{run_id}" if several_runs else results['model_name']
+        if results.get('performance'):
+            performance[name] = results['performance']
+        model_results[name] = render_model_plots(name, results)
+    print(render_report(model_results, performance or None))
+
+
+def cmd_run(args):
+    from main import main
+
+    main()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Embedding evaluation toolkit')
+    parser.add_argument('--timings', action='store_true', help='Print startup and command time to stderr')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    validate = commands.add_parser('validate', help='Check that models exist on the Hugging Face Hub')
+    validate.add_argument('models', nargs='*', help='Models to check (defaults to models.transformer_models)')
+    validate.add_argument('--offline', action='store_true', help='Accept only local directories and cached snapshots')
+    validate.set_defaults(handler=cmd_validate)
+
+    encode = commands.add_parser('encode', help='Encode the category keywords into an embedding store')
+    encode.add_argument('--model', help='Model to use (defaults to models.default_model)')
+    encode.add_argument('--output', help='Store path (defaults to <embeddings_output_dir>/<model>.npy)')
+    encode.add_argument('--dtype', choices=['float32', 'float16', 'int8'], help='Storage type (defaults to embedding_settings.store_dtype)')
+    encode.set_defaults(handler=cmd_encode)
+
+    classify = commands.add_parser('classify', help='Classify texts and print one JSON result per line')
+    classify.add_argument('texts', nargs='*', help='Texts to classify')
+    classify.add_argument('--file', help='File with one text per line')
+    classify.add_argument('--model', help='Model to use (defaults to models.default_model)')
+    classify.add_argument('--embeddings', help='Embedding store or JSON dump from the encode step, instead of encoding the categories file')
+    classify.add_argument('--top-k', type=int, help='Ranked categories per result (defaults to service.top_k)')
+    classify.set_defaults(handler=cmd_classify)
+
+    evaluate = commands.add_parser('evaluate', help='Score the test transactions and save one artifact per model')
+    evaluate.add_argument('models', nargs='*', help='Models to evaluate (defaults to models.transformer_models)')
+    evaluate.add_argument('--validate', action='store_true', help='Check the models on the Hub first')
+    evaluate.set_defaults(handler=cmd_evaluate)
+
+    plot = commands.add_parser('plot', help='Render per-model plots from evaluation artifacts')
+    plot.add_argument('models', nargs='*', help='Models to plot (defaults to every evaluated model)')
+    plot.set_defaults(handler=cmd_plot)
+
+    report = commands.add_parser('report', help='Render comparison plots and the HTML report from plotted artifacts')
+    report.add_argument('models', nargs='*', help='Models to include (defaults to every evaluated model)')
+    report.set_defaults(handler=cmd_report)
+
+    runs = commands.add_parser('runs', help='Print stored per-model metrics from the results warehouse, newest first')
+    runs.add_argument('models', nargs='*', help='Only these model ids')
+    runs.add_argument('--runs', nargs='+', help='Only these run ids')
+    runs.add_argument('--limit', type=int, help='At most this many rows')
+    runs.set_defaults(handler=cmd_runs)
+
+    compare = commands.add_parser('compare', help='Build the report from stored runs without loading any model')
+    compare.add_argument('runs', nargs='*', help='RUN_ID, RUN_ID:MODEL_ID or latest (defaults to latest)')
+    compare.set_defaults(handler=cmd_compare)
+
+    run = commands.add_parser('run', help='Run the whole pipeline, as src/main.py does')
+    run.set_defaults(handler=cmd_run)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logger = LoggerService()
+    ready = time.perf_counter()
+    args.handler(args)
+    finished = time.perf_counter()
+
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    message = (
+        f"Command '{args.command}' finished in {finished - _STARTED:.2f}s "
+        f"(startup {ready - _STARTED:.2f}s); heavy modules loaded: {', '.join(loaded) or 'none'}"
+    )
+    logger.info(message)
+    if args.timings:
+        print(message, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -46,6 +46,10 @@ class ConfigManager:
     def default_model(self) -> str:
         return self.config_data['models']['default_model']
     
+    @property
+    def model_validation_config(self) -> Dict[str, Any]:
+        return self.config_data['models'].get('validation', {})
+    
     @property
     def embeddings_output_dir(self) -> str:
         return self.config_data['embedding_settings']['embeddings_output_dir']
@@ -54,6 +58,18 @@ class ConfigManager:
     def default_embedding_file(self) -> str:
         return self.config_data['embedding_settings']['default_embedding_file']
     
+    @property
+    def embedding_batch_size(self) -> int:
+        return self.config_data['embedding_settings'].get('batch_size', 64)
+    
+    @property
+    def embedding_store_dtype(self) -> str:
+        return self.config_data['embedding_settings'].get('store_dtype', 'float32')
+    
+    @property
+    def embedding_cache_config(self) -> Dict[str, Any]:
+        return self.config_data['embedding_settings'].get('cache', {})
+    
     @property
     def logging_config(self) -> Dict[str, Any]:
         return self.config_data['logging']
@@ -65,4 +81,31 @@ class ConfigManager:
     @property
     def output_config(self) -> Dict[str, Any]:
         return self.config_data['output']
+    
+    @property
+    def profiling_config(self) -> Dict[str, Any]:
+        return self.config_data.get('profiling', {})
+    
+    @property
+    def pipeline_config(self) -> Dict[str, Any]:
+        return self.config_data.get('pipeline', {})
+    
+    @property
+    def model_pool_config(self) -> Dict[str, Any]:
+        return self.pipeline_config.get('model_pool', {})
+    
+    @property
+    def scoring_config(self) -> Dict[str, Any]:
+        return self.config_data.get('scoring', {})
+    
+    @property
+    def benchmark_config(self) -> Dict[str, Any]:
+        return self.config_data.get('benchmarks', {})
+    
+    @property
+    def service_config(self) -> Dict[str, Any]:
+        return self.config_data.get('service', {})
 
+    @property
+    def warehouse_config(self) -> Dict[str, Any]:
+        return self.config_data.get('warehouse', {})
@@ -0,0 +1,20 @@
+import argparse
+import os
+from embedding_manager.embedding_store import EmbeddingStore
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert a JSON embeddings dump into a binary embedding store')
+    parser.add_argument('json_path', help='File written by EmbeddingManager.dump_to_json')
+    parser.add_argument('--output', help='Target .npy path (defaults to the JSON path with a .npy suffix)')
+    parser.add_argument('--categories', help='categories.json used to recover keyword texts for the index')
+    parser.add_argument('--dtype', choices=['float32', 'float16', 'int8'], default='float32',
+                        help='Storage type; int8 uses symmetric per-row quantization')
+    args = parser.parse_args()
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    matrix_path = EmbeddingStore.convert_json(args.json_path, args.output, args.categories, dtype=args.dtype)
+    print(f"Embedding store written to {matrix_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,10 @@
-from .embedding_manager import EmbeddingManager
-
 __all__ = ['EmbeddingManager']
+
+
+def __getattr__(name):
+    # Imported on first use so that importing the package (e.g. for
+    # embedding_store) does not pull in sentence_transformers
+    if name == 'EmbeddingManager':
+        from .embedding_manager import EmbeddingManager
+        return EmbeddingManager
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
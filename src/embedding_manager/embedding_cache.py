@@ -0,0 +1,184 @@
+import hashlib
+import os
+import sqlite3
+import time
+import numpy as np
+from logger_service.logger import LoggerService
+
+UNKNOWN_REVISION = 'unknown'
+# Bumped when the meaning of a key changes; older entries are dropped on open
+SCHEMA_VERSION = 2
+
+
+def text_hash(text):
+    """Hash of exactly the string the encoder sees, so a key never covers two different inputs"""
+    return hashlib.sha256(text.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def resolve_model_revision(model_name):
+    """Best-effort revision id for a model without touching the network.
+
+    Hub models resolve to the commit hash recorded in the local Hugging Face
+    cache, local model directories to their modification time.
+    """
+    if os.path.isdir(model_name):
+        return f"local-{int(os.path.getmtime(model_name))}"
+    try:
+        from huggingface_hub.constants import HF_HUB_CACHE
+    except ImportError:
+        return UNKNOWN_REVISION
+    ref_file = os.path.join(HF_HUB_CACHE, f"models--{model_name.replace('/', '--')}", 'refs', 'main')
+    try:
+        with open(ref_file, 'r') as f:
+            return f.read().strip() or UNKNOWN_REVISION
+    except OSError:
+        return UNKNOWN_REVISION
+
+
+class EmbeddingCache:
+    """On-disk embedding cache keyed by (model id, model revision, text hash).
+
+    Backed by SQLite in WAL mode so several evaluation processes can share a
+    single cache file. Entries are evicted least-recently-used first once the
+    stored vectors exceed ``max_size_mb``. The stored size is kept as a
+    running total in ``cache_meta`` by triggers, so a put never sums the table.
+    """
+
+    _QUERY_CHUNK = 500
+
+    def __init__(self, cache_dir, max_size_mb=512):
+        self.logger = LoggerService()
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self.db_path = os.path.join(cache_dir, 'embeddings.sqlite')
+        self._initialize_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA busy_timeout = 30000')
+        # Rows dropped by INSERT OR REPLACE only fire the delete trigger with recursive triggers on
+        conn.execute('PRAGMA recursive_triggers = ON')
+        return conn
+
+    def _initialize_db(self):
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS embeddings ('
+                ' model_id TEXT NOT NULL,'
+                ' revision TEXT NOT NULL,'
+                ' text_hash TEXT NOT NULL,'
+                ' dtype TEXT NOT NULL,'
+                ' vector BLOB NOT NULL,'
+                ' nbytes INTEGER NOT NULL,'
+                ' last_access REAL NOT NULL,'
+                ' PRIMARY KEY (model_id, revision, text_hash))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access)')
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            conn.execute(
+                'CREATE TRIGGER IF NOT EXISTS embeddings_size_insert AFTER INSERT ON embeddings BEGIN'
+                " UPDATE cache_meta SET value = value + NEW.nbytes WHERE key = 'total_bytes'; END"
+            )
+            conn.execute(
+                'CREATE TRIGGER IF NOT EXISTS embeddings_size_delete AFTER DELETE ON embeddings BEGIN'
+                " UPDATE cache_meta SET value = value - OLD.nbytes WHERE key = 'total_bytes'; END"
+            )
+            # Caches written before the running total existed are summed once
+            conn.execute(
+                "INSERT OR IGNORE INTO cache_meta SELECT 'total_bytes', COALESCE(SUM(nbytes), 0) FROM embeddings"
+            )
+            if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                # Version 1 hashed NFC-normalized, stripped text, which could differ from the encoded input
+                conn.execute('DELETE FROM embeddings')
+                conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def get_many(self, model_id, revision, hashes):
+        """Return {text_hash: vector} for every hash present in the cache"""
+        found = {}
+        unique_hashes = list(dict.fromkeys(hashes))
+        conn = self._connect()
+        try:
+            for start in range(0, len(unique_hashes), self._QUERY_CHUNK):
+                chunk = unique_hashes[start:start + self._QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f'SELECT text_hash, dtype, vector FROM embeddings '
+                    f'WHERE model_id = ? AND revision = ? AND text_hash IN ({placeholders})',
+                    [model_id, revision, *chunk]
+                ).fetchall()
+                for hash_key, dtype, blob in rows:
+                    found[hash_key] = np.frombuffer(blob, dtype=dtype)
+
+            if found:
+                now = time.time()
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany(
+                    'UPDATE embeddings SET last_access = ? WHERE model_id = ? AND revision = ? AND text_hash = ?',
+                    [(now, model_id, revision, hash_key) for hash_key in found]
+                )
+                conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+        self.hits += len(found)
+        self.misses += len(unique_hashes) - len(found)
+        return found
+
+    def put_many(self, model_id, revision, hashes, vectors):
+        """Store vectors for the given hashes, then enforce the size cap"""
+        now = time.time()
+        rows = []
+        for hash_key, vector in zip(hashes, vectors):
+            vector = np.ascontiguousarray(vector)
+            rows.append((model_id, revision, hash_key, vector.dtype.str, vector.tobytes(), vector.nbytes, now))
+        if not rows:
+            return
+
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+            self._evict(conn)
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def _evict(self, conn):
+        """Drop least-recently-used entries until the cache fits in max_bytes"""
+        total = self._total_bytes(conn)
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        evicted = 0
+        freed = 0
+        cursor = conn.execute('SELECT rowid, nbytes FROM embeddings ORDER BY last_access ASC')
+        victims = []
+        for rowid, nbytes in cursor:
+            if freed >= excess:
+                break
+            victims.append((rowid,))
+            freed += nbytes
+            evicted += 1
+        conn.executemany('DELETE FROM embeddings WHERE rowid = ?', victims)
+        self.logger.info(f"Embedding cache evicted {evicted} entries ({freed} bytes) to stay under {self.max_bytes} bytes")
+
+    @staticmethod
+    def _total_bytes(conn):
+        return conn.execute("SELECT value FROM cache_meta WHERE key = 'total_bytes'").fetchone()[0]
+
+    def log_stats(self):
+        total = self.hits + self.misses
+        hit_rate = self.hits / total if total else 0.0
+        self.logger.info(f"Embedding cache hits={self.hits} misses={self.misses} hit_rate={hit_rate:.2%}")
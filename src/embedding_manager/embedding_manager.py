@@ -1,33 +1,172 @@
 import json
-from sentence_transformers import SentenceTransformer
+import os
+import time
+import numpy as np
 from logger_service.logger import LoggerService
+from logger_service.tracer import Tracer
+from configuration_manager.config_manager import ConfigManager
+from embedding_manager.embedding_cache import UNKNOWN_REVISION, EmbeddingCache, resolve_model_revision, text_hash
+from embedding_manager.embedding_store import EmbeddingStore, is_store_path
+from embedding_manager.model_pool import ModelPool
 
 class EmbeddingManager:
-    def __init__(self,transformer_name):
+    def __init__(self,transformer_name, model=None):
         self.embeddings = {}
+        self.category_keywords = {}
+        self.category_centroids = {}
         self.logger = LoggerService()
+        self.config = ConfigManager()
         self.transformer_name= transformer_name
-        self.model = SentenceTransformer(self.transformer_name)
+        self.batch_size = self.config.embedding_batch_size
+        # Any object with SentenceTransformer's encode(texts, batch_size=..., ...)
+        # can stand in for the model, e.g. the benchmarks' hashing encoder
+        self._pooled = model is None
+        with Tracer().span('model_load'):
+            # The pool loads each distinct model once per process
+            self.model = ModelPool().acquire(self.transformer_name) if self._pooled else model
+        self.cache = None
+        cache_config = self.config.embedding_cache_config
+        if cache_config.get('enabled', False):
+            self.model_revision = resolve_model_revision(self.transformer_name)
+            if self.model_revision == UNKNOWN_REVISION:
+                # Entries from different checkouts of the model would be indistinguishable
+                self.logger.warning(f"Embedding cache disabled for {self.transformer_name}: its revision is unknown")
+            else:
+                self.cache = EmbeddingCache(
+                    cache_config.get('cache_dir', 'embeddings/cache'),
+                    max_size_mb=cache_config.get('max_size_mb', 512)
+                )
     
+    def close(self):
+        """Hand the model back to the pool, which unloads it unless it is kept loaded"""
+        if self.model is not None:
+            self.model = None
+            if self._pooled:
+                ModelPool().release(self.transformer_name)
+
     @LoggerService.log_function(level='info')
     def load_from_json(self, file_path):
         with open(file_path, 'r') as f:
             data = json.load(f)
         self.embeddings.update(data)
 
+    @LoggerService.log_function(level='info')
+    def load_from_store(self, file_path):
+        store = EmbeddingStore.load(file_path)
+        self.embeddings.update(store.category_embeddings())
+        self.category_keywords.update(store.category_keywords())
+        return store
+
+    def load_embeddings(self, file_path=None):
+        """Load a JSON dump or binary store; defaults to the configured default_embedding_file"""
+        if file_path is None:
+            file_path = os.path.join(self.config.embeddings_output_dir, self.config.default_embedding_file)
+        if is_store_path(file_path):
+            return self.load_from_store(file_path)
+        return self.load_from_json(file_path)
+
+    @LoggerService.log_function(level='info')
+    def encode_texts(self, texts):
+        """Encode texts, serving repeats from the embedding cache when enabled"""
+        texts = list(texts)
+        Tracer().annotate(items=len(texts))
+        if self.cache is None or not texts:
+            return self._encode_batches(texts)
+
+        hashes = [text_hash(text) for text in texts]
+        cached = self.cache.get_many(self.transformer_name, self.model_revision, hashes)
+
+        # Encode each missing text once, even if it appears several times
+        missing = {}
+        for text, hash_key in zip(texts, hashes):
+            if hash_key not in cached and hash_key not in missing:
+                missing[hash_key] = text
+        if missing:
+            new_vectors = self._encode_batches(list(missing.values()))
+            self.cache.put_many(self.transformer_name, self.model_revision, list(missing.keys()), new_vectors)
+            cached.update(zip(missing.keys(), new_vectors))
+
+        self.logger.info(
+            f"Embedding cache served {len(texts) - len(missing)} of {len(texts)} texts "
+            f"for {self.transformer_name}@{self.model_revision}"
+        )
+        self.cache.log_stats()
+        return np.stack([cached[hash_key] for hash_key in hashes])
+
+    def _encode_batches(self, texts):
+        """Encode texts in length-sorted batches and return rows in input order"""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        # Sorting by length keeps similarly sized texts together, which
+        # minimises padding inside each batch the encoder builds.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = None
+        start_time = time.perf_counter()
+        for start in range(0, len(order), self.batch_size):
+            batch_idx = order[start:start + self.batch_size]
+            batch_vectors = np.asarray(self.model.encode(
+                [texts[i] for i in batch_idx],
+                batch_size=self.batch_size,
+                show_progress_bar=False
+            ))
+            if vectors is None:
+                vectors = np.empty((len(texts), batch_vectors.shape[1]), dtype=batch_vectors.dtype)
+            vectors[batch_idx] = batch_vectors
+
+        elapsed = time.perf_counter() - start_time
+        rate = len(texts) / elapsed if elapsed > 0 else float('inf')
+        self.logger.info(
+            f"Encoded {len(texts)} texts in {elapsed:.3f}s "
+            f"({rate:.1f} texts/sec, batch_size={self.batch_size})"
+        )
+        return vectors
+
     @LoggerService.log_function(level='info')
     def create_categorical_embeddings(self, categories):
-        category_vectors = {
-            category: [self.model.encode(keyword) for keyword in keywords]
-            for category, keywords in categories.items()
-        }
-        self.embeddings.update(category_vectors)
+        keywords = [keyword for category_keywords in categories.values() for keyword in category_keywords]
+        vectors = self.encode_texts(keywords)
+
+        category_vectors = {}
+        offset = 0
+        for category, category_keywords in categories.items():
+            category_vectors[category] = list(vectors[offset:offset + len(category_keywords)])
+            offset += len(category_keywords)
+        # Replaced, not merged: categories dropped from categories.json must stop being scored
+        self.embeddings = category_vectors
+        self.category_keywords = {category: list(keywords) for category, keywords in categories.items()}
+        self.compute_centroids()
         return category_vectors
 
+    def compute_centroids(self):
+        """One unit-length mean direction per category, over its normalised keyword vectors"""
+        centroids = {}
+        for category, vectors in self.embeddings.items():
+            if len(vectors) == 0:
+                continue
+            vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            centroid = (vectors / np.where(norms == 0, 1, norms)).mean(axis=0)
+            norm = np.linalg.norm(centroid)
+            centroids[category] = centroid / norm if norm > 0 else centroid
+        self.category_centroids = centroids
+        return centroids
+
     @LoggerService.log_function()
     def dump_to_json(self, file_path=f'embeddings/default.json'):
-        trs_name=self.transformer_name.split('/')[1]
+        trs_name=os.path.basename(os.path.normpath(self.transformer_name))
         file_path=f'embeddings/{trs_name}.json'
         with open(file_path, "w") as f:
             json.dump({k: [v.tolist() for v in v_list] for k, v_list in self.embeddings.items()}, f)
 
+    @LoggerService.log_function()
+    def dump_to_store(self, file_path=None, dtype=None):
+        trs_name=os.path.basename(os.path.normpath(self.transformer_name))
+        file_path = file_path or os.path.join(self.config.embeddings_output_dir, f'{trs_name}.npy')
+        return EmbeddingStore.save(
+            file_path,
+            self.embeddings,
+            self.category_keywords,
+            dtype=dtype or self.config.embedding_store_dtype,
+            metadata={'model': self.transformer_name}
+        )
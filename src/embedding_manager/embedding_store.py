@@ -0,0 +1,200 @@
+import json
+import os
+import numpy as np
+from logger_service.logger import LoggerService
+
+STORE_FORMAT = 'embedding-store'
+STORE_VERSION = 2
+# Version 1 indexes map each keyword to a single row
+READABLE_VERSIONS = (1, STORE_VERSION)
+MATRIX_SUFFIX = '.npy'
+INDEX_SUFFIX = '.index.json'
+SCALES_SUFFIX = '.scales.npy'
+INT8_SCALE = 127
+
+
+def quantize_int8(vectors):
+    """Symmetric per-row int8 quantization: vectors ~= codes * scales[:, None]"""
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(vectors).max(axis=1) / INT8_SCALE
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -INT8_SCALE, INT8_SCALE).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def dequantize_int8(codes, scales):
+    return codes.astype(np.float32) * np.asarray(scales, dtype=np.float32)[:, None]
+
+
+def is_store_path(file_path):
+    return file_path.endswith(MATRIX_SUFFIX) or file_path.endswith(INDEX_SUFFIX)
+
+
+def _scales_path(matrix_path):
+    return matrix_path[:-len(MATRIX_SUFFIX)] + SCALES_SUFFIX
+
+
+def _store_paths(file_path):
+    """Map either half of a store (or its bare stem) to (matrix_path, index_path)"""
+    if file_path.endswith(INDEX_SUFFIX):
+        stem = file_path[:-len(INDEX_SUFFIX)]
+    elif file_path.endswith(MATRIX_SUFFIX):
+        stem = file_path[:-len(MATRIX_SUFFIX)]
+    else:
+        stem = file_path
+    return stem + MATRIX_SUFFIX, stem + INDEX_SUFFIX
+
+
+class EmbeddingStore:
+    """Binary embedding store: one row-major matrix plus a small JSON index.
+
+    The matrix is a standard ``.npy`` file opened with ``mmap_mode='r'``, so
+    opening a store costs a header read and its pages are shared by every
+    process that maps it. The ``.index.json`` sidecar maps each category to
+    its ``[start, stop)`` row range and each keyword text to its rows, one
+    per category that lists it.
+
+    Stores may be float32, float16 or int8. int8 stores keep one float32
+    scale per row in a ``.scales.npy`` file and are dequantized per category
+    on access.
+    """
+
+    def __init__(self, matrix, categories, keywords, metadata=None, scales=None):
+        self.matrix = matrix
+        self.categories = categories
+        self.keywords = keywords
+        self.metadata = metadata or {}
+        self.scales = scales
+
+    @classmethod
+    def save(cls, file_path, category_embeddings, category_keywords=None, dtype=np.float32, metadata=None):
+        """Write category embeddings (and optionally their keyword texts) as a store"""
+        logger = LoggerService()
+        matrix_path, index_path = _store_paths(file_path)
+        quantized = np.dtype(dtype) == np.int8
+
+        categories = {}
+        keywords = {}
+        blocks = []
+        row = 0
+        for category, embeddings in category_embeddings.items():
+            # A category may hold a single flat vector (as in older JSON dumps)
+            block = np.atleast_2d(np.asarray(embeddings, dtype=np.float32 if quantized else dtype))
+            blocks.append(block)
+            categories[category] = [row, row + len(block)]
+            if category_keywords is not None:
+                for offset, keyword in enumerate(category_keywords.get(category, [])):
+                    keywords.setdefault(keyword, []).append(row + offset)
+            row += len(block)
+
+        if not blocks:
+            raise ValueError("No embeddings to save")
+        dim = blocks[0].shape[1]
+        os.makedirs(os.path.dirname(matrix_path) or '.', exist_ok=True)
+        matrix = np.lib.format.open_memmap(matrix_path, mode='w+', dtype=dtype, shape=(row, dim))
+        scales = np.ones(row, dtype=np.float32) if quantized else None
+        for category, block in zip(categories, blocks):
+            start, stop = categories[category]
+            if quantized:
+                matrix[start:stop], scales[start:stop] = quantize_int8(block)
+            else:
+                matrix[start:stop] = block
+        matrix.flush()
+        del matrix
+        if quantized:
+            np.save(_scales_path(matrix_path), scales)
+
+        index = {
+            'format': STORE_FORMAT,
+            'version': STORE_VERSION,
+            'dtype': np.dtype(dtype).name,
+            'rows': row,
+            'dim': dim,
+            'metadata': metadata or {},
+            'categories': categories,
+            'keywords': keywords
+        }
+        with open(index_path, 'w') as f:
+            json.dump(index, f)
+
+        logger.info(f"Saved embedding store with {row} rows (dim={dim}, dtype={np.dtype(dtype).name}) to {matrix_path}")
+        return matrix_path
+
+    @classmethod
+    def load(cls, file_path):
+        """Open a store read-only; the matrix is memory-mapped, not read"""
+        matrix_path, index_path = _store_paths(file_path)
+        with open(index_path, 'r') as f:
+            index = json.load(f)
+        if index.get('format') != STORE_FORMAT:
+            raise ValueError(f"{index_path} is not an embedding store index")
+        if index.get('version') not in READABLE_VERSIONS:
+            raise ValueError(f"Unsupported embedding store version {index.get('version')} in {index_path}")
+        keywords = index['keywords']
+        if index['version'] == 1:
+            keywords = {keyword: [row] for keyword, row in keywords.items()}
+
+        matrix = np.load(matrix_path, mmap_mode='r')
+        if matrix.shape != (index['rows'], index['dim']):
+            raise ValueError(f"Embedding store {matrix_path} does not match its index {index_path}")
+        scales = np.load(_scales_path(matrix_path), mmap_mode='r') if matrix.dtype == np.int8 else None
+        return cls(matrix, index['categories'], keywords, index.get('metadata'), scales)
+
+    def category_embeddings(self):
+        """Return {category: matrix view} in the same shape EmbeddingManager.embeddings uses"""
+        if self.scales is not None:
+            return {
+                category: dequantize_int8(self.matrix[start:stop], self.scales[start:stop])
+                for category, (start, stop) in self.categories.items()
+            }
+        return {
+            category: self.matrix[start:stop]
+            for category, (start, stop) in self.categories.items()
+        }
+
+    def category_keywords(self):
+        """Recover {category: [keyword, ...]} from the keyword index, where known"""
+        by_row = {row: keyword for keyword, rows in self.keywords.items() for row in rows}
+        return {
+            category: [by_row.get(row) for row in range(start, stop)]
+            for category, (start, stop) in self.categories.items()
+        }
+
+    def vector_for_keyword(self, keyword, category=None):
+        """Vector of ``keyword``; with ``category``, the row listed under that category"""
+        rows = self.keywords.get(keyword, [])
+        if category is not None:
+            start, stop = self.categories.get(category, (0, 0))
+            rows = [row for row in rows if start <= row < stop]
+        if not rows:
+            return None
+        row = rows[0]
+        if self.scales is not None:
+            return dequantize_int8(self.matrix[row:row + 1], self.scales[row:row + 1])[0]
+        return self.matrix[row]
+
+    @classmethod
+    def convert_json(cls, json_path, output_path=None, categories_file=None, dtype=np.float32):
+        """One-shot conversion of a dump_to_json file into a binary store.
+
+        JSON dumps only hold vectors, so keyword texts are recovered from
+        ``categories_file`` when given; its keyword lists must line up with
+        the dumped vectors.
+        """
+        logger = LoggerService()
+        with open(json_path, 'r') as f:
+            category_embeddings = json.load(f)
+
+        category_keywords = None
+        if categories_file:
+            with open(categories_file, 'r') as f:
+                category_keywords = json.load(f)
+            for category, embeddings in category_embeddings.items():
+                if len(category_keywords.get(category, [])) != len(np.atleast_2d(embeddings)):
+                    logger.warning(f"Keyword list for '{category}' does not match the dumped vectors; skipping keyword index")
+                    category_keywords = None
+                    break
+
+        output_path = output_path or os.path.splitext(json_path)[0] + MATRIX_SUFFIX
+        return cls.save(output_path, category_embeddings, category_keywords, dtype=dtype,
+                        metadata={'converted_from': os.path.basename(json_path)})
@@ -0,0 +1,191 @@
+import ctypes
+import gc
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from logger_service.logger import LoggerService
+from configuration_manager.config_manager import ConfigManager
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB, or None where it cannot be read"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def release_memory():
+    """Collect garbage and hand freed heap and torch allocator memory back to the OS"""
+    gc.collect()
+    torch = sys.modules.get('torch')
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    # glibc keeps freed arenas (including those of torch's worker threads)
+    # mapped until asked to trim them
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class PeakRSSMonitor:
+    """Samples RSS on a background thread while the ``with`` block runs"""
+
+    def __init__(self, interval_ms=20):
+        self.interval = max(1, interval_ms) / 1000
+        self.start_mb = None
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        rss = current_rss_mb()
+        if rss is not None:
+            self.peak_mb = max(self.peak_mb or 0.0, rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self.start_mb = current_rss_mb()
+        self._sample()
+        self._thread = threading.Thread(target=self._run, name='rss-monitor', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+        return False
+
+
+class ModelPool:
+    """Per-process pool that loads each distinct model once.
+
+    Models are handed out with ``acquire`` and returned with ``release``.
+    Idle models stay resident (when ``keep_loaded`` is set) and are unloaded
+    least recently used first whenever loading another model would push the
+    process RSS over ``rss_budget_mb``. The footprint of a model not loaded
+    before is estimated from the largest model measured so far.
+    """
+
+    _instance = None
+
+    def __new__(cls):
+        # One pool per process; stage workers build their own
+        if cls._instance is None or cls._instance._pid != os.getpid():
+            cls._instance = super(ModelPool, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        pool_config = ConfigManager().model_pool_config
+        self._pid = os.getpid()
+        self.logger = LoggerService()
+        self.rss_budget_mb = pool_config.get('rss_budget_mb')
+        self.keep_loaded = pool_config.get('keep_loaded', False)
+        self.models = OrderedDict()
+        self.in_use = {}
+        self.footprints_mb = {}
+        self.loads = {}
+        self._lock = threading.RLock()
+
+    def acquire(self, model_name):
+        """Return the loaded model, loading it (and evicting idle models) if needed"""
+        with self._lock:
+            if model_name in self.models:
+                self.models.move_to_end(model_name)
+                self.logger.info(f"Reusing loaded model {model_name}")
+            else:
+                self._make_room(model_name)
+                self.models[model_name] = self._load(model_name)
+            self.in_use[model_name] = self.in_use.get(model_name, 0) + 1
+            return self.models[model_name]
+
+    def release(self, model_name):
+        """Hand a model back; it is unloaded unless ``keep_loaded`` is set"""
+        with self._lock:
+            count = self.in_use.get(model_name, 0) - 1
+            if count > 0:
+                self.in_use[model_name] = count
+                return
+            self.in_use.pop(model_name, None)
+            if not self.keep_loaded:
+                self.unload(model_name)
+
+    def unload(self, model_name):
+        with self._lock:
+            if self.in_use.get(model_name):
+                raise RuntimeError(f"Model {model_name} is still in use")
+            if self.models.pop(model_name, None) is None:
+                return
+            before = current_rss_mb()
+            release_memory()
+            after = current_rss_mb()
+            freed = f" ({before - after:.0f} MB returned)" if before is not None and after is not None else ''
+            self.logger.info(f"Unloaded model {model_name}{freed}")
+
+    def clear(self):
+        for model_name in list(self.models):
+            if not self.in_use.get(model_name):
+                self.unload(model_name)
+
+    def _load(self, model_name):
+        # Deferred so that importing this module does not import torch
+        from sentence_transformers import SentenceTransformer
+
+        before = current_rss_mb()
+        start = time.perf_counter()
+        model = SentenceTransformer(model_name)
+        after = current_rss_mb()
+        if before is not None and after is not None:
+            self.footprints_mb[model_name] = max(0.0, after - before)
+        self.loads[model_name] = self.loads.get(model_name, 0) + 1
+        self.logger.info(
+            f"Loaded model {model_name} in {time.perf_counter() - start:.2f}s"
+            + (f" (+{self.footprints_mb[model_name]:.0f} MB RSS)" if model_name in self.footprints_mb else '')
+        )
+        return model
+
+    def _estimated_footprint_mb(self, model_name):
+        if model_name in self.footprints_mb:
+            return self.footprints_mb[model_name]
+        return max(self.footprints_mb.values(), default=0.0)
+
+    def _make_room(self, model_name):
+        if not self.rss_budget_mb:
+            return
+        needed = self._estimated_footprint_mb(model_name)
+        for idle_model in [name for name in self.models if not self.in_use.get(name)]:
+            rss = current_rss_mb()
+            if rss is None or rss + needed <= self.rss_budget_mb:
+                return
+            self.logger.info(
+                f"Evicting {idle_model}: {rss:.0f} MB RSS + ~{needed:.0f} MB for {model_name} "
+                f"exceeds the {self.rss_budget_mb} MB budget"
+            )
+            self.unload(idle_model)
+        rss = current_rss_mb()
+        if rss is not None and rss + needed > self.rss_budget_mb:
+            self.logger.warning(
+                f"Loading {model_name} may exceed the {self.rss_budget_mb} MB RSS budget "
+                f"({rss:.0f} MB resident, ~{needed:.0f} MB needed, nothing left to evict)"
+            )
+
+    def stats(self, model_name):
+        return {
+            'loads': self.loads.get(model_name, 0),
+            'model_rss_mb': self.footprints_mb.get(model_name)
+        }
@@ -1,92 +1,177 @@
+import atexit
 import logging
+import multiprocessing
 import os
-import inspect
-from logging.handlers import RotatingFileHandler
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from multiprocessing import util as mp_util
+from contextlib import nullcontext
 from functools import wraps
 from typing import Callable
 from configuration_manager.config_manager import ConfigManager
+from logger_service.tracer import Tracer
+
+_NO_SPAN = nullcontext()
+
+def _module_logger_name(module_name: str, file_path: str) -> str:
+    if module_name == '__main__' and file_path:
+        return os.path.splitext(os.path.basename(file_path))[0]
+    return module_name or 'unknown'
 
 class LoggerService:
     _instance = None
     _handler = None
-    
+    _queue_handler = None
+    _listener = None
+    _worker_queue = None
+    _worker_listener = None
+    _pid = None
+    _logger_names = {}
+
     def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(LoggerService, cls).__new__(cls)
+        # A forked child inherits the instance but not the listener thread,
+        # so logging is re-initialised once per process. Pool workers are
+        # set up by init_worker instead and never open the log file.
+        if cls._instance is None or cls._pid != os.getpid():
+            if cls._instance is None:
+                cls._instance = super(LoggerService, cls).__new__(cls)
             cls._instance._initialize_logger()
         return cls._instance
-    
+
     def _initialize_logger(self):
         # Configure root logger
         root_logger = logging.getLogger()
         config = ConfigManager()
         log_config = config.logging_config
-        
+
         root_logger.setLevel(getattr(logging, log_config['log_level']))
-        
-        # Create and configure handler if not exists
-        if not LoggerService._handler:
-            LoggerService._handler = RotatingFileHandler(
-                log_config['log_file'],
-                maxBytes=log_config['max_bytes'],
-                backupCount=log_config['backup_count']
-            )
-            
-            formatter = logging.Formatter(
-                '%(asctime)s - %(levelname)s - %(name)s - %(funcName)s - %(message)s'
-            )
-            LoggerService._handler.setFormatter(formatter)
-            root_logger.addHandler(LoggerService._handler)
-    
-    def _get_logger(self, caller_frame):
-        # Get module name from caller
-        module = inspect.getmodule(caller_frame)
-        module_name = module.__name__ if module else 'unknown'
-        if module_name == '__main__':
-            module_name = os.path.splitext(os.path.basename(caller_frame.f_code.co_filename))[0]
-        
-        # Get or create logger for module
-        logger = logging.getLogger(module_name)
-        return logger
-    
+
+        # Drop handlers inherited from a parent process; their queue has no reader here
+        if LoggerService._queue_handler is not None:
+            root_logger.removeHandler(LoggerService._queue_handler)
+
+        # File writes happen on the listener thread so callers never block on I/O
+        LoggerService._handler = RotatingFileHandler(
+            log_config['log_file'],
+            maxBytes=log_config['max_bytes'],
+            backupCount=log_config['backup_count']
+        )
+
+        formatter = logging.Formatter(
+            '%(asctime)s - %(levelname)s - %(name)s - %(funcName)s - %(message)s'
+        )
+        LoggerService._handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        LoggerService._queue_handler = QueueHandler(log_queue)
+        LoggerService._listener = QueueListener(log_queue, LoggerService._handler)
+        LoggerService._listener.start()
+        root_logger.addHandler(LoggerService._queue_handler)
+        LoggerService._pid = os.getpid()
+        # Reads the profiling config, so Tracer.enabled is set before log_function opens the first span
+        Tracer()
+
+        # atexit covers normal interpreter exit, Finalize covers pool workers
+        atexit.register(LoggerService._stop_listener)
+        mp_util.Finalize(None, LoggerService._stop_listener, exitpriority=0)
+
+    @staticmethod
+    def _stop_listener():
+        listener = LoggerService._listener
+        if listener is not None and LoggerService._pid == os.getpid() and listener._thread is not None:
+            worker_listener = LoggerService._worker_listener
+            if worker_listener is not None and worker_listener._thread is not None:
+                worker_listener.stop()
+            listener.stop()
+            LoggerService._handler.close()
+
+    @classmethod
+    def worker_queue(cls):
+        """Queue that pool workers log to; pass it to ``init_worker`` through the pool initializer.
+
+        Only the process that owns the log file drains it, so rollover is
+        never attempted by several processes at once. A worker hands on the
+        queue it was given, so nested pools log to the same owner.
+        """
+        cls()
+        if cls._worker_queue is None:
+            cls._worker_queue = multiprocessing.Queue()
+            cls._worker_listener = QueueListener(cls._worker_queue, cls._handler)
+            cls._worker_listener.start()
+        return cls._worker_queue
+
+    @classmethod
+    def init_worker(cls, log_queue):
+        """Pool initializer: send this process's records to the owner's queue instead of a file"""
+        root_logger = logging.getLogger()
+        # Undo anything set up before the initializer ran (a module-level LoggerService(), say)
+        cls._stop_listener()
+        if cls._queue_handler is not None:
+            root_logger.removeHandler(cls._queue_handler)
+        root_logger.setLevel(getattr(logging, ConfigManager().logging_config['log_level']))
+
+        if cls._instance is None:
+            cls._instance = super(LoggerService, cls).__new__(cls)
+        cls._handler = None
+        cls._listener = None
+        cls._worker_listener = None
+        cls._worker_queue = log_queue
+        cls._queue_handler = QueueHandler(log_queue)
+        root_logger.addHandler(cls._queue_handler)
+        cls._pid = os.getpid()
+        Tracer()
+
+    @classmethod
+    def _get_logger(cls, caller_globals):
+        # Logger names are cached per module, so this is a dict lookup after the first call
+        module_name = caller_globals.get('__name__', 'unknown')
+        logger_name = cls._logger_names.get(module_name)
+        if logger_name is None:
+            logger_name = _module_logger_name(module_name, caller_globals.get('__file__'))
+            cls._logger_names[module_name] = logger_name
+        return logging.getLogger(logger_name)
+
     def _log(self, level: str, message: str):
-        # Find the caller frame
-        stack = inspect.stack()
-        caller = None
-        for frame in stack[1:]:
-            if 'logger_service' not in frame.filename:
-                caller = frame
-                break
-        
-        if caller:
-            logger = self._get_logger(caller.frame)
-            log_method = getattr(logger, level)
-            log_method(message)
-    
+        # Frame 0 is _log, 1 is debug()/info()/..., 2 is the caller
+        logger = self._get_logger(sys._getframe(2).f_globals)
+        levelno = logging.getLevelName(level.upper())
+        if logger.isEnabledFor(levelno):
+            logger.log(levelno, message, stacklevel=3)
+
     def debug(self, message: str): self._log('debug', message)
     def info(self, message: str): self._log('info', message)
     def warning(self, message: str): self._log('warning', message)
     def error(self, message: str): self._log('error', message)
     def critical(self, message: str): self._log('critical', message)
-    
+
     @staticmethod
     def log_function(level: str = 'info') -> Callable:
         def decorator(func: Callable) -> Callable:
+            # Resolve everything that does not change per call at decoration time
+            logger = logging.getLogger(_module_logger_name(
+                func.__module__, getattr(sys.modules.get(func.__module__), '__file__', None)
+            ))
+            levelno = logging.getLevelName(level.upper())
+            enter_message = f"Entering {func.__name__}"
+            exit_message = f"Exiting {func.__name__}"
+
             @wraps(func)
             def wrapper(*args, **kwargs):
-                logger = LoggerService()
-                # Get the module name from the decorated function
-                module_name = inspect.getmodule(func).__name__
-                if module_name == '__main__':
-                    module_name = os.path.splitext(os.path.basename(inspect.getfile(func)))[0]
-                
-                logger._log(level, f"Entering {func.__name__}")
+                LoggerService()
+                enabled = logger.isEnabledFor(levelno)
+                if enabled:
+                    logger.log(levelno, enter_message, stacklevel=2)
+                # Timing spans cost a single class attribute check when profiling is off
+                span = Tracer().span(func.__name__) if Tracer.enabled else _NO_SPAN
                 try:
-                    result = func(*args, **kwargs)
-                    logger._log(level, f"Exiting {func.__name__}")
+                    with span:
+                        result = func(*args, **kwargs)
+                    if enabled:
+                        logger.log(levelno, exit_message, stacklevel=2)
                     return result
                 except Exception as e:
-                    logger._log('error', f"Exception in {func.__name__}: {str(e)}")
+                    logger.error(f"Exception in {func.__name__}: {str(e)}", stacklevel=2)
                     raise
             return wrapper
         return decorator
@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from configuration_manager.config_manager import ConfigManager
+
+# Function/span names that make up the per-model summary, in report order
+SUMMARY_STAGES = {
+    'model_load': 'Model load',
+    'create_categorical_embeddings': 'Keyword encode',
+    'generate_query_vectors': 'Query encode',
+    'calculate_similarities': 'Similarity',
+    'evaluate_all_metrics': 'Metrics',
+    'evaluate_streaming': 'Streaming evaluate',
+    'generate_all_plots': 'Plots',
+    'generate_chart_data': 'Plots',
+    'report_comparisons': 'Comparison plots',
+}
+ENCODE_SPAN = 'encode_texts'
+# Summary row for summary stages not tied to one model (the report stage)
+RUN_SUMMARY_ROW = 'All models'
+
+
+class Tracer:
+    """Collects nested timing spans (and optionally tracemalloc peaks).
+
+    Spans are plain dicts so they can be shipped back from pool workers and
+    merged with ``extend``. When profiling is disabled ``span`` returns a
+    shared no-op context and ``log_function`` skips tracing after a single
+    attribute check.
+    """
+
+    _instance = None
+    enabled = False
+
+    def __new__(cls):
+        if cls._instance is None or cls._instance._pid != os.getpid():
+            cls._instance = super(Tracer, cls).__new__(cls)
+            cls._instance._initialize()
+        return cls._instance
+
+    def _initialize(self):
+        profiling_config = ConfigManager().profiling_config
+        self._pid = os.getpid()
+        self.trace_memory = profiling_config.get('trace_memory', False)
+        self.trace_file = profiling_config.get('trace_file', 'output/trace.json')
+        self.spans = []
+        self.model = None
+        self._local = threading.local()
+        self._null_span = nullcontext()
+        Tracer.enabled = profiling_config.get('enabled', False)
+        if Tracer.enabled and self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def set_model(self, model):
+        """Attribute subsequent spans in this process to ``model``"""
+        self.model = model
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name, items=None):
+        if not Tracer.enabled:
+            return self._null_span
+        return self._record(name, items)
+
+    @contextmanager
+    def _record(self, name, items):
+        stack = self._stack()
+        frame = {'child_peak': 0, 'attrs': {}}
+        if self.trace_memory:
+            # Peaks are global in tracemalloc; keep the outer span's peak so far
+            frame['outer_peak'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+        stack.append(frame)
+        start_wall = time.time_ns()
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            stack.pop()
+            span = {
+                'name': name,
+                'model': self.model,
+                'ts': start_wall // 1000,
+                'dur': duration // 1000,
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'depth': len(stack),
+            }
+            span.update(frame['attrs'])
+            if items is not None:
+                span['items'] = items
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame['child_peak'])
+                span['peak_mb'] = peak / (1024 * 1024)
+                if stack:
+                    stack[-1]['child_peak'] = max(stack[-1]['child_peak'], peak, frame['outer_peak'])
+            self.spans.append(span)
+
+    def annotate(self, **attrs):
+        """Attach attributes (e.g. ``items``) to the innermost open span"""
+        if Tracer.enabled:
+            stack = self._stack()
+            if stack:
+                stack[-1]['attrs'].update(attrs)
+
+    def drain(self):
+        """Return and forget the spans recorded so far (used by pool workers)"""
+        spans, self.spans = self.spans, []
+        return spans
+
+    def extend(self, spans):
+        self.spans.extend(spans)
+
+    def export_chrome_trace(self, file_path=None):
+        """Write spans as Chrome trace / Perfetto JSON"""
+        file_path = file_path or self.trace_file
+        events = []
+        for span in self.spans:
+            args = {key: span[key] for key in ('model', 'items', 'peak_mb') if span.get(key) is not None}
+            events.append({
+                'name': span['name'],
+                'cat': span['model'] or 'run',
+                'ph': 'X',
+                'ts': span['ts'],
+                'dur': span['dur'],
+                'pid': span['pid'],
+                'tid': span['tid'],
+                'args': args
+            })
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        with open(file_path, 'w') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+        return file_path
+
+    def summarize(self):
+        """Per-model rows with stage seconds, encode throughput and peak memory"""
+        summary = {}
+        for span in self.spans:
+            label = SUMMARY_STAGES.get(span['name'])
+            if span['model'] is None and label is None:
+                continue
+            row = summary.setdefault(span['model'] or RUN_SUMMARY_ROW, {
+                'stages': {label: 0.0 for label in SUMMARY_STAGES.values()},
+                'encoded_texts': 0,
+                'encode_seconds': 0.0,
+                'peak_mb': None
+            })
+            seconds = span['dur'] / 1e6
+            if label is not None:
+                row['stages'][label] += seconds
+            if span['name'] == ENCODE_SPAN:
+                row['encoded_texts'] += span.get('items', 0)
+                row['encode_seconds'] += seconds
+            if 'peak_mb' in span:
+                row['peak_mb'] = max(row['peak_mb'] or 0.0, span['peak_mb'])
+
+        for row in summary.values():
+            row['total_seconds'] = sum(row['stages'].values())
+            row['texts_per_second'] = (
+                row['encoded_texts'] / row['encode_seconds'] if row['encode_seconds'] > 0 else None
+            )
+        return summary
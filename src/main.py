@@ -2,65 +2,109 @@ import logging
 import os
 import json
 from logger_service.logger import LoggerService
-from embedding_manager.embedding_manager import EmbeddingManager
+from logger_service.tracer import Tracer
 from model_validator.model_validator import ModelValidator
 from configuration_manager.config_manager import ConfigManager
-from results_validator.results_validator import ResultsValidator
-from plot_generator.plot_generator import PlotGenerator
-from plot_generator.model_comparison_plotter import ModelComparisonPlotter
-from output_generator.output_generator import OutputGenerator
+from pipeline.stage_scheduler import StageScheduler, memory_aware_model_slots
+from pipeline.model_stages import build_report, check_short_names
+from pipeline.incremental import (
+    evaluate_and_save, evaluation_fingerprint, plot_and_save, plot_fingerprint, reusable_artifact, reuse_artifact
+)
 
 @LoggerService.log_function(level='info')
-def main():
+def run_pipeline():
     config = ConfigManager()
+    logger = LoggerService()
     
     # Load test data
     with open(config.test_data_config['categories_file'], 'r') as f:
         categories_data = json.load(f)
     
     validator = ModelValidator()
-    valid_models = validator.validate_models(config.transformer_models)
+    # A model listed twice is evaluated (and loaded) once
+    valid_models = list(dict.fromkeys(validator.validate_models(config.transformer_models)))
+    check_short_names(valid_models)
     
-    # Dictionary to store results for all models
-    all_model_results = {}
+    # Each model is evaluate -> plot; the report waits for every model.
+    # Model slots bound how many models are loaded at the same time.
+    pipeline_config = config.pipeline_config
+    model_slots = memory_aware_model_slots(
+        pipeline_config.get('max_loaded_models', 1),
+        pipeline_config.get('model_memory_mb')
+    )
+    scheduler = StageScheduler(
+        max_workers=pipeline_config.get('max_workers', 1),
+        resource_limits={'model': model_slots}
+    )
     
+    # Models whose stored results still match their fingerprints skip their
+    # stages; the comparison plots and the report are always rebuilt.
+    incremental = pipeline_config.get('incremental', True)
+    plot_stages = []
+    reused_models = set()
     for valid_model in valid_models:
-        mgr = EmbeddingManager(valid_model)
-        mgr.create_categorical_embeddings(categories_data)
-        
-        model_obj = {
-            "mgr": mgr,
-            "results": {}
-        }
-        
-        validator = ResultsValidator(model_manager=mgr)
-        model_obj['results']['raw_results'] = validator.calculate_similarities()
-        model_obj['results']['final_results'] = validator.evaluate_all_metrics(
-            model_obj['results']['raw_results']
-        )
-        
-        model_name_trunc = valid_model.split('/')[1]
-        plot_generator = PlotGenerator(model_name_trunc)
-        model_obj['results']['plots'] = plot_generator.generate_all_plots(
-            model_obj['results']['raw_results'],
-            model_obj['results']['final_results']
-        )
-        
-        # Store results for comparison
-        all_model_results[model_name_trunc] = model_obj['results']
+        evaluation_fp = evaluation_fingerprint(valid_model)
+        plot_fp = plot_fingerprint(evaluation_fp)
+        artifact = reusable_artifact(valid_model, evaluation_fp, plot_fp) if incremental else None
+        if artifact is None:
+            evaluate_stage = scheduler.add_stage(
+                f'evaluate:{valid_model}', evaluate_and_save,
+                args=(valid_model, categories_data, evaluation_fp),
+                resources={'model': 1}
+            )
+        else:
+            reused_models.add(valid_model)
+            evaluate_stage = scheduler.add_stage(
+                f'evaluate:{valid_model}', reuse_artifact,
+                args=(valid_model, artifact),
+                inline=True
+            )
+        if artifact is not None and 'plots' in artifact:
+            logger.info(f"Reusing stored results and plots for {valid_model}")
+            plot_stages.append(scheduler.add_stage(
+                f'plot:{valid_model}', reuse_artifact,
+                args=(valid_model,),
+                deps=[evaluate_stage],
+                inline=True
+            ))
+            continue
+        if artifact is not None:
+            logger.info(f"Reusing stored results for {valid_model}; its plots are out of date")
+        plot_stages.append(scheduler.add_stage(
+            f'plot:{valid_model}', plot_and_save,
+            args=(valid_model, plot_fp),
+            deps=[evaluate_stage]
+        ))
     
-    # Generate comparison plots
-    comparison_plotter = ModelComparisonPlotter(config.output_config['image_storage'])
-    comparison_plots = comparison_plotter.generate_all_comparison_plots(all_model_results)
+    scheduler.add_stage(
+        'report', build_report,
+        args=(valid_models,),
+        deps=plot_stages,
+        inline=True
+    )
     
-    # Generate HTML report
-    output_generator = OutputGenerator()
-    report_path = output_generator.generate_report(all_model_results, comparison_plots)
+    stage_results = scheduler.run()
+    report_path = stage_results['report']
     
-    logger = LoggerService()
+    for valid_model in valid_models:
+        if valid_model in reused_models:
+            continue
+        memory = stage_results[f'evaluate:{valid_model}'].get('memory') or {}
+        if memory.get('peak_rss_mb') is not None:
+            logger.info(f"Peak RSS while evaluating {valid_model}: {memory['peak_rss_mb']:.0f} MB")
+        dedup = stage_results[f'evaluate:{valid_model}'].get('dedup') or {}
+        if dedup.get('dedup_ratio') is not None:
+            logger.info(f"Dedup ratio for {valid_model}: {dedup['rows']} transactions, "
+                        f"{dedup['unique']} unique texts ({dedup['dedup_ratio']}x)")
     logger.info(f"Evaluation complete. Report generated at: {report_path}")
+    return report_path
+
+def main():
+    report_path = run_pipeline()
+    # Exported once run_pipeline has returned, so its outermost span is in the trace
+    if Tracer.enabled:
+        LoggerService().info(f"Stage trace written to: {Tracer().export_chrome_trace()}")
+    return report_path
 
 if __name__ == "__main__":
     main()
-
-
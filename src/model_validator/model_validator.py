@@ -1,55 +1,209 @@
+import json
+import os
+import time
+import math
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import List, Optional
-from huggingface_hub import HfApi  
 from logger_service.logger import LoggerService
+from configuration_manager.config_manager import ConfigManager
+
+
+def cached_snapshot_dir(model_name: str) -> Optional[str]:
+    """Path of a downloaded snapshot of ``model_name`` in the local Hugging Face cache, if any"""
+    try:
+        from huggingface_hub.constants import HF_HUB_CACHE
+    except ImportError:
+        return None
+    snapshots = os.path.join(HF_HUB_CACHE, f"models--{model_name.replace('/', '--')}", 'snapshots')
+    try:
+        for revision in sorted(os.listdir(snapshots)):
+            path = os.path.join(snapshots, revision)
+            if os.path.isdir(path) and os.listdir(path):
+                return path
+    except OSError:
+        pass
+    return None
+
 
 class ModelValidator:
-    """A class to validate Hugging Face models."""
-    
-    def __init__(self, allowed_model_types: Optional[List[str]] = None):
+    """A class to validate Hugging Face models.
+
+    A model is valid when it is a local directory, has a snapshot in the
+    local Hugging Face cache, has a fresh positive entry in the on-disk
+    validation cache, or (when online) the Hub confirms it. Hub lookups run
+    concurrently with a per-call timeout. ``api`` may be any object with a
+    ``model_info(repo_id, timeout=...)`` method, e.g. a local stand-in.
+    """
+
+    def __init__(self, allowed_model_types: Optional[List[str]] = None, api=None, offline: Optional[bool] = None):
         self.allowed_model_types = allowed_model_types or ['sentence-transformers']
         self.logger = LoggerService()
-        
+        validation_config = ConfigManager().model_validation_config
+        self.api = api
+        self.offline = offline if offline is not None else (
+            validation_config.get('offline', False) or os.environ.get('HF_HUB_OFFLINE', '0') not in ('', '0', 'false')
+        )
+        self.timeout = validation_config.get('timeout_s', 10)
+        self.max_workers = validation_config.get('max_workers', 8)
+        self.cache_file = validation_config.get('cache_file', 'embeddings/model_validation_cache.json')
+        self.cache_ttl = validation_config.get('cache_ttl_s', 86400)
+
     def _validate_model_name(self, model_name: str) -> bool:
         if not isinstance(model_name, str):
-            print(f"Invalid model name type: {type(model_name)}. Expected string.")
+            self.logger.error(f"Invalid model name type: {type(model_name)}. Expected string.")
             return False
-            
+
         if not model_name or not model_name.strip():
-            print("Model name cannot be empty.")
+            self.logger.error("Model name cannot be empty.")
             return False
-            
+
         if '/' not in model_name:
-            print(f"Invalid model name format: {model_name}. Expected format: 'organization/model-name'")
+            self.logger.error(f"Invalid model name format: {model_name}. Expected format: 'organization/model-name'")
             return False
-            
+
         return True
 
+    def _load_cache(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable model validation cache {self.cache_file}: {str(e)}")
+            return {}
+
+    def _save_cache(self, cache):
+        if not self.cache_file:
+            return
+        os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+        temp_path = self.cache_file + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(temp_path, self.cache_file)
+
+    def _cached_result(self, cache, model_name):
+        entry = cache.get(model_name)
+        if entry and time.time() - entry.get('checked_at', 0) < self.cache_ttl:
+            return entry['valid']
+        return None
+
+    def _local_source(self, model_name: str) -> Optional[str]:
+        if os.path.isdir(model_name):
+            return 'local directory'
+        if cached_snapshot_dir(model_name):
+            return 'local Hugging Face cache'
+        return None
+
+    def _get_api(self):
+        if self.api is None:
+            from huggingface_hub import HfApi
+            self.api = HfApi()
+        return self.api
+
+    def _check_remote(self, model_name: str):
+        """Return (valid, definitive) for one Hub lookup; network failures are not definitive"""
+        try:
+            # Call model_info to check if the model exists without loading it
+            self._get_api().model_info(repo_id=model_name, timeout=self.timeout)
+            return True, True
+        except Exception as e:
+            definitive = type(e).__name__ in ('RepositoryNotFoundError', 'RevisionNotFoundError', 'GatedRepoError')
+            self.logger.error(f"Model '{model_name}' not found or error occurred: {str(e)}")
+            return False, definitive
+
+    def _timed_check(self, model_name: str, started: dict):
+        started[model_name] = time.monotonic()
+        return self._check_remote(model_name)
+
+    def _wait_per_lookup(self, futures: dict, started: dict, batches: int) -> set:
+        """Wait for lookups, timing each one from when it started; return those that did not finish.
+
+        The per-call timeout is passed to the API; the deadline here bounds
+        stand-ins that ignore it. Queued lookups are not charged for the time
+        they wait for a worker, but all of them together get at most one
+        timeout per batch of ``max_workers``, in case hung calls hold every worker.
+        """
+        limit = self.timeout + 1
+        give_up = time.monotonic() + limit * batches
+        pending = set(futures)
+        expired = set()
+        while pending:
+            now = time.monotonic()
+            for future in list(pending):
+                start = started.get(futures[future])
+                if start is not None and now - start > limit:
+                    pending.discard(future)
+                    expired.add(future)
+            if not pending or now >= give_up:
+                break
+            deadlines = [started[futures[future]] + limit for future in pending if futures[future] in started]
+            timeout = min(deadlines + [give_up]) - now
+            done, _ = wait(pending, timeout=max(0, timeout), return_when=FIRST_COMPLETED)
+            pending -= done
+        return pending | expired
+
     @LoggerService.log_function(level='info')
     def validate_models(self, model_names: List[str]) -> List[str]:
         if not isinstance(model_names, list):
             self.logger.error("model_names must be a list")
             raise ValueError("model_names must be a list")
 
-            
-        valid_models = []
-        api = HfApi()
-        
+        results = {}
+        remote = []
+        cache = self._load_cache()
         for model_name in model_names:
+            local_source = self._local_source(model_name) if isinstance(model_name, str) else None
+            if local_source:
+                results[model_name] = True
+                self.logger.info(f"Model '{model_name}' found in {local_source}.")
+                continue
             if not self._validate_model_name(model_name):
                 self.logger.error(f"Invalid model name: {model_name}")
+                results[model_name] = False
+                continue
+            if self.offline:
+                results[model_name] = False
+                self.logger.error(f"Model '{model_name}' is not available locally and offline mode is on")
+                continue
+            cached = self._cached_result(cache, model_name)
+            if cached is not None:
+                results[model_name] = cached
+                self.logger.info(f"Model '{model_name}' {'valid' if cached else 'invalid'} (cached validation).")
                 continue
-                
-            self.logger.info(f"Validating model '{model_name}'")
-            try:
-                # Call model_info to check if the model exists without loading it
-                api.model_info(repo_id=model_name)
-                valid_models.append(model_name)
-                self.logger.info(f"Model '{model_name}' exists on Hugging Face Hub.")
-            except Exception as e:
-                self.logger.error(f"Model '{model_name}' not found or error occurred: {str(e)}")
-                print(f"✗ Model '{model_name}' not found or error occurred: {str(e)}")
-                
-        return valid_models
+            remote.append(model_name)
+
+        if remote:
+            for model_name in remote:
+                self.logger.info(f"Validating model '{model_name}'")
+            workers = max(1, min(self.max_workers, len(remote)))
+            executor = ThreadPoolExecutor(max_workers=workers)
+            started = {}
+            futures = {
+                executor.submit(self._timed_check, model_name, started): model_name
+                for model_name in remote
+            }
+            not_done = self._wait_per_lookup(futures, started, math.ceil(len(remote) / workers))
+            executor.shutdown(wait=False, cancel_futures=True)
+
+            now = time.time()
+            for future, model_name in futures.items():
+                if future in not_done:
+                    results[model_name] = False
+                    if model_name in started:
+                        self.logger.error(f"Model '{model_name}' validation timed out after {self.timeout}s")
+                    else:
+                        self.logger.error(f"Model '{model_name}' validation did not start: earlier lookups hung")
+                    continue
+                valid, definitive = future.result()
+                results[model_name] = valid
+                if valid:
+                    self.logger.info(f"Model '{model_name}' exists on Hugging Face Hub.")
+                if definitive:
+                    cache[model_name] = {'valid': valid, 'checked_at': now}
+            self._save_cache(cache)
+
+        return [model_name for model_name in model_names if results.get(model_name)]
 
     def is_valid_model(self, model_name: str) -> bool:
         return len(self.validate_models([model_name])) > 0
@@ -0,0 +1,120 @@
+import json
+import os
+import numpy as np
+from logger_service.logger import LoggerService
+from configuration_manager.config_manager import ConfigManager
+from results_validator.similarity_results import SimilarityResults
+
+PNG_REPORT_MODE = 'png'
+DATA_REPORT_MODE = 'data'
+CHART_DATA_DIR = 'data'
+HISTOGRAM_BINS = 20
+DECIMALS = 4
+
+
+def _rounded(values):
+    return np.round(np.asarray(values, dtype=np.float64), DECIMALS).tolist()
+
+
+def downsample_curve(x, y, max_points):
+    """At most ``max_points`` points of a curve, always keeping both ends"""
+    x, y = np.asarray(x), np.asarray(y)
+    if max_points and len(x) > max_points:
+        keep = np.unique(np.linspace(0, len(x) - 1, max_points).round().astype(int))
+        x, y = x[keep], y[keep]
+    return _rounded(x), _rounded(y)
+
+
+def histogram(values, bins=HISTOGRAM_BINS, value_range=None):
+    counts, edges = np.histogram(np.asarray(values, dtype=np.float64), bins=bins, range=value_range)
+    return {'edges': _rounded(edges), 'counts': counts.tolist()}
+
+
+def report_mode():
+    return ConfigManager().output_config.get('report_mode', PNG_REPORT_MODE)
+
+
+def model_chart_data(raw_results, final_results, max_curve_points=200):
+    """Everything the per-model charts draw, as plain JSON-ready lists.
+
+    The same series as the PNG plots: confusion counts, the one-vs-rest ROC
+    and precision-recall curves from final_results (downsampled) and the
+    confidence histogram.
+    """
+    roc, pr = [], []
+    for category, curve in final_results['curve_metrics']['per_category'].items():
+        fpr_points, tpr_points = downsample_curve(curve['roc']['fpr'], curve['roc']['tpr'], max_curve_points)
+        roc.append({'category': category, 'x': fpr_points, 'y': tpr_points, 'auc': curve['auc']})
+        recall_points, precision_points = downsample_curve(
+            curve['precision_recall']['recall'], curve['precision_recall']['precision'], max_curve_points
+        )
+        pr.append({'category': category, 'x': recall_points, 'y': precision_points,
+                   'average_precision': curve['average_precision']})
+
+    confusion = final_results['confusion_matrix_data']
+    return {
+        'confusion': {
+            'categories': list(confusion['categories']),
+            'counts': np.asarray(confusion['confusion_matrix']).tolist()
+        },
+        'roc': roc,
+        'precision_recall': pr,
+        'confidence': histogram(SimilarityResults.from_dict(raw_results).rounded_confidences())
+    }
+
+
+def comparison_chart_data(model_results):
+    """Accuracy, precision/recall/F1, confidence histograms and coverage curves across models"""
+    confidences = {
+        model_name: SimilarityResults.from_dict(results['raw_results']).rounded_confidences()
+        for model_name, results in model_results.items()
+    }
+    non_empty = [values for values in confidences.values() if len(values)]
+    # Shared bins so the overlaid histograms line up
+    value_range = (
+        (min(float(values.min()) for values in non_empty), max(float(values.max()) for values in non_empty))
+        if non_empty else None
+    )
+    coverage = []
+    for model_name, results in model_results.items():
+        sweep = results['final_results'].get('threshold_sweep')
+        if not sweep:
+            continue
+        coverage.append({
+            'category': model_name,
+            'x': sweep['curve']['coverage'],
+            'y': sweep['curve']['accuracy'],
+            # The recommended operating point, marked on the curve
+            'point': None if sweep['recommended'] is None else {
+                'x': sweep['recommended']['coverage'], 'y': sweep['recommended']['accuracy']
+            }
+        })
+    return {
+        'models': list(model_results),
+        'accuracy': [results['final_results']['basic_metrics']['accuracy'] for results in model_results.values()],
+        'metrics': {
+            metric: [results['final_results']['detailed_metrics'][metric] for results in model_results.values()]
+            for metric in ('precision', 'recall', 'f1_score')
+        },
+        'confidence': {
+            model_name: histogram(values, value_range=value_range) for model_name, values in confidences.items()
+        },
+        'coverage': coverage
+    }
+
+
+@LoggerService.log_function(level='info')
+def generate_chart_data(model_name, raw_results, final_results):
+    """Write a model's chart data to data/<model>.js next to the report and return its web path.
+
+    The file is one ``ReportCharts.register(name, <JSON>)`` call so that the
+    report can load it with a script tag, which also works from file://.
+    """
+    output_config = ConfigManager().output_config
+    chart_data = model_chart_data(raw_results, final_results, output_config.get('max_curve_points', 200))
+    file_name = model_name.replace('/', '_') + '.js'
+    data_dir = os.path.join(os.path.dirname(output_config['output_file']), CHART_DATA_DIR)
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, file_name), 'w', encoding='utf-8') as f:
+        f.write(f"ReportCharts.register({json.dumps(model_name)}, {json.dumps(chart_data, separators=(',', ':'))});\n")
+    return f"{CHART_DATA_DIR}/{file_name}"
@@ -1,10 +1,13 @@
-import pandas as pd
 from jinja2 import Environment, FileSystemLoader
 from logger_service.logger import LoggerService
 from configuration_manager.config_manager import ConfigManager
+import json
 import os
 import shutil
 
+CHARTS_SCRIPT = 'report_charts.js'
+METRICS_COLUMNS = ['Model', 'Accuracy', 'Precision', 'Recall', 'F1 Score', 'Macro AUC', 'Macro AP', 'Mean Confidence']
+
 class OutputGenerator:
     def __init__(self):
         self.logger = LoggerService()
@@ -32,9 +35,8 @@ class OutputGenerator:
         # we don't need to copy anything anymore
         pass
 
-    @LoggerService.log_function(level='info')
-    def create_model_performance_table(self, model_results):
-        """Create a DataFrame with model performance metrics"""
+    def create_model_performance_rows(self, model_results):
+        """One row of headline metrics per model, keyed by METRICS_COLUMNS"""
         data = []
         for model_name, results in model_results.items():
             metrics = results['final_results']
@@ -44,13 +46,120 @@ class OutputGenerator:
                 'Precision': metrics['detailed_metrics']['precision'],
                 'Recall': metrics['detailed_metrics']['recall'],
                 'F1 Score': metrics['detailed_metrics']['f1_score'],
+                'Macro AUC': metrics['curve_metrics']['macro_auc'],
+                'Macro AP': metrics['curve_metrics']['macro_average_precision'],
                 'Mean Confidence': metrics['confidence_stats']['mean_confidence']
             }
             data.append(row)
-        return pd.DataFrame(data)
+        return data
+
+    @LoggerService.log_function(level='info')
+    def create_model_performance_table(self, model_results):
+        """Create a DataFrame with model performance metrics"""
+        import pandas as pd
+
+        return pd.DataFrame(self.create_model_performance_rows(model_results))
 
     @LoggerService.log_function(level='info')
-    def generate_report(self, model_results, comparison_plots):
+    def create_performance_table(self, performance):
+        """Flatten the tracer's per-model summary into template rows"""
+        rows = []
+        for model_name, summary in performance.items():
+            rows.append({
+                'model': model_name,
+                'stages': summary['stages'],
+                'total_seconds': summary['total_seconds'],
+                'texts_per_second': summary['texts_per_second'],
+                'peak_mb': summary['peak_mb']
+            })
+        # Stages no row spent time in (e.g. streaming in a non-streaming run) are left out
+        stage_names = [
+            stage_name for stage_name in (rows[0]['stages'] if rows else [])
+            if any(row['stages'][stage_name] for row in rows)
+        ]
+        return {'stage_names': stage_names, 'rows': rows}
+
+    @LoggerService.log_function(level='info')
+    def create_index_table(self, model_results):
+        """Keyword index recall rows for models evaluated with an approximate backend"""
+        return [
+            dict(results['index_stats'], model=model_name)
+            for model_name, results in model_results.items()
+            if results.get('index_stats')
+        ]
+
+    @LoggerService.log_function(level='info')
+    def create_strategy_table(self, model_results):
+        """Scoring strategy comparison rows, one per model and strategy"""
+        return [
+            dict(row, model=model_name)
+            for model_name, results in model_results.items()
+            for row in results.get('strategy_stats') or []
+        ]
+
+    @LoggerService.log_function(level='info')
+    def create_compression_table(self, model_results):
+        """Compressed embedding mode rows, one per model and mode"""
+        return [
+            dict(row, model=model_name)
+            for model_name, results in model_results.items()
+            for row in results.get('compression_stats') or []
+        ]
+
+    @LoggerService.log_function(level='info')
+    def create_threshold_table(self, model_results):
+        """Recommended confidence threshold rows, one per model"""
+        return [
+            dict(results['final_results']['threshold_sweep'], model=model_name)
+            for model_name, results in model_results.items()
+            if results['final_results'].get('threshold_sweep')
+        ]
+
+    @LoggerService.log_function(level='info')
+    def create_memory_table(self, model_results):
+        """Per-model RSS rows recorded while the model's stages ran"""
+        return [
+            dict(results['memory'], model=model_name)
+            for model_name, results in model_results.items()
+            if results.get('memory')
+        ]
+
+    @LoggerService.log_function(level='info')
+    def create_dedup_table(self, model_results):
+        """Transactions vs unique normalized texts encoded, one row per model"""
+        return [
+            dict(results['dedup'], model=model_name)
+            for model_name, results in model_results.items()
+            if results.get('dedup')
+        ]
+
+    def _report_context(self, model_results, performance=None):
+        """Template context shared by the PNG and the data report"""
+        return {
+            'title': 'Model Evaluation Report',
+            'performance': self.create_performance_table(performance) if performance else None,
+            'index_stats': self.create_index_table(model_results),
+            'strategy_stats': self.create_strategy_table(model_results),
+            'compression_stats': self.create_compression_table(model_results),
+            'memory_stats': self.create_memory_table(model_results),
+            'dedup_stats': self.create_dedup_table(model_results),
+            'threshold_stats': self.create_threshold_table(model_results),
+            'models': {}
+        }
+
+    def _write_report(self, template_name, context):
+        template = self.env.get_template(template_name)
+        html_output = template.render(context)
+
+        output_path = self.config.output_config['output_file']
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(html_output)
+
+        self.logger.info(f"Report successfully generated at: {output_path}")
+        return output_path
+
+    @LoggerService.log_function(level='info')
+    def generate_report(self, model_results, comparison_plots, performance=None):
         """Generate comprehensive HTML report using Bootstrap"""
         try:
             # Copy images to output directory
@@ -59,15 +168,9 @@ class OutputGenerator:
             # Create performance metrics table
             metrics_table = self.create_model_performance_table(model_results)
             
-            # Load template
-            template = self.env.get_template('report_template.html')
-            
             # Prepare context for template
-            context = {
-                'title': 'Model Evaluation Report',
-                'metrics_table': metrics_table.to_html(classes='table table-striped', index=False),
-                'models': {}
-            }
+            context = self._report_context(model_results, performance)
+            context['metrics_table'] = metrics_table.to_html(classes='table table-striped', index=False)
 
             # Add plot paths and results for each model
             for model_name, results in model_results.items():
@@ -82,16 +185,36 @@ class OutputGenerator:
             # Add comparison plots
             context['comparison_plots'] = comparison_plots
 
-            # Render template
-            html_output = template.render(context)
-            
-            # Save the report
-            output_path = self.config.output_config['output_file']
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(html_output)
-            
-            self.logger.info(f"Report successfully generated at: {output_path}")
-            return output_path
+            return self._write_report('report_template.html', context)
+
+        except Exception as e:
+            self.logger.error(f"Error generating report: {str(e)}")
+            raise
+
+    @LoggerService.log_function(level='info')
+    def generate_data_report(self, model_results, comparison_data, performance=None):
+        """Generate the report that draws its charts client-side from JSON data.
+
+        No PNGs and no pandas: the metrics table is rendered by the template,
+        comparison data is inlined, and per-model chart data (written by the
+        plot stage under data/) is loaded when a model's section is opened.
+        """
+        try:
+            shutil.copyfile(os.path.join('templates', CHARTS_SCRIPT), os.path.join(self.output_dir, CHARTS_SCRIPT))
+
+            context = self._report_context(model_results, performance)
+            context['metrics_columns'] = METRICS_COLUMNS
+            context['metrics_rows'] = self.create_model_performance_rows(model_results)
+            # Keep the inline JSON from closing the surrounding <script> element
+            context['comparison_data'] = json.dumps(comparison_data, separators=(',', ':')).replace('</', '<\\/')
+            context['charts_script'] = CHARTS_SCRIPT
+            for model_name, results in model_results.items():
+                context['models'][model_name] = {
+                    'chart_data': results['plots']['chart_data'],
+                    'metrics': results['final_results']
+                }
+
+            return self._write_report('report_data_template.html', context)
 
         except Exception as e:
             self.logger.error(f"Error generating report: {str(e)}")
@@ -0,0 +1,3 @@
+from .stage_scheduler import Stage, StageScheduler, memory_aware_model_slots
+
+__all__ = ['Stage', 'StageScheduler', 'memory_aware_model_slots']
@@ -0,0 +1,38 @@
+import os
+import pickle
+from configuration_manager.config_manager import ConfigManager
+
+ARTIFACT_SUFFIX = '.evaluation.pkl'
+
+
+def artifacts_dir():
+    return ConfigManager().output_config.get('artifacts_dir', 'output/artifacts')
+
+
+def artifact_path(model_name, directory=None):
+    return os.path.join(directory or artifacts_dir(), model_name.replace('/', '_') + ARTIFACT_SUFFIX)
+
+
+def save_model_artifact(model_name, result, directory=None):
+    """Persist one model's stage result so a later CLI step can pick it up"""
+    path = artifact_path(model_name, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        pickle.dump(dict(result, model_name=model_name), f, protocol=pickle.HIGHEST_PROTOCOL)
+    # Readers never see a half-written artifact
+    os.replace(temp_path, path)
+    return path
+
+
+def load_model_artifact(model_name, directory=None):
+    path = artifact_path(model_name, directory)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No evaluation artifact for '{model_name}' at {path}; run the evaluate step first")
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def models_with_artifacts(model_names, directory=None):
+    """The subset of ``model_names`` that have a saved artifact, in the same order"""
+    return [model_name for model_name in model_names if os.path.exists(artifact_path(model_name, directory))]
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import os
+from logger_service.logger import LoggerService
+from configuration_manager.config_manager import ConfigManager
+from pipeline.artifacts import artifact_path, load_model_artifact, save_model_artifact
+
+SOURCE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES_DIR = os.path.join(os.path.dirname(SOURCE_ROOT), 'templates')
+# Settings that name files or tune throughput but never change results
+NON_RESULT_SETTINGS = {
+    'test_data': ('transactions_file', 'categories_file', 'chunk_size', 'plot_sample_size'),
+    'embedding_settings': ('cache', 'embeddings_output_dir', 'default_embedding_file', 'store_dtype'),
+}
+
+_file_digests = {}
+_code_version = None
+
+
+def file_digest(file_path):
+    """sha256 of a file's contents, memoised per (path, size, mtime)"""
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_digests:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        _file_digests[key] = digest.hexdigest()
+    return _file_digests[key]
+
+
+def code_version():
+    """One hash over every source file and report template, so any code edit invalidates stored artifacts"""
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for root_dir, suffix in ((SOURCE_ROOT, '.py'), (TEMPLATES_DIR, '')):
+            for directory, dirs, files in sorted(os.walk(root_dir)):
+                dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+                for name in sorted(files):
+                    if name.endswith(suffix):
+                        path = os.path.join(directory, name)
+                        digest.update(os.path.relpath(path, root_dir).encode('utf-8'))
+                        digest.update(file_digest(path).encode('ascii'))
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def _result_settings(section):
+    settings = dict(ConfigManager().config_data.get(section, {}))
+    for key in NON_RESULT_SETTINGS.get(section, ()):
+        settings.pop(key, None)
+    return settings
+
+
+def _hash(inputs):
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def evaluation_fingerprint(model_name):
+    """Hash of everything a model's raw results and metrics depend on"""
+    from embedding_manager.embedding_cache import resolve_model_revision
+    from results_validator.text_normalizer import normalization_settings
+
+    test_data_config = ConfigManager().test_data_config
+    test_data_settings = _result_settings('test_data')
+    # The effective steps, so a missing section and a disabled one hash alike
+    test_data_settings['normalization'] = normalization_settings()
+    return _hash({
+        'model': model_name,
+        'revision': resolve_model_revision(model_name),
+        'categories': file_digest(test_data_config['categories_file']),
+        'transactions': file_digest(test_data_config['transactions_file']),
+        'test_data': test_data_settings,
+        'embedding_settings': _result_settings('embedding_settings'),
+        'scoring': _result_settings('scoring'),
+        'code': code_version()
+    })
+
+
+def plot_fingerprint(evaluation_fp):
+    """Hash of the evaluation plus the settings the per-model plots depend on"""
+    config = ConfigManager()
+    return _hash({
+        'evaluation': evaluation_fp,
+        'plot_sample_size': config.test_data_config.get('plot_sample_size'),
+        'output_file': config.output_config['output_file'],
+        'report_mode': config.output_config.get('report_mode', 'png'),
+        'max_curve_points': config.output_config.get('max_curve_points'),
+        'code': code_version()
+    })
+
+
+def _plots_on_disk(plots):
+    output_dir = os.path.dirname(ConfigManager().output_config['output_file'])
+    return bool(plots) and all(os.path.exists(os.path.join(output_dir, web_path)) for web_path in plots.values())
+
+
+def reusable_artifact(model_name, evaluation_fp, plot_fp):
+    """The stored artifact when its evaluation is current, or None.
+
+    Its ``plots`` are kept only when they are current too and every image
+    is still on disk; otherwise they are dropped so the plot stage reruns.
+    """
+    if not os.path.exists(artifact_path(model_name)):
+        return None
+    try:
+        artifact = load_model_artifact(model_name)
+    except Exception as e:
+        LoggerService().warning(f"Ignoring unreadable artifact for {model_name}: {str(e)}")
+        return None
+    fingerprints = artifact.get('fingerprints') or {}
+    if fingerprints.get('evaluation') != evaluation_fp:
+        return None
+    # Spans from the run that produced the artifact would skew this run's timings
+    artifact.pop('spans', None)
+    if fingerprints.get('plots') != plot_fp or not _plots_on_disk(artifact.get('plots')):
+        artifact.pop('plots', None)
+        fingerprints.pop('plots', None)
+    return artifact
+
+
+@LoggerService.log_function(level='info')
+def reuse_artifact(model_name, artifact):
+    """Stage body for a model whose stored results are still current"""
+    return artifact
+
+
+def evaluate_and_save(model_name, categories_data, evaluation_fp):
+    from pipeline.model_stages import evaluate_model
+
+    evaluation = evaluate_model(model_name, categories_data)
+    evaluation['fingerprints'] = {'evaluation': evaluation_fp}
+    save_model_artifact(model_name, evaluation)
+    return evaluation
+
+
+def plot_and_save(model_name, plot_fp, evaluation):
+    from pipeline.model_stages import plot_model
+
+    plotted = plot_model(model_name, evaluation)
+    plotted['fingerprints'] = dict(evaluation.get('fingerprints') or {}, plots=plot_fp)
+    save_model_artifact(model_name, plotted)
+    return plotted
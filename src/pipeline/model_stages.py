@@ -0,0 +1,155 @@
+import os
+from logger_service.logger import LoggerService
+from logger_service.tracer import Tracer
+
+
+def model_short_name(model_name):
+    """Name for output files, plots and report rows: 'org/name' -> 'name', '/models/a/' -> 'a'"""
+    return os.path.basename(os.path.normpath(model_name))
+
+
+def check_short_names(model_names):
+    """Raise ValueError when two models would share output files under the same short name"""
+    seen = {}
+    for model_name in model_names:
+        other = seen.setdefault(model_short_name(model_name), model_name)
+        if other != model_name:
+            raise ValueError(
+                f"Models '{other}' and '{model_name}' both map to '{model_short_name(model_name)}'; "
+                "rename one of them (e.g. its local directory)"
+            )
+
+
+@LoggerService.log_function(level='info')
+def evaluate_model(model_name, categories_data):
+    """Load a model, encode keywords and queries, score and compute metrics"""
+    # Imported here so pool workers only pay for the modules their stage needs
+    from embedding_manager.embedding_manager import EmbeddingManager
+    from embedding_manager.model_pool import ModelPool, PeakRSSMonitor, current_rss_mb
+    from configuration_manager.config_manager import ConfigManager
+
+    Tracer().set_model(model_short_name(model_name))
+    sample_interval_ms = ConfigManager().model_pool_config.get('rss_sample_interval_ms', 20)
+    with PeakRSSMonitor(sample_interval_ms) as monitor:
+        mgr = EmbeddingManager(model_name)
+        try:
+            evaluation = _score_model(mgr, categories_data)
+        finally:
+            # Release the model (and the memory its stages used) before plotting
+            mgr.close()
+    evaluation['memory'] = dict(
+        ModelPool().stats(model_name),
+        start_rss_mb=monitor.start_mb,
+        peak_rss_mb=monitor.peak_mb,
+        end_rss_mb=current_rss_mb()
+    )
+    return evaluation
+
+
+def _score_model(mgr, categories_data):
+    from configuration_manager.config_manager import ConfigManager
+    from results_validator.results_validator import ResultsValidator
+
+    mgr.create_categorical_embeddings(categories_data)
+
+    streaming = ConfigManager().test_data_config.get('streaming', False)
+    if streaming:
+        validator = ResultsValidator(model_manager=mgr, streaming=True)
+        raw_results, final_results = validator.evaluate_streaming()
+    else:
+        validator = ResultsValidator(model_manager=mgr)
+        validator.generate_query_vectors()
+        raw_results = validator.calculate_similarities()
+        final_results = validator.evaluate_all_metrics(raw_results)
+    return {
+        'raw_results': raw_results,
+        'final_results': final_results,
+        'index_stats': None if streaming else validator.keyword_index_stats(),
+        'strategy_stats': None if streaming else validator.compare_strategies(),
+        'compression_stats': None if streaming else validator.compare_compression(),
+        'dedup': validator.dedup_stats
+    }
+
+
+@LoggerService.log_function(level='info')
+def plot_model(model_name, evaluation):
+    """Render the per-model plots (or, in data report mode, their chart data) for a finished evaluation"""
+    Tracer().set_model(model_short_name(model_name))
+    return render_model_plots(model_short_name(model_name), evaluation)
+
+
+def render_model_plots(name, evaluation):
+    """Plots or chart data for one set of results, filed under ``name``; needs no model"""
+    from output_generator.chart_data import DATA_REPORT_MODE, generate_chart_data, report_mode
+
+    if report_mode() == DATA_REPORT_MODE:
+        chart_data = generate_chart_data(name, evaluation['raw_results'], evaluation['final_results'])
+        return dict(evaluation, plots={'chart_data': chart_data})
+
+    from plot_generator.plot_generator import PlotGenerator
+
+    plot_generator = PlotGenerator(name)
+    plots = plot_generator.generate_all_plots(
+        evaluation['raw_results'],
+        evaluation['final_results']
+    )
+    return dict(evaluation, plots=plots)
+
+
+@LoggerService.log_function(level='info')
+def build_report(model_names, *model_results, record_run=True):
+    """Store the run in the results warehouse, then render comparison plots and the HTML report.
+
+    ``record_run=False`` only renders, for rebuilding the report from stored artifacts.
+    """
+    from results_warehouse.results_warehouse import configured_warehouse, new_run_id, run_inputs
+
+    check_short_names(model_names)
+    tracer = Tracer()
+    tracer.set_model(None)
+    all_model_results = {
+        model_short_name(model_name): results
+        for model_name, results in zip(model_names, model_results)
+    }
+    comparisons = render_comparisons(all_model_results)
+    # Summarized after the comparisons so the report stage shows in the Performance table
+    performance = tracer.summarize() if Tracer.enabled else None
+
+    warehouse = configured_warehouse() if record_run else None
+    if warehouse is not None:
+        warehouse.record_run(new_run_id(), {
+            model_name: (model_short_name(model_name), results, (performance or {}).get(model_short_name(model_name)))
+            for model_name, results in zip(model_names, model_results)
+        }, run_inputs())
+    return write_report(all_model_results, comparisons, performance)
+
+
+def render_report(all_model_results, performance=None):
+    """Comparison plots (or data) and the HTML report for ``{name: results}``; needs no model"""
+    return write_report(all_model_results, render_comparisons(all_model_results), performance)
+
+
+def render_comparisons(all_model_results):
+    """Comparison plots, or comparison chart data in data report mode"""
+    from configuration_manager.config_manager import ConfigManager
+    from output_generator.chart_data import DATA_REPORT_MODE, comparison_chart_data, report_mode
+
+    with Tracer().span('report_comparisons', items=len(all_model_results)):
+        if report_mode() == DATA_REPORT_MODE:
+            return comparison_chart_data(all_model_results)
+
+        from plot_generator.model_comparison_plotter import ModelComparisonPlotter
+
+        comparison_plotter = ModelComparisonPlotter(ConfigManager().output_config['image_storage'])
+        return comparison_plotter.generate_all_comparison_plots(all_model_results)
+
+
+def write_report(all_model_results, comparisons, performance=None):
+    """The HTML report around already rendered comparisons"""
+    from output_generator.chart_data import DATA_REPORT_MODE, report_mode
+    from output_generator.output_generator import OutputGenerator
+
+    output_generator = OutputGenerator()
+    if report_mode() == DATA_REPORT_MODE:
+        return output_generator.generate_data_report(all_model_results, comparisons, performance)
+    return output_generator.generate_report(all_model_results, comparisons, performance)
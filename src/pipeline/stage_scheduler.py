@@ -0,0 +1,157 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from logger_service.logger import LoggerService
+from logger_service.tracer import Tracer
+
+
+class Stage:
+    """A unit of work in the evaluation DAG.
+
+    ``func`` is called as ``func(*args, *dependency_results)`` with the
+    results of ``deps`` appended in declaration order. ``resources`` maps
+    a resource name to the number of units the stage holds while running.
+    Inline stages run in the scheduling process instead of the pool.
+    """
+
+    def __init__(self, name, func, args=(), deps=(), resources=None, inline=False):
+        self.name = name
+        self.func = func
+        self.args = tuple(args)
+        self.deps = list(deps)
+        self.resources = resources or {}
+        self.inline = inline
+
+
+def memory_aware_model_slots(max_loaded_models, model_memory_mb=None):
+    """Number of models that may be resident at once given the free memory.
+
+    Falls back to ``max_loaded_models`` when psutil is unavailable or no
+    per-model estimate is configured.
+    """
+    slots = max(1, int(max_loaded_models))
+    if not model_memory_mb:
+        return slots
+    try:
+        import psutil
+    except ImportError:
+        return slots
+    available_mb = psutil.virtual_memory().available / (1024 * 1024)
+    return max(1, min(slots, int(available_mb // model_memory_mb)))
+
+
+def _run_stage_in_worker(func, *args):
+    """Pool entry point: run a stage and ship its timing spans back"""
+    result = func(*args)
+    return result, Tracer().drain() if Tracer.enabled else []
+
+
+class StageScheduler:
+    """Runs a DAG of stages on a process pool, respecting resource limits"""
+
+    def __init__(self, max_workers=1, resource_limits=None):
+        self.logger = LoggerService()
+        self.max_workers = max(1, int(max_workers))
+        self.resource_limits = dict(resource_limits or {})
+        self.stages = {}
+
+    def add_stage(self, name, func, args=(), deps=(), resources=None, inline=False):
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage name: {name}")
+        for dep in deps:
+            if dep not in self.stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        for resource, units in (resources or {}).items():
+            if units > self.resource_limits.get(resource, units):
+                raise ValueError(f"Stage '{name}' needs {units} '{resource}' but only {self.resource_limits[resource]} exist")
+        self.stages[name] = Stage(name, func, args, deps, resources, inline)
+        return name
+
+    def _acquire(self, stage, in_use):
+        for resource, units in stage.resources.items():
+            limit = self.resource_limits.get(resource)
+            if limit is not None and in_use.get(resource, 0) + units > limit:
+                return False
+        for resource, units in stage.resources.items():
+            in_use[resource] = in_use.get(resource, 0) + units
+        return True
+
+    @staticmethod
+    def _release(stage, in_use):
+        for resource, units in stage.resources.items():
+            in_use[resource] -= units
+
+    def _call(self, stage, results):
+        return stage.func(*stage.args, *[results[dep] for dep in stage.deps])
+
+    @LoggerService.log_function(level='info')
+    def run(self):
+        """Execute every stage and return {stage name: result}"""
+        if self.max_workers == 1:
+            return self._run_sequential()
+
+        results = {}
+        pending = list(self.stages)
+        running = {}
+        in_use = {}
+        started = {}
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=LoggerService.init_worker,
+            initargs=(LoggerService.worker_queue(),)
+        ) as executor:
+            while pending or running:
+                progressed = False
+                for name in list(pending):
+                    stage = self.stages[name]
+                    if any(dep not in results for dep in stage.deps):
+                        continue
+                    if stage.inline:
+                        pending.remove(name)
+                        results[name] = self._run_inline(stage, results)
+                        progressed = True
+                        continue
+                    if len(running) >= self.max_workers or not self._acquire(stage, in_use):
+                        continue
+                    pending.remove(name)
+                    started[name] = time.perf_counter()
+                    future = executor.submit(
+                        _run_stage_in_worker, stage.func, *stage.args, *[results[dep] for dep in stage.deps]
+                    )
+                    running[future] = name
+                    self.logger.info(f"Stage '{name}' submitted")
+                    progressed = True
+
+                if progressed or not running:
+                    if not running and pending and not progressed:
+                        raise RuntimeError(f"Stages cannot be scheduled: {pending}")
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    self._release(self.stages[name], in_use)
+                    try:
+                        results[name], spans = future.result()
+                        Tracer().extend(spans)
+                    except Exception as e:
+                        self.logger.error(f"Stage '{name}' failed: {str(e)}")
+                        for other in running:
+                            other.cancel()
+                        raise
+                    self.logger.info(f"Stage '{name}' finished in {time.perf_counter() - started[name]:.2f}s")
+
+        return results
+
+    def _run_inline(self, stage, results):
+        start = time.perf_counter()
+        result = self._call(stage, results)
+        self.logger.info(f"Stage '{stage.name}' finished in {time.perf_counter() - start:.2f}s")
+        return result
+
+    def _run_sequential(self):
+        results = {}
+        # Stages can only depend on earlier stages, so insertion order is topological
+        for stage in self.stages.values():
+            results[stage.name] = self._run_inline(stage, results)
+        return results
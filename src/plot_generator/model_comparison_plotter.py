@@ -1,51 +1,38 @@
 import os
-import numpy as np
-import matplotlib.pyplot as plt
 from logger_service.logger import LoggerService
+from configuration_manager.config_manager import ConfigManager
+from results_validator.similarity_results import SimilarityResults
+from plot_generator.plot_jobs import (
+    PlotJob, run_plot_jobs, render_accuracy_comparison,
+    render_metrics_comparison, render_confidence_comparison, render_coverage_comparison
+)
 
 class ModelComparisonPlotter:
     def __init__(self, output_dir):
         self.logger = LoggerService()
+        self.config = ConfigManager()
         self.output_dir = output_dir
         self.comparison_dir = os.path.join(output_dir, 'comparisons')
         os.makedirs(self.comparison_dir, exist_ok=True)  # Ensure comparisons directory exists
 
-    def _save_plot(self, plot_name):
-        """Save plot to the comparisons directory"""
+    def _plot_job(self, plot_name, func, **kwargs):
+        """Build a render job targeting the comparisons directory"""
         filename = f"comparison_{plot_name}.png"
         path = os.path.join(self.comparison_dir, filename)
         web_path = f"images/comparisons/{filename}"  # Relative path for web
-        plt.savefig(path, bbox_inches='tight')
-        plt.close()
-        return web_path  # Return web-friendly path
+        return PlotJob(plot_name, func, path, web_path, **kwargs)
 
-    @LoggerService.log_function(level='info')
-    def plot_accuracy_comparison(self, model_results):
-        """Generate accuracy comparison bar plot"""
+    @staticmethod
+    def _render(job):
+        return run_plot_jobs([job])[job.key]
+
+    def accuracy_job(self, model_results):
         models = list(model_results.keys())
         accuracies = [results['final_results']['basic_metrics']['accuracy'] 
                      for results in model_results.values()]
-        
-        plt.figure(figsize=(10, 6))
-        bars = plt.bar(models, accuracies)
-        plt.title('Model Accuracy Comparison')
-        plt.xlabel('Model')
-        plt.ylabel('Accuracy')
-        plt.xticks(rotation=45, ha='right')
-        
-        # Add value labels on top of bars
-        for bar in bars:
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height,
-                    f'{height:.2%}',
-                    ha='center', va='bottom')
-        
-        plt.tight_layout()
-        return self._save_plot('accuracy')
+        return self._plot_job('accuracy', render_accuracy_comparison, models=models, accuracies=accuracies)
 
-    @LoggerService.log_function(level='info')
-    def plot_metrics_comparison(self, model_results):
-        """Generate detailed metrics comparison plot"""
+    def metrics_job(self, model_results):
         models = list(model_results.keys())
         metrics = ['precision', 'recall', 'f1_score']
         
@@ -55,52 +42,58 @@ class ModelComparisonPlotter:
             detailed_metrics = results['final_results']['detailed_metrics']
             for metric in metrics:
                 data[metric].append(detailed_metrics[metric])
+        return self._plot_job('metrics', render_metrics_comparison, models=models, metrics=metrics, data=data)
 
-        # Plot
-        plt.figure(figsize=(12, 6))
-        x = np.arange(len(models))
-        width = 0.25
+    def confidence_job(self, model_results):
+        series = [
+            (model_name, SimilarityResults.from_dict(results['raw_results']).rounded_confidences())
+            for model_name, results in model_results.items()
+        ]
+        return self._plot_job('confidence', render_confidence_comparison, series=series)
 
-        # Plot bars for each metric
-        for i, metric in enumerate(metrics):
-            plt.bar(x + i*width, data[metric], width, label=metric.capitalize())
+    def coverage_job(self, model_results):
+        series = []
+        for model_name, results in model_results.items():
+            sweep = results['final_results'].get('threshold_sweep')
+            if not sweep:
+                # e.g. runs stored before the sweep existed
+                continue
+            series.append((model_name, sweep['curve']['coverage'], sweep['curve']['accuracy'], sweep['recommended']))
+        return self._plot_job('coverage', render_coverage_comparison, series=series)
 
-        plt.xlabel('Models')
-        plt.ylabel('Score')
-        plt.title('Model Performance Metrics Comparison')
-        plt.xticks(x + width, models, rotation=45, ha='right')
-        plt.legend()
-        plt.tight_layout()
-        
-        return self._save_plot('metrics')
+    @LoggerService.log_function(level='info')
+    def plot_accuracy_comparison(self, model_results):
+        """Generate accuracy comparison bar plot"""
+        return self._render(self.accuracy_job(model_results))
+
+    @LoggerService.log_function(level='info')
+    def plot_metrics_comparison(self, model_results):
+        """Generate detailed metrics comparison plot"""
+        return self._render(self.metrics_job(model_results))
 
     @LoggerService.log_function(level='info')
     def plot_confidence_distributions(self, model_results):
         """Generate confidence distribution comparison plot"""
-        plt.figure(figsize=(12, 6))
-        
-        for model_name, results in model_results.items():
-            confidences = [result['confidence'] 
-                         for result in results['raw_results'].values()]
-            plt.hist(confidences, bins=20, alpha=0.5, label=model_name)
+        return self._render(self.confidence_job(model_results))
 
-        plt.xlabel('Confidence Score')
-        plt.ylabel('Frequency')
-        plt.title('Confidence Distribution Comparison')
-        plt.legend()
-        plt.tight_layout()
-        
-        return self._save_plot('confidence')
+    @LoggerService.log_function(level='info')
+    def plot_coverage_comparison(self, model_results):
+        """Generate the coverage vs accuracy-on-covered curves of the confidence threshold sweep"""
+        return self._render(self.coverage_job(model_results))
 
     @LoggerService.log_function(level='info')
-    def generate_all_comparison_plots(self, model_results):
+    def generate_all_comparison_plots(self, model_results, parallel=None):
         """Generate all comparison plots"""
         try:
-            return {
-                'accuracy': self.plot_accuracy_comparison(model_results),
-                'metrics': self.plot_metrics_comparison(model_results),
-                'confidence': self.plot_confidence_distributions(model_results)
-            }
+            jobs = [
+                self.accuracy_job(model_results),
+                self.metrics_job(model_results),
+                self.confidence_job(model_results),
+                self.coverage_job(model_results)
+            ]
+            if parallel is None:
+                parallel = self.config.output_config.get('plot_render_mode', 'serial') == 'parallel'
+            return run_plot_jobs(jobs, parallel, self.config.output_config.get('plot_workers'))
         except Exception as e:
             self.logger.error(f"Error generating comparison plots: {str(e)}")
             raise
@@ -0,0 +1,201 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from matplotlib.artist import setp
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from logger_service.logger import LoggerService
+from logger_service.tracer import Tracer
+
+
+# Each render_* function draws one figure with the object-oriented Figure API
+# on an Agg canvas. They touch no pyplot global state and take only plain
+# arrays, so they can run in any process.
+
+class PlotJob:
+    """A render function plus its arguments and the web path it produces"""
+
+    def __init__(self, key, func, path, web_path, **kwargs):
+        self.key = key
+        self.func = func
+        self.path = path
+        self.web_path = web_path
+        self.kwargs = kwargs
+
+
+def _new_figure(figsize):
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def render_confusion_matrix(path, title, cm, categories):
+    fig = _new_figure((12, 8))
+    ax = fig.add_subplot()
+    image = ax.imshow(cm, interpolation='nearest', cmap='Blues')
+    ax.set_title(title)
+    fig.colorbar(image, ax=ax)
+
+    tick_marks = np.arange(len(categories))
+    ax.set_xticks(tick_marks)
+    ax.set_xticklabels(categories, rotation=45, ha='right')
+    ax.set_yticks(tick_marks)
+    ax.set_yticklabels(categories)
+
+    for i in range(len(categories)):
+        for j in range(len(categories)):
+            ax.text(j, i, str(cm[i][j]),
+                    horizontalalignment='center',
+                    verticalalignment='center')
+
+    ax.set_ylabel('True Label')
+    ax.set_xlabel('Predicted Label')
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def render_roc_curves(path, title, curves):
+    """curves: list of (category, fpr, tpr, auc)"""
+    fig = _new_figure((10, 8))
+    ax = fig.add_subplot()
+    for category, fpr, tpr, roc_auc in curves:
+        ax.plot(fpr, tpr, label=f'{category} (AUC = {roc_auc:.2f})')
+
+    ax.plot([0, 1], [0, 1], 'k--')
+    ax.set_xlabel('False Positive Rate')
+    ax.set_ylabel('True Positive Rate')
+    ax.set_title(title)
+    ax.legend(loc='lower right', bbox_to_anchor=(1.6, 0))
+    fig.savefig(path)
+
+
+def render_precision_recall_curves(path, title, curves):
+    """curves: list of (category, precision, recall, average_precision)"""
+    fig = _new_figure((10, 8))
+    ax = fig.add_subplot()
+    for category, precision, recall, average_precision in curves:
+        ax.plot(recall, precision, label=f'{category} (AP = {average_precision:.2f})')
+
+    ax.set_xlabel('Recall')
+    ax.set_ylabel('Precision')
+    ax.set_title(title)
+    ax.legend(loc='lower right', bbox_to_anchor=(1.6, 0))
+    fig.savefig(path)
+
+
+def render_confidence_histogram(path, title, confidences):
+    fig = _new_figure((10, 6))
+    ax = fig.add_subplot()
+    ax.hist(confidences, bins=20, edgecolor='black')
+    ax.set_xlabel('Confidence Score')
+    ax.set_ylabel('Frequency')
+    ax.set_title(title)
+    fig.savefig(path)
+
+
+def render_accuracy_comparison(path, models, accuracies):
+    fig = _new_figure((10, 6))
+    ax = fig.add_subplot()
+    bars = ax.bar(models, accuracies)
+    ax.set_title('Model Accuracy Comparison')
+    ax.set_xlabel('Model')
+    ax.set_ylabel('Accuracy')
+    setp(ax.get_xticklabels(), rotation=45, ha='right')
+
+    # Add value labels on top of bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{height:.2%}',
+                ha='center', va='bottom')
+
+    fig.tight_layout()
+    fig.savefig(path, bbox_inches='tight')
+
+
+def render_metrics_comparison(path, models, metrics, data):
+    fig = _new_figure((12, 6))
+    ax = fig.add_subplot()
+    x = np.arange(len(models))
+    width = 0.25
+
+    # Plot bars for each metric
+    for i, metric in enumerate(metrics):
+        ax.bar(x + i*width, data[metric], width, label=metric.capitalize())
+
+    ax.set_xlabel('Models')
+    ax.set_ylabel('Score')
+    ax.set_title('Model Performance Metrics Comparison')
+    ax.set_xticks(x + width)
+    ax.set_xticklabels(models, rotation=45, ha='right')
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, bbox_inches='tight')
+
+
+def render_confidence_comparison(path, series):
+    """series: list of (model name, confidences)"""
+    fig = _new_figure((12, 6))
+    ax = fig.add_subplot()
+    for model_name, confidences in series:
+        ax.hist(confidences, bins=20, alpha=0.5, label=model_name)
+
+    ax.set_xlabel('Confidence Score')
+    ax.set_ylabel('Frequency')
+    ax.set_title('Confidence Distribution Comparison')
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, bbox_inches='tight')
+
+
+def render_coverage_comparison(path, series):
+    """series: list of (model name, coverage, accuracy on covered, recommended point or None)"""
+    fig = _new_figure((12, 6))
+    ax = fig.add_subplot()
+    for model_name, coverage, accuracy, recommended in series:
+        line, = ax.plot(coverage, accuracy, label=model_name)
+        if recommended:
+            ax.scatter([recommended['coverage']], [recommended['accuracy']], color=line.get_color(), zorder=3)
+            ax.annotate(f"t={recommended['threshold']:.2f}", (recommended['coverage'], recommended['accuracy']),
+                        textcoords='offset points', xytext=(4, 4))
+
+    ax.set_xlabel('Coverage')
+    ax.set_ylabel('Accuracy on Covered')
+    ax.set_title('Coverage vs Accuracy by Confidence Threshold')
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(path, bbox_inches='tight')
+
+
+def _run_job(job):
+    with Tracer().span(f'plot:{job.key}'):
+        job.func(job.path, **job.kwargs)
+    return job.web_path
+
+
+def _run_job_in_worker(job):
+    web_path = _run_job(job)
+    return web_path, Tracer().drain() if Tracer.enabled else []
+
+
+def run_plot_jobs(jobs, parallel=False, max_workers=None):
+    """Render jobs serially or on a process pool; returns {job key: web path}"""
+    if not parallel or len(jobs) < 2:
+        return {job.key: _run_job(job) for job in jobs}
+
+    max_workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=LoggerService.init_worker,
+        initargs=(LoggerService.worker_queue(),)
+    ) as executor:
+        outcomes = list(executor.map(_run_job_in_worker, jobs))
+
+    tracer = Tracer()
+    web_paths = {}
+    for job, (web_path, spans) in zip(jobs, outcomes):
+        for span in spans:
+            span['model'] = span['model'] or tracer.model
+        tracer.extend(spans)
+        web_paths[job.key] = web_path
+    return web_paths
@@ -0,0 +1,109 @@
+import numpy as np
+
+# Categories are sorted in blocks of about this many scores, which bounds
+# the temporary arrays to a few hundred MB whatever N x C is.
+BLOCK_ELEMENTS = 1 << 22
+DECIMALS = 4
+
+
+def column_blocks(n_rows, n_columns, block_elements=BLOCK_ELEMENTS):
+    """Consecutive (start, stop) column ranges holding about ``block_elements`` scores each"""
+    step = max(1, block_elements // max(1, n_rows))
+    for start in range(0, n_columns, step):
+        yield start, min(n_columns, start + step)
+
+
+def _downsample(x, y, max_points):
+    """At most ``max_points`` points of a curve, always keeping both ends"""
+    if max_points and len(x) > max_points:
+        keep = np.unique(np.linspace(0, len(x) - 1, max_points).round().astype(int))
+        x, y = x[keep], y[keep]
+    return x, y
+
+
+def _block_curves(scores, positives):
+    """Sort-and-cumsum over every row of a (categories, N) block at once.
+
+    Returns the descending-score cumulative true/false positive counts, a
+    mask marking the last position of each run of tied scores (the distinct
+    thresholds), and the per-category AUC and average-precision sums.
+    """
+    n_rows = scores.shape[1]
+    # Tied scores are collapsed through ``distinct``, so an unstable sort is fine
+    order = np.argsort(-scores, axis=1)
+    sorted_scores = np.take_along_axis(scores, order, axis=1)
+    true_positives = np.cumsum(np.take_along_axis(positives, order, axis=1), axis=1, dtype=np.int64)
+    false_positives = np.arange(1, n_rows + 1, dtype=np.int64)[None, :] - true_positives
+
+    distinct = np.ones_like(positives)
+    distinct[:, :-1] = sorted_scores[:, :-1] != sorted_scores[:, 1:]
+
+    # Counts only grow along a row, so the running max over the distinct
+    # positions before this one is the previous point on the curve.
+    def previous(counts):
+        result = np.zeros_like(counts)
+        result[:, 1:] = np.maximum.accumulate(np.where(distinct, counts, 0), axis=1)[:, :-1]
+        return result
+
+    previous_tp = previous(true_positives)
+    previous_fp = previous(false_positives)
+    trapezoids = np.where(distinct, (false_positives - previous_fp) * (true_positives + previous_tp), 0)
+    precision = true_positives / np.arange(1, n_rows + 1, dtype=np.float64)[None, :]
+    ap_steps = np.where(distinct, (true_positives - previous_tp) * precision, 0.0)
+    return true_positives, false_positives, distinct, trapezoids.sum(axis=1) / 2.0, ap_steps.sum(axis=1)
+
+
+def one_vs_rest_curves(scores, true_codes, categories, max_points=200, block_elements=BLOCK_ELEMENTS):
+    """One-vs-rest ROC and precision-recall curves for every scored category.
+
+    ``scores`` is the (N, C) per-category score matrix (it may be a
+    memmap), ``true_codes`` index ``categories`` and any code >= C is a
+    negative for every column. All columns of a block are sorted once and
+    AUC / average precision come from cumulative sums over the sorted
+    labels, matching sklearn's ``roc_auc_score`` and
+    ``average_precision_score``. Curves are downsampled to ``max_points``.
+
+    Returns ``{category: {'auc', 'average_precision', 'roc', 'precision_recall'}}``
+    for categories with at least one positive and one negative row.
+    """
+    true_codes = np.asarray(true_codes, dtype=np.int64)
+    n_rows, n_columns = scores.shape
+    curves = {}
+    for start, stop in column_blocks(n_rows, n_columns, block_elements):
+        # Category-major copy, so every sort and cumsum runs over contiguous memory
+        block = np.ascontiguousarray(np.asarray(scores[:, start:stop], dtype=np.float32).T)
+        positives = np.arange(start, stop)[:, None] == true_codes[None, :]
+        n_positive = positives.sum(axis=1)
+        n_negative = n_rows - n_positive
+        true_positives, false_positives, distinct, area, ap = _block_curves(block, positives)
+
+        for column in np.flatnonzero((n_positive > 0) & (n_negative > 0)).tolist():
+            thresholds = np.flatnonzero(distinct[column])
+            tp = true_positives[column, thresholds]
+            fpr = np.concatenate(([0.0], false_positives[column, thresholds] / n_negative[column]))
+            tpr = np.concatenate(([0.0], tp / n_positive[column]))
+            recall = tpr
+            precision = np.concatenate(([1.0], tp / (thresholds + 1.0)))
+            fpr, tpr = _downsample(fpr, tpr, max_points)
+            recall, precision = _downsample(recall, precision, max_points)
+            curves[categories[start + column]] = {
+                'auc': float(format(area[column] / (n_positive[column] * n_negative[column]), f'.{DECIMALS}f')),
+                'average_precision': float(format(ap[column] / n_positive[column], f'.{DECIMALS}f')),
+                'roc': {'fpr': fpr, 'tpr': tpr},
+                'precision_recall': {'recall': recall, 'precision': precision}
+            }
+    return dict(sorted(curves.items()))
+
+
+def summarize_curves(curves):
+    """The final_results entry: macro-averaged AUC / average precision plus every category's curves"""
+    macro = {
+        metric: float(format(np.mean([curve[metric] for curve in curves.values()]), f'.{DECIMALS}f'))
+        if curves else None
+        for metric in ('auc', 'average_precision')
+    }
+    return {
+        'macro_auc': macro['auc'],
+        'macro_average_precision': macro['average_precision'],
+        'per_category': curves
+    }
@@ -0,0 +1,106 @@
+import numpy as np
+from results_validator.similarity_engine import SimilarityEngine
+from embedding_manager.embedding_store import quantize_int8
+
+STORAGE_TYPES = ('float32', 'float16', 'int8')
+REDUCTIONS = ('pca', 'prefix')
+# Keyword columns upcast per matmul, so compressed matrices are never expanded whole
+KEYWORD_BLOCK_ROWS = 8192
+# Largest exact integer in float32 (2 ** 24)
+FLOAT32_EXACT_INT = 1 << 24
+
+
+def parse_compression_mode(mode):
+    """Split a mode such as 'int8', 'pca' or 'pca+int8' into (reduction, storage type)"""
+    reduction, storage = None, 'float32'
+    for part in mode.split('+'):
+        if part in REDUCTIONS and reduction is None:
+            reduction = part
+        elif part in STORAGE_TYPES:
+            storage = part
+        else:
+            raise ValueError(f"Unknown compression mode '{mode}'. Use {REDUCTIONS}, {STORAGE_TYPES} or 'reduction+type'")
+    return reduction, storage
+
+
+def integer_dot(query_codes, keyword_codes):
+    """Exact int8 x int8 dot products.
+
+    Products of int8 values are summed exactly in float32 as long as the total
+    cannot exceed 2**24, which lets BLAS do the work; larger dimensions fall
+    back to int32 accumulation.
+    """
+    dim = query_codes.shape[1]
+    if dim * 127 * 127 < FLOAT32_EXACT_INT:
+        return query_codes.astype(np.float32) @ keyword_codes.astype(np.float32).T
+    return (query_codes.astype(np.int32) @ keyword_codes.astype(np.int32).T).astype(np.float32)
+
+
+class CompressedSimilarityEngine(SimilarityEngine):
+    """SimilarityEngine over a compressed keyword matrix.
+
+    The optional reduction (PCA or prefix truncation to ``target_dim``) is
+    fitted on the normalised keyword embeddings and applied to queries, and
+    projected vectors are re-normalised. Keywords are then stored as float16,
+    or as symmetric int8 codes with one scale per row, in which case queries
+    are quantized the same way and scored with integer dot products.
+    """
+
+    def __init__(self, category_embeddings, mode='float16', target_dim=None, block_size=1024):
+        super().__init__(category_embeddings, block_size=block_size)
+        self.mode = mode
+        self.reduction, self.storage = parse_compression_mode(mode)
+        self.mean = None
+        self.components = None
+        self.target_dim = self.keyword_matrix.shape[1]
+        self.keyword_scales = None
+
+        matrix = self.keyword_matrix
+        if self.reduction is not None:
+            matrix = self._fit_reduction(matrix, target_dim)
+        if self.storage == 'int8':
+            self.keyword_matrix, self.keyword_scales = quantize_int8(matrix)
+        else:
+            self.keyword_matrix = np.ascontiguousarray(matrix, dtype=self.storage)
+
+    def _fit_reduction(self, matrix, target_dim):
+        self.target_dim = max(1, min(int(target_dim or matrix.shape[1]), matrix.shape[1]))
+        if self.reduction == 'pca':
+            self.mean = matrix.mean(axis=0)
+            _, _, components = np.linalg.svd(matrix - self.mean, full_matrices=False)
+            # PCA cannot yield more directions than there are keywords
+            self.components = np.ascontiguousarray(components[:self.target_dim].T, dtype=np.float32)
+            self.target_dim = self.components.shape[1]
+        return self.normalize(self.project(matrix))
+
+    def project(self, vectors):
+        if self.reduction == 'pca':
+            return (vectors - self.mean) @ self.components
+        if self.reduction == 'prefix':
+            return vectors[:, :self.target_dim]
+        return vectors
+
+    @property
+    def nbytes(self):
+        """Bytes held for scoring: keyword matrix, scales and projection"""
+        arrays = [self.keyword_matrix, self.keyword_scales, self.mean, self.components]
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def score_block(self, query_block):
+        queries = self.normalize(query_block, self.dtype)
+        if self.reduction is not None:
+            queries = self.normalize(self.project(queries), self.dtype)
+        if self.storage == 'int8':
+            query_codes, query_scales = quantize_int8(queries)
+
+        keyword_scores = np.empty((len(queries), len(self.keyword_matrix)), dtype=np.float32)
+        for start in range(0, len(self.keyword_matrix), KEYWORD_BLOCK_ROWS):
+            stop = start + KEYWORD_BLOCK_ROWS
+            if self.storage == 'int8':
+                keyword_scores[:, start:stop] = (
+                    integer_dot(query_codes, self.keyword_matrix[start:stop])
+                    * query_scales[:, None] * self.keyword_scales[None, start:stop]
+                )
+            else:
+                keyword_scores[:, start:stop] = queries @ self.keyword_matrix[start:stop].astype(np.float32).T
+        return np.maximum.reduceat(keyword_scores, self.category_offsets[:-1], axis=1)
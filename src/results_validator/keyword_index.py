@@ -0,0 +1,367 @@
+import os
+import time
+import numpy as np
+from logger_service.logger import LoggerService
+from results_validator.similarity_engine import SimilarityEngine
+from results_validator.similarity_results import SimilarityResults
+
+EXACT_BACKEND = 'exact'
+IVF_BACKEND = 'ivf'
+
+
+def _merge_top_k(best_scores, best_rows, scores, rows, k):
+    """Keep the k highest scores per query out of the current best and a new candidate block"""
+    scores = np.concatenate([best_scores, scores], axis=1)
+    rows = np.concatenate([best_rows, rows], axis=1)
+    if scores.shape[1] > k:
+        keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, keep, axis=1)
+        rows = np.take_along_axis(rows, keep, axis=1)
+    return scores, rows
+
+
+def _sort_top_k(scores, rows):
+    """Order each query's hits by descending score, then ascending row"""
+    order = np.lexsort((rows, -scores))
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(rows, order, axis=1)
+
+
+class KeywordIndex:
+    """Top-k cosine search over keyword embeddings tagged with their category.
+
+    Vectors are L2-normalised on ``add`` and kept in one growable matrix;
+    row ``i`` belongs to ``keywords[i]`` and ``categories[category_codes[i]]``.
+    Subclasses implement ``_search`` and may react to appended rows in
+    ``_rows_added``. ``best_matches`` makes any index a drop-in replacement
+    for ``SimilarityEngine``.
+    """
+
+    backend = None
+
+    def __init__(self, block_size=1024, dtype=np.float32):
+        self.logger = LoggerService()
+        self.block_size = max(1, int(block_size))
+        self.dtype = dtype
+        self.keywords = []
+        self.categories = []
+        self.category_codes = np.empty(0, dtype=np.int32)
+        self._buffer = None
+        self.size = 0
+
+    @property
+    def vectors(self):
+        if self._buffer is None:
+            return np.empty((0, 0), dtype=self.dtype)
+        return self._buffer[:self.size]
+
+    def _append_vectors(self, vectors):
+        needed = self.size + len(vectors)
+        if self._buffer is None:
+            self._buffer = np.empty((max(needed, 1), vectors.shape[1]), dtype=self.dtype)
+        elif needed > len(self._buffer):
+            # Grow geometrically so repeated appends stay amortised O(1) per row
+            grown = np.empty((max(needed, 2 * len(self._buffer)), self._buffer.shape[1]), dtype=self.dtype)
+            grown[:self.size] = self._buffer[:self.size]
+            self._buffer = grown
+        self._buffer[self.size:needed] = vectors
+        self.size = needed
+
+    def add(self, vectors, keywords, categories):
+        """Append keyword vectors; ``categories`` names the category of each row"""
+        if len(keywords) == 0:
+            return self
+        vectors = SimilarityEngine.normalize(vectors, self.dtype)
+        if not (len(vectors) == len(keywords) == len(categories)):
+            raise ValueError("vectors, keywords and categories must have the same length")
+        # Register new categories in order of first appearance, like SimilarityEngine
+        for category in dict.fromkeys(categories):
+            if category not in self.categories:
+                self.categories.append(category)
+        codes = SimilarityResults.encode_labels(list(categories), self.categories)
+
+        start = self.size
+        self._append_vectors(vectors)
+        self.keywords.extend(keywords)
+        self.category_codes = np.concatenate([self.category_codes, codes])
+        self._rows_added(start)
+        return self
+
+    def add_category_embeddings(self, category_embeddings, category_keywords=None):
+        """Append an EmbeddingManager-style {category: [vectors]} mapping"""
+        category_keywords = category_keywords or {}
+        vectors, keywords, categories = [], [], []
+        for category, embeddings in category_embeddings.items():
+            block = np.atleast_2d(np.asarray(embeddings, dtype=self.dtype)) if len(embeddings) else []
+            names = list(category_keywords.get(category, []))
+            if len(names) != len(block):
+                names = [f"{category}#{row}" for row in range(len(block))]
+            vectors.extend(block)
+            keywords.extend(names)
+            categories.extend([category] * len(block))
+        if not vectors:
+            raise ValueError("No category embeddings available for the keyword index")
+        return self.add(np.asarray(vectors), keywords, categories)
+
+    def _rows_added(self, start):
+        pass
+
+    def _search(self, queries, k):
+        raise NotImplementedError
+
+    def search(self, query_matrix, k=1):
+        """Return (scores, rows), each (n_queries, k), best first; missing hits have row -1"""
+        k = max(1, int(k))
+        n_queries = len(query_matrix)
+        all_scores = np.full((n_queries, k), -np.inf, dtype=self.dtype)
+        all_rows = np.full((n_queries, k), -1, dtype=np.int64)
+        for start in range(0, n_queries, self.block_size):
+            queries = SimilarityEngine.normalize(query_matrix[start:start + self.block_size], self.dtype)
+            scores, rows = _sort_top_k(*self._search(queries, k))
+            all_scores[start:start + len(queries)] = scores
+            all_rows[start:start + len(queries)] = rows
+        return all_scores, all_rows
+
+    def top_k(self, query_matrix, k=5):
+        """Per query, a list of (keyword, category, score) tuples, best first"""
+        scores, rows = self.search(query_matrix, k)
+        return [
+            [
+                (self.keywords[row], self.categories[self.category_codes[row]], float(score))
+                for score, row in zip(query_scores, query_rows) if row >= 0
+            ]
+            for query_scores, query_rows in zip(scores.tolist(), rows.tolist())
+        ]
+
+    def best_matches(self, query_matrix):
+        """Return the category index of the best keyword and its score for every query"""
+        scores, rows = self.search(query_matrix, 1)
+        rows, best_scores = rows[:, 0], scores[:, 0]
+        missing = rows < 0
+        if missing.any():
+            # Same masking as knn_vote: category 0 with a -inf score, never the last keyword's category
+            self.logger.warning(
+                f"{int(missing.sum())} of {len(rows)} queries matched no keyword in the {self.backend} index"
+            )
+        return np.where(missing, 0, self.category_codes[np.maximum(rows, 0)]).astype(np.int64), best_scores
+
+    def _state(self):
+        return {}
+
+    def _load_state(self, data):
+        pass
+
+    def save(self, file_path):
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        with open(file_path, 'wb') as f:
+            np.savez(
+                f,
+                backend=np.array(self.backend),
+                vectors=self.vectors,
+                keywords=np.array(self.keywords, dtype=str),
+                categories=np.array(self.categories, dtype=str),
+                category_codes=self.category_codes,
+                **self._state()
+            )
+        self.logger.info(f"Saved {self.backend} keyword index with {self.size} keywords to {file_path}")
+        return file_path
+
+    @staticmethod
+    def load(file_path, **params):
+        """Load an index written by ``save``, whatever its backend"""
+        with np.load(file_path, allow_pickle=False) as data:
+            index = create_keyword_index(str(data['backend']), **params)
+            index.categories = data['categories'].tolist()
+            index.keywords = data['keywords'].tolist()
+            index.category_codes = data['category_codes'].astype(np.int32)
+            index._buffer = np.array(data['vectors'], dtype=index.dtype)
+            index.size = len(index._buffer)
+            index._load_state(data)
+        return index
+
+
+class ExactKeywordIndex(KeywordIndex):
+    """Brute-force search, tiled over keyword blocks to bound memory"""
+
+    backend = EXACT_BACKEND
+
+    def __init__(self, block_size=1024, keyword_block_size=65536, dtype=np.float32, **_):
+        super().__init__(block_size, dtype)
+        self.keyword_block_size = max(1, int(keyword_block_size))
+
+    def _search(self, queries, k):
+        best_scores = np.empty((len(queries), 0), dtype=self.dtype)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        vectors = self.vectors
+        for start in range(0, self.size, self.keyword_block_size):
+            scores = queries @ vectors[start:start + self.keyword_block_size].T
+            rows = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+            best_scores, best_rows = _merge_top_k(best_scores, best_rows, scores, rows, k)
+        return best_scores, best_rows
+
+
+class IVFKeywordIndex(KeywordIndex):
+    """Inverted-file index: k-means coarse lists, searching the ``nprobe`` closest.
+
+    Lists are trained once, on the first ``add``; later rows are assigned to
+    their nearest existing centroid, so appending never retrains. Raising
+    ``nprobe`` towards ``n_lists`` trades speed for recall (``nprobe ==
+    n_lists`` is exact).
+    """
+
+    backend = IVF_BACKEND
+
+    def __init__(self, block_size=1024, n_lists=None, nprobe=8, seed=0, dtype=np.float32, **_):
+        super().__init__(block_size, dtype)
+        self.n_lists = n_lists
+        self.nprobe = max(1, int(nprobe))
+        self.seed = seed
+        self.centroids = None
+        self.assignments = np.empty(0, dtype=np.int32)
+        self.lists = []
+
+    def _train(self):
+        from sklearn.cluster import MiniBatchKMeans
+
+        n_lists = int(self.n_lists or max(1, round(np.sqrt(self.size))))
+        n_lists = max(1, min(n_lists, self.size))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=self.seed, n_init=3, batch_size=4096)
+        kmeans.fit(self.vectors)
+        self.centroids = SimilarityEngine.normalize(kmeans.cluster_centers_, self.dtype)
+        self.n_lists = n_lists
+        self.lists = [np.empty(0, dtype=np.int64) for _ in range(n_lists)]
+        self.logger.info(f"Trained IVF keyword index: {n_lists} lists over {self.size} keywords")
+
+    def _rows_added(self, start):
+        if self.centroids is None:
+            self._train()
+        new_rows = np.arange(start, self.size)
+        assignments = np.argmax(self.vectors[start:] @ self.centroids.T, axis=1).astype(np.int32)
+        self.assignments = np.concatenate([self.assignments, assignments])
+        for list_id in np.unique(assignments).tolist():
+            self.lists[list_id] = np.concatenate([self.lists[list_id], new_rows[assignments == list_id]])
+
+    def _search(self, queries, k):
+        best_scores = np.full((len(queries), k), -np.inf, dtype=self.dtype)
+        best_rows = np.full((len(queries), k), -1, dtype=np.int64)
+        nprobe = min(self.nprobe, self.n_lists)
+        coarse = queries @ self.centroids.T
+        # Never probe a list k-means left empty
+        coarse[:, [len(rows) == 0 for rows in self.lists]] = -np.inf
+        if nprobe < self.n_lists:
+            probes = np.argpartition(-coarse, nprobe - 1, axis=1)[:, :nprobe]
+        else:
+            probes = np.broadcast_to(np.arange(self.n_lists), (len(queries), self.n_lists))
+
+        vectors = self.vectors
+        for list_id in np.unique(probes).tolist():
+            rows = self.lists[list_id]
+            if len(rows) == 0:
+                continue
+            selected = np.flatnonzero((probes == list_id).any(axis=1))
+            scores = queries[selected] @ vectors[rows].T
+            best_scores[selected], best_rows[selected] = _merge_top_k(
+                best_scores[selected], best_rows[selected],
+                scores, np.broadcast_to(rows, scores.shape), k
+            )
+        return best_scores, best_rows
+
+    def _state(self):
+        return {
+            'centroids': self.centroids,
+            'assignments': self.assignments,
+            'seed': np.array(self.seed)
+        }
+
+    def _load_state(self, data):
+        self.centroids = np.array(data['centroids'], dtype=self.dtype)
+        self.assignments = data['assignments'].astype(np.int32)
+        self.n_lists = len(self.centroids)
+        self.seed = int(data['seed'])
+        order = np.argsort(self.assignments, kind='stable')
+        bounds = np.searchsorted(self.assignments[order], np.arange(self.n_lists + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]].astype(np.int64) for i in range(self.n_lists)]
+
+
+KEYWORD_INDEX_BACKENDS = {
+    EXACT_BACKEND: ExactKeywordIndex,
+    IVF_BACKEND: IVFKeywordIndex,
+}
+
+
+def create_keyword_index(backend, **params):
+    if backend not in KEYWORD_INDEX_BACKENDS:
+        raise ValueError(f"Unknown keyword index backend '{backend}'. Available: {sorted(KEYWORD_INDEX_BACKENDS)}")
+    return KEYWORD_INDEX_BACKENDS[backend](**params)
+
+
+def load_or_build_keyword_index(file_path, backend, category_embeddings, category_keywords=None, **params):
+    """Reuse a persisted index when it covers a prefix of the current keywords.
+
+    Keywords added since it was saved are appended without retraining; any
+    other difference (removed or changed keywords, another backend) rebuilds it.
+    """
+    logger = LoggerService()
+    current = create_keyword_index(backend, **params)
+    # Flatten the current keywords once, via a throwaway exact index
+    flat = ExactKeywordIndex(dtype=current.dtype).add_category_embeddings(category_embeddings, category_keywords)
+    flat_categories = [flat.categories[code] for code in flat.category_codes.tolist()]
+
+    if file_path and os.path.exists(file_path):
+        try:
+            stored = KeywordIndex.load(file_path, **params)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable keyword index {file_path}: {str(e)}")
+            stored = None
+        if stored is not None and stored.backend == backend and stored.size <= flat.size:
+            prefix = stored.size
+            stored_categories = [stored.categories[code] for code in stored.category_codes.tolist()]
+            if (stored.keywords == flat.keywords[:prefix]
+                    and stored_categories == flat_categories[:prefix]
+                    and np.allclose(stored.vectors, flat.vectors[:prefix], atol=1e-6)):
+                if prefix < flat.size:
+                    stored.add(flat.vectors[prefix:], flat.keywords[prefix:], flat_categories[prefix:])
+                    logger.info(f"Appended {flat.size - prefix} new keywords to {file_path}")
+                    stored.save(file_path)
+                return stored
+        logger.info(f"Keyword index {file_path} is stale; rebuilding")
+
+    current.add(flat.vectors, flat.keywords, flat_categories)
+    if file_path:
+        current.save(file_path)
+    return current
+
+
+def _top_categories(index, rows):
+    """Category of each query's best hit, None where the query matched nothing"""
+    return [index.categories[index.category_codes[row]] if row >= 0 else None for row in rows[:, 0].tolist()]
+
+
+def measure_recall(index, exact_index, query_matrix, k):
+    """Recall@k of ``index`` against exact search, plus per-query latency of both"""
+    start = time.perf_counter()
+    _, exact_rows = exact_index.search(query_matrix, k)
+    exact_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    _, rows = index.search(query_matrix, k)
+    index_seconds = time.perf_counter() - start
+
+    hits = sum(
+        len(set(expected[expected >= 0].tolist()) & set(found.tolist()))
+        for expected, found in zip(exact_rows, rows)
+    )
+    expected_total = int((exact_rows >= 0).sum())
+    n_queries = max(1, len(query_matrix))
+    return {
+        'backend': index.backend,
+        'k': k,
+        'queries': len(query_matrix),
+        'keywords': index.size,
+        'recall_at_k': hits / expected_total if expected_total else None,
+        'top1_category_agreement': float(np.mean([
+            expected == found
+            for expected, found in zip(_top_categories(exact_index, exact_rows), _top_categories(index, rows))
+        ])) if len(query_matrix) else None,
+        'no_match_queries': int((rows[:, 0] < 0).sum()),
+        'exact_ms_per_query': 1000 * exact_seconds / n_queries,
+        'index_ms_per_query': 1000 * index_seconds / n_queries
+    }
@@ -0,0 +1,137 @@
+import numpy as np
+from results_validator.similarity_results import SimilarityResults
+
+# Confidences are rounded to 5 decimals, so a histogram at that resolution
+# over [-1, 1] gives an exact median in bounded memory.
+CONFIDENCE_SCALE = 100000
+
+
+class MetricsAccumulator:
+    """Folds batches of predictions into the statistics behind final_results.
+
+    Only an integer-coded confusion matrix over ``categories`` and a
+    confidence histogram are kept, so memory does not grow with the number
+    of transactions. Accumulators built on different shards or processes
+    can be combined with ``merge``; every metric is then derived from the
+    matrix in O(C^2).
+    """
+
+    def __init__(self, categories=None):
+        self.categories = list(categories or [])
+        self.counts = np.zeros((len(self.categories), len(self.categories)), dtype=np.int64)
+        self.confidence_count = 0
+        self.confidence_sum = 0.0
+        self.confidence_min = None
+        self.confidence_max = None
+        self.confidence_histogram = np.zeros(2 * CONFIDENCE_SCALE + 1, dtype=np.int64)
+
+    def encode(self, labels):
+        """Codes for label strings, extending the category vocabulary as needed"""
+        return SimilarityResults.encode_labels(labels, self.categories)
+
+    def _grow(self):
+        size = len(self.categories)
+        if self.counts.shape[0] < size:
+            counts = np.zeros((size, size), dtype=np.int64)
+            counts[:self.counts.shape[0], :self.counts.shape[1]] = self.counts
+            self.counts = counts
+
+    def update(self, true_codes, pred_codes, confidences):
+        """Add a batch of coded predictions; codes index ``self.categories``"""
+        self._grow()
+        size = len(self.categories)
+        true_codes = np.asarray(true_codes, dtype=np.int64)
+        pred_codes = np.asarray(pred_codes, dtype=np.int64)
+        self.counts += np.bincount(true_codes * size + pred_codes, minlength=size * size).reshape(size, size)
+        self._update_confidences(confidences)
+
+    def update_results(self, results):
+        """Add a SimilarityResults batch that carries true-label codes"""
+        codes = self.encode(results.categories).astype(np.int64)
+        self.update(codes[results.true_codes], codes[results.predicted], results.rounded_confidences())
+
+    def _update_confidences(self, confidences):
+        confidences = np.asarray(confidences, dtype=np.float64)
+        if confidences.size == 0:
+            return
+        self.confidence_count += confidences.size
+        self.confidence_sum += float(confidences.sum())
+        batch_min, batch_max = float(confidences.min()), float(confidences.max())
+        self.confidence_min = batch_min if self.confidence_min is None else min(self.confidence_min, batch_min)
+        self.confidence_max = batch_max if self.confidence_max is None else max(self.confidence_max, batch_max)
+        bins = np.clip(np.rint(confidences * CONFIDENCE_SCALE), -CONFIDENCE_SCALE, CONFIDENCE_SCALE).astype(np.int64)
+        self.confidence_histogram += np.bincount(bins + CONFIDENCE_SCALE, minlength=self.confidence_histogram.size)
+
+    def merge(self, other):
+        """Fold another accumulator (e.g. from another shard) into this one"""
+        codes = self.encode(other.categories)
+        self._grow()
+        rows = codes[:other.counts.shape[0]]
+        np.add.at(self.counts, (rows[:, None], rows[None, :]), other.counts)
+
+        if other.confidence_count:
+            self.confidence_count += other.confidence_count
+            self.confidence_sum += other.confidence_sum
+            self.confidence_min = other.confidence_min if self.confidence_min is None else min(self.confidence_min, other.confidence_min)
+            self.confidence_max = other.confidence_max if self.confidence_max is None else max(self.confidence_max, other.confidence_max)
+            self.confidence_histogram += other.confidence_histogram
+        return self
+
+    def _present_codes(self):
+        """Codes seen as a true or predicted label, in category name order"""
+        present = np.flatnonzero(self.counts.sum(axis=0) + self.counts.sum(axis=1))
+        return sorted(present.tolist(), key=lambda code: self.categories[code])
+
+    def _median_confidence(self):
+        cumulative = np.cumsum(self.confidence_histogram)
+        n = self.confidence_count
+        lower = np.searchsorted(cumulative, (n - 1) // 2 + 1)
+        upper = np.searchsorted(cumulative, n // 2 + 1)
+        return ((lower + upper) / 2 - CONFIDENCE_SCALE) / CONFIDENCE_SCALE
+
+    def accuracy(self):
+        total = self.counts.sum()
+        return {
+            'accuracy': float(format(np.trace(self.counts) / total, '.4f'))
+        }
+
+    def precision_recall_f1(self):
+        """Support-weighted precision, recall and F1 (undefined ratios count as 0)"""
+        true_positives = np.diag(self.counts).astype(np.float64)
+        support = self.counts.sum(axis=1)
+        predicted = self.counts.sum(axis=0)
+        precision = np.divide(true_positives, predicted, out=np.zeros_like(true_positives), where=predicted > 0)
+        recall = np.divide(true_positives, support, out=np.zeros_like(true_positives), where=support > 0)
+        denominator = precision + recall
+        f1 = np.divide(2 * precision * recall, denominator, out=np.zeros_like(true_positives), where=denominator > 0)
+        weights = support / support.sum()
+
+        return {
+            'precision': float(format(np.dot(weights, precision), '.4f')),
+            'recall': float(format(np.dot(weights, recall), '.4f')),
+            'f1_score': float(format(np.dot(weights, f1), '.4f'))
+        }
+
+    def confusion_matrix(self):
+        codes = self._present_codes()
+        return {
+            'confusion_matrix': self.counts[np.ix_(codes, codes)].tolist(),
+            'categories': [self.categories[code] for code in codes]
+        }
+
+    def confidence_stats(self):
+        return {
+            'mean_confidence': float(format(self.confidence_sum / self.confidence_count, '.4f')),
+            'median_confidence': float(format(self._median_confidence(), '.4f')),
+            'min_confidence': float(format(self.confidence_min, '.4f')),
+            'max_confidence': float(format(self.confidence_max, '.4f'))
+        }
+
+    def evaluate(self):
+        """Build the final_results dict evaluate_all_metrics returns"""
+        return {
+            'basic_metrics': self.accuracy(),
+            'detailed_metrics': self.precision_recall_f1(),
+            'confidence_stats': self.confidence_stats(),
+            'confusion_matrix_data': self.confusion_matrix()
+        }
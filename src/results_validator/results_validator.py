@@ -1,154 +1,460 @@
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.metrics import accuracy_score, precision_recall_fscore_support, confusion_matrix
+import os
+import tempfile
+import time
 import numpy as np
 from logger_service.logger import LoggerService
+from logger_service.tracer import Tracer
 from configuration_manager.config_manager import ConfigManager
-import json
+from results_validator.similarity_engine import SimilarityEngine
+from results_validator.keyword_index import EXACT_BACKEND, load_or_build_keyword_index, measure_recall
+from results_validator.embedding_compression import CompressedSimilarityEngine
+from results_validator.scoring_strategies import MAX_KEYWORD_STRATEGY, build_scoring_strategy
+from results_validator.similarity_results import SimilarityResults, IndexedView
+from results_validator.transaction_reader import TransactionReader
+from results_validator.metrics_accumulator import MetricsAccumulator
+from results_validator.curve_metrics import one_vs_rest_curves, summarize_curves
+from results_validator.threshold_sweep import summarize_sweep, sweep_thresholds
+from results_validator.text_normalizer import collapse_texts, configured_normalizer, dedup_stats
+from results_validator.categories import ExpenseCategory
 
 class ResultsValidator:
-    def __init__(self, model_manager):
+    def __init__(self, model_manager, streaming=False):
+        self.model_manager = model_manager
         self.model = model_manager.model
         self.category_embeddings = model_manager.embeddings
         self.logger = LoggerService()
         self.config = ConfigManager()
-        self.query_vectors = {}
-        self.test_transactions = self._load_test_transactions()
-        self.true_labels = self._load_true_labels()
+        # One row per unique normalized text; query_rows maps each transaction to its row
+        self.query_matrix = None
+        self.query_rows = None
+        self.dedup_stats = None
+        self.texts = []
+        self.labels = []
+        # Streaming mode reads the transactions file chunk by chunk instead
+        if not streaming:
+            self.texts, self.labels = self._load_transactions()
 
-    @LoggerService.log_function(level='info')
-    def _load_test_transactions(self):
-        """Load test transactions (keys) from config file path"""
-        transactions_file = self.config.test_data_config['transactions_file']
-        with open(transactions_file, 'r') as f:
-            data = json.load(f)
-        # Extract transaction texts (keys) and assign numeric indices
-        return {str(idx): text for idx, text in enumerate(data.keys())}
+    @property
+    def test_transactions(self):
+        return IndexedView(self.texts)
+
+    @property
+    def true_labels(self):
+        return IndexedView(self.labels)
+
+    @property
+    def query_vectors(self):
+        if self.query_matrix is None:
+            return IndexedView([])
+        return IndexedView(self.query_matrix, self.query_rows)
+
+    def _transaction_reader(self):
+        test_data_config = self.config.test_data_config
+        return TransactionReader(
+            test_data_config['transactions_file'],
+            chunk_size=test_data_config.get('chunk_size', 10000),
+            text_field=test_data_config.get('text_field', 'text'),
+            label_field=test_data_config.get('label_field', 'label')
+        )
 
     @LoggerService.log_function(level='info')
-    def _load_true_labels(self):
-        """Load ground truth labels (values) from the same transactions file"""
-        transactions_file = self.config.test_data_config['transactions_file']
-        with open(transactions_file, 'r') as f:
-            data = json.load(f)
-        # Extract labels (values) and maintain same numeric indices
-        return {str(idx): label for idx, label in enumerate(data.values())}
+    def _load_transactions(self):
+        """Load test transactions and their ground truth labels in a single parse"""
+        pairs = self._transaction_reader().read_all()
+        # Row i of texts and labels is transaction id str(i)
+        texts = [text for text, _ in pairs]
+        labels = [label for _, label in pairs]
+        return texts, labels
+
+    def _collapse_texts(self, texts, normalizer):
+        """(texts to encode, row -> encoded index): exact duplicates always, normalized ones when enabled"""
+        if normalizer is None:
+            return collapse_texts(texts)
+        return normalizer.collapse(texts)
 
     @LoggerService.log_function(level='info')
     def generate_query_vectors(self):
-        """Generate embeddings for test transactions"""
-        self.query_vectors = {
-            trans_id: self.model.encode(trans_text)
-            for trans_id, trans_text in self.test_transactions.items()
-        }
+        """Generate embeddings for test transactions, once per unique normalized text"""
+        unique_texts, self.query_rows = self._collapse_texts(self.texts, configured_normalizer())
+        self.query_matrix = np.asarray(self.model_manager.encode_texts(unique_texts))
+        self.dedup_stats = dedup_stats(len(self.texts), len(unique_texts))
+        self.logger.info(f"Encoded {len(unique_texts)} unique texts for {len(self.texts)} transactions")
         return self.query_vectors
     
     @LoggerService.log_function(level='info')
     def calculate_similarities(self):
         """Calculate cosine similarities between query vectors and category embeddings"""
-        if not self.query_vectors:
+        if self.query_matrix is None:
+            self.generate_query_vectors()
+
+        engine = self._similarity_engine()
+        best_idx, best_scores, scores = self._score_matrix(engine, self.query_matrix, rows=self.query_rows)
+        categories = list(engine.categories)
+        true_codes = SimilarityResults.encode_labels(self.labels, categories)
+        return SimilarityResults(categories, best_idx, best_scores, self.texts, true_codes, scores=scores)
+
+    def _score_matrix(self, engine, query_matrix, spill=True, rows=None):
+        """Best matches plus the (N, C) per-category score matrix, when the engine scores every category.
+
+        Engines without ``iter_blocks`` (keyword indexes, knn_vote) and
+        ``score_matrix.keep: false`` give only the best matches and None.
+        With ``rows`` (transaction -> query_matrix row), each query is scored
+        once and the results are fanned out to one row per transaction.
+        """
+        if rows is not None and len(rows) == len(query_matrix):
+            # Rows are numbered in first-seen order, so no duplicates means the identity
+            rows = None
+        matrix_config = self.config.scoring_config.get('score_matrix', {})
+        if not matrix_config.get('keep', True) or not hasattr(engine, 'iter_blocks'):
+            best_idx, best_scores = engine.best_matches(query_matrix)
+            if rows is not None:
+                best_idx, best_scores = best_idx[rows], best_scores[rows]
+            return best_idx, best_scores, None
+
+        n_queries = len(query_matrix)
+        best_idx = np.empty(n_queries, dtype=np.int64)
+        best_scores = np.empty(n_queries, dtype=np.float32)
+        if rows is None:
+            scores = self._allocate_scores((n_queries, len(engine.categories)), matrix_config if spill else {})
+        else:
+            scores = self._allocate_scores((len(rows), len(engine.categories)), matrix_config if spill else {})
+            # Transactions grouped by query row, so each scored block fans out with one gather
+            order = np.argsort(rows, kind='stable')
+            bounds = np.searchsorted(rows[order], np.arange(n_queries + 1))
+        for start, block in engine.iter_blocks(query_matrix):
+            stop = start + len(block)
+            if rows is None:
+                scores[start:stop] = block
+            else:
+                targets = order[bounds[start]:bounds[stop]]
+                scores[targets] = block[rows[targets] - start]
+            best_idx[start:stop] = np.argmax(block, axis=1)
+            best_scores[start:stop] = block[np.arange(len(block)), best_idx[start:stop]]
+        if rows is not None:
+            best_idx, best_scores = best_idx[rows], best_scores[rows]
+        return best_idx, best_scores, scores
+
+    def _allocate_scores(self, shape, matrix_config):
+        """float32 score matrix, memory-mapped once it would exceed ``spill_mb``"""
+        spill_mb = matrix_config.get('spill_mb')
+        size_mb = shape[0] * shape[1] * np.dtype(np.float32).itemsize / (1024 * 1024)
+        if spill_mb is None or size_mb <= spill_mb:
+            return np.empty(shape, dtype=np.float32)
+        spill_dir = matrix_config.get('spill_dir')
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self.logger.info(f"Spilling the {shape[0]}x{shape[1]} score matrix ({size_mb:.0f} MB) to a memory-mapped file")
+        # An already-unlinked temporary file: the mapping keeps it alive and the OS reclaims it afterwards
+        return np.memmap(tempfile.TemporaryFile(dir=spill_dir), dtype=np.float32, mode='w+', shape=shape)
+
+    def _similarity_engine(self):
+        """The configured scoring strategy; max_keyword may use a keyword index backend"""
+        scoring_config = self.config.scoring_config
+        strategy = scoring_config.get('strategy', MAX_KEYWORD_STRATEGY)
+        if strategy != MAX_KEYWORD_STRATEGY:
+            return self._scoring_strategy(strategy)
+        index_config = scoring_config.get('index', {})
+        if index_config.get('backend', EXACT_BACKEND) == EXACT_BACKEND:
+            return SimilarityEngine(
+                self.category_embeddings,
+                block_size=scoring_config.get('block_size', 1024)
+            )
+        return self._keyword_index(index_config['backend'])
+
+    def _scoring_strategy(self, strategy):
+        centroids = self.model_manager.category_centroids or self.model_manager.compute_centroids()
+        return build_scoring_strategy(strategy, self.category_embeddings, centroids, self.config.scoring_config)
+
+    @LoggerService.log_function(level='info')
+    def compare_strategies(self, strategies=None):
+        """Accuracy, F1 and latency of each scoring strategy on the same query vectors"""
+        strategies = strategies or self.config.scoring_config.get('compare_strategies', [])
+        if not strategies:
+            return None
+        if self.query_matrix is None:
+            self.generate_query_vectors()
+
+        rows = []
+        for strategy in strategies:
+            start = time.perf_counter()
+            engine = self._scoring_strategy(strategy)
+            build_seconds = time.perf_counter() - start
+            accumulator, score_seconds = self._score_engine(engine)
+            rows.append({
+                'strategy': strategy,
+                'accuracy': accumulator.accuracy()['accuracy'],
+                'f1_score': accumulator.precision_recall_f1()['f1_score'],
+                'comparisons': engine.comparisons,
+                'build_ms': 1000 * build_seconds,
+                'ms_per_1k_queries': 1000 * 1000 * score_seconds / max(1, len(self.query_matrix))
+            })
+            self.logger.info(f"Strategy '{strategy}': accuracy {rows[-1]['accuracy']} in {score_seconds:.3f}s")
+        return rows
+
+    def _score_engine(self, engine):
+        """Score the query matrix with ``engine``; return (metrics accumulator, scoring seconds)"""
+        start = time.perf_counter()
+        best_idx, best_scores = engine.best_matches(self.query_matrix)
+        score_seconds = time.perf_counter() - start
+        best_idx, best_scores = best_idx[self.query_rows], best_scores[self.query_rows]
+
+        categories = list(engine.categories)
+        true_codes = SimilarityResults.encode_labels(self.labels, categories)
+        accumulator = MetricsAccumulator()
+        accumulator.update_results(SimilarityResults(categories, best_idx, best_scores, self.texts, true_codes))
+        return accumulator, score_seconds
+
+    @LoggerService.log_function(level='info')
+    def compare_compression(self, modes=None):
+        """Accuracy/F1 delta, memory and scoring speed of compressed keyword matrices vs float32"""
+        compression_config = self.config.scoring_config.get('compression', {})
+        modes = modes or compression_config.get('modes', [])
+        if not modes:
+            return None
+        if self.query_matrix is None:
+            self.generate_query_vectors()
+
+        block_size = self.config.scoring_config.get('block_size', 1024)
+        baseline = SimilarityEngine(self.category_embeddings, block_size=block_size)
+        baseline_metrics, baseline_seconds = self._score_engine(baseline)
+        baseline_accuracy = baseline_metrics.accuracy()['accuracy']
+        baseline_f1 = baseline_metrics.precision_recall_f1()['f1_score']
+
+        rows = []
+        for mode in ['float32'] + list(modes):
+            if mode == 'float32':
+                engine, accumulator, seconds = baseline, baseline_metrics, baseline_seconds
+            else:
+                engine = CompressedSimilarityEngine(
+                    self.category_embeddings, mode, compression_config.get('target_dim'), block_size
+                )
+                accumulator, seconds = self._score_engine(engine)
+            accuracy = accumulator.accuracy()['accuracy']
+            f1_score = accumulator.precision_recall_f1()['f1_score']
+            rows.append({
+                'mode': mode,
+                'dim': engine.keyword_matrix.shape[1],
+                'index_bytes': engine.nbytes,
+                'accuracy': accuracy,
+                'accuracy_delta': float(format(accuracy - baseline_accuracy, '.4f')),
+                'f1_score': f1_score,
+                'f1_delta': float(format(f1_score - baseline_f1, '.4f')),
+                'memory_ratio': baseline.nbytes / engine.nbytes,
+                'speedup': baseline_seconds / seconds if seconds > 0 else None
+            })
+            self.logger.info(f"Compression '{mode}': {engine.nbytes} bytes, accuracy delta {rows[-1]['accuracy_delta']}")
+        return rows
+
+    def _keyword_index_path(self, backend):
+        model_name = self.model_manager.transformer_name.replace('/', '_')
+        return os.path.join(self.config.embeddings_output_dir, f'{model_name}.{backend}.keyword_index.npz')
+
+    @LoggerService.log_function(level='info')
+    def _keyword_index(self, backend, persist=None):
+        """Load the persisted keyword index for this model, appending or rebuilding as needed"""
+        scoring_config = self.config.scoring_config
+        index_config = scoring_config.get('index', {})
+        if persist is None:
+            persist = index_config.get('persist', True)
+        return load_or_build_keyword_index(
+            self._keyword_index_path(backend) if persist else None,
+            backend,
+            self.category_embeddings,
+            self.model_manager.category_keywords,
+            block_size=scoring_config.get('block_size', 1024),
+            n_lists=index_config.get('n_lists'),
+            nprobe=index_config.get('nprobe', 8)
+        )
+
+    @LoggerService.log_function(level='info')
+    def keyword_index_stats(self):
+        """Recall@k and latency of the configured keyword index against exact search"""
+        index_config = self.config.scoring_config.get('index', {})
+        backend = index_config.get('backend', EXACT_BACKEND)
+        if backend == EXACT_BACKEND:
+            return None
+        if self.query_matrix is None:
             self.generate_query_vectors()
-            
-        results = {}
-        for trans_id, query_vector in self.query_vectors.items():
-            category_scores = {}
-            for category, embeddings in self.category_embeddings.items():
-                scores = [
-                    cosine_similarity([query_vector], [kw_emb])[0][0] 
-                    for kw_emb in embeddings
-                ]
-                category_scores[category] = max(scores)
-            
-            best_match = max(category_scores, key=category_scores.get)
-            results[trans_id] = {
-                'category': best_match,
-                'confidence': float(format(float(category_scores[best_match]), '.5f')),
-                'actual_text': self.test_transactions[trans_id]
-            }
-        
+        sample = self.query_matrix[:index_config.get('recall_sample_size', 1000)]
+        stats = measure_recall(
+            self._keyword_index(backend),
+            self._keyword_index(EXACT_BACKEND, persist=False),
+            sample,
+            index_config.get('top_k', 5)
+        )
+        self.logger.info(f"Keyword index recall@{stats['k']}: {stats['recall_at_k']}")
+        return stats
+
+    @LoggerService.log_function(level='info')
+    def evaluate_streaming(self):
+        """Encode, score and fold transactions into the metrics one chunk at a time.
+
+        Peak memory depends on chunk_size, not on the size of the file. Only a
+        uniform reservoir sample of plot_sample_size results (with their score
+        rows) is kept for the plots, the ROC/PR curves and the threshold sweep;
+        the other metrics cover every transaction.
+        Returns (sampled raw results, final_results).
+        """
+        test_data_config = self.config.test_data_config
+        sample_size = test_data_config.get('plot_sample_size', 5000)
+        engine = self._similarity_engine()
+        normalizer = configured_normalizer()
+        accumulator = MetricsAccumulator(engine.categories)
+        rng = np.random.default_rng(0)
+        sample = []
+        seen = 0
+        encoded = 0
+
+        for chunk in self._transaction_reader().iter_chunks():
+            texts = [text for text, _ in chunk]
+            labels = [label for _, label in chunk]
+            # Duplicates are collapsed within each chunk, keeping memory bounded by chunk_size
+            unique_texts, rows = self._collapse_texts(texts, normalizer)
+            best_idx, best_scores, chunk_scores = self._score_matrix(
+                engine, self.model_manager.encode_texts(unique_texts), spill=False, rows=rows
+            )
+            encoded += len(unique_texts)
+            accumulator.update(
+                accumulator.encode(labels), best_idx, SimilarityResults.round_confidences(best_scores)
+            )
+
+            # Reservoir sampling (algorithm R), vectorised over the chunk
+            positions = np.arange(seen, seen + len(chunk))
+            slots = np.where(positions < sample_size, positions, rng.integers(0, positions + 1))
+            for offset in np.flatnonzero(slots < sample_size):
+                row = (int(positions[offset]), int(best_idx[offset]), float(best_scores[offset]),
+                       texts[offset], labels[offset],
+                       None if chunk_scores is None else chunk_scores[offset].copy())
+                if slots[offset] < len(sample):
+                    sample[slots[offset]] = row
+                else:
+                    sample.append(row)
+            seen += len(chunk)
+            self.logger.info(f"Streamed {seen} transactions")
+
+        if not seen:
+            raise ValueError("No transactions found for streaming evaluation")
+        self.dedup_stats = dedup_stats(seen, encoded)
+        sample.sort(key=lambda row: row[0])
+        ids, predicted, confidences, texts, labels, score_rows = (list(column) for column in zip(*sample))
+        categories = list(engine.categories)
+        true_codes = SimilarityResults.encode_labels(labels, categories)
+        scores = None if score_rows[0] is None else np.vstack(score_rows)
+        raw_sample = SimilarityResults(categories, predicted, confidences, texts, true_codes, ids, scores)
+        with Tracer().span('derive_metrics'):
+            final_results = accumulator.evaluate()
+        final_results['curve_metrics'] = self.calculate_curve_metrics(raw_sample)
+        final_results['threshold_sweep'] = self.calculate_threshold_sweep(raw_sample)
+        return raw_sample, final_results
+
+    def _coded(self, results):
+        """Columnar view of results with true-label codes attached"""
+        results = SimilarityResults.from_dict(results, self.true_labels)
+        if results.true_codes is None:
+            categories = list(results.categories)
+            true_codes = SimilarityResults.encode_labels(
+                [self.true_labels[str(idx)] for idx in results.ids.tolist()], categories
+            )
+            results = SimilarityResults(
+                categories, results.predicted, results.confidence, results.texts, true_codes, results.ids,
+                results.scores
+            )
         return results
 
+    def _accumulate(self, results):
+        """Fold results into a metrics accumulator in a single pass"""
+        accumulator = MetricsAccumulator()
+        accumulator.update_results(self._coded(results))
+        return accumulator
+
     @LoggerService.log_function(level='info')
     def calculate_accuracy(self, results):
         """Calculate classification accuracy"""
         if not self.true_labels:
             self.logger.warning("No true labels available for accuracy calculation")
             return None
-            
-        y_true = []
-        y_pred = []
-        for idx in range(len(results)):
-            str_idx = str(idx)
-            if str_idx in self.true_labels and str_idx in results:
-                y_true.append(self.true_labels[str_idx])
-                y_pred.append(results[str_idx]['category'])
-        
-        return {
-            'accuracy': float(format(accuracy_score(y_true, y_pred), '.4f'))
-        }
+        return self._accumulate(results).accuracy()
 
     @LoggerService.log_function(level='info')
     def calculate_precision_recall_f1(self, results):
         """Calculate precision, recall, and F1 score for each category"""
-        y_true = []
-        y_pred = []
-        for idx in range(len(results)):
-            str_idx = str(idx)
-            if str_idx in self.true_labels and str_idx in results:
-                y_true.append(self.true_labels[str_idx])
-                y_pred.append(results[str_idx]['category'])
-        
-        precision, recall, f1, support = precision_recall_fscore_support(
-            y_true, y_pred, average='weighted'
-        )
-        
-        return {
-            'precision': float(format(precision, '.4f')),
-            'recall': float(format(recall, '.4f')),
-            'f1_score': float(format(f1, '.4f'))
-        }
+        return self._accumulate(results).precision_recall_f1()
 
     @LoggerService.log_function(level='info')
     def generate_confusion_matrix(self, results):
         """Generate and save confusion matrix visualization"""
-        y_true = []
-        y_pred = []
-        for idx in range(len(results)):
-            str_idx = str(idx)
-            if str_idx in self.true_labels and str_idx in results:
-                y_true.append(self.true_labels[str_idx])
-                y_pred.append(results[str_idx]['category'])
-        
-        # Create confusion matrix
-        cm = confusion_matrix(y_true, y_pred)
-        unique_categories = sorted(set(y_true + y_pred))
-        
-
-        
-        return {
-            'confusion_matrix': cm.tolist(),
-            'categories': unique_categories
-        }
+        return self._accumulate(results).confusion_matrix()
 
     @LoggerService.log_function(level='info')
     def calculate_confidence_stats(self, results):
         """Calculate confidence score statistics"""
-        confidences = [result['confidence'] for result in results.values()]
-        
-        return {
-            'mean_confidence': float(format(np.mean(confidences), '.4f')),
-            'median_confidence': float(format(np.median(confidences), '.4f')),
-            'min_confidence': float(format(min(confidences), '.4f')),
-            'max_confidence': float(format(max(confidences), '.4f'))
-        }
+        accumulator = MetricsAccumulator()
+        accumulator.update([], [], SimilarityResults.from_dict(results).rounded_confidences())
+        return accumulator.confidence_stats()
+
+    def _curve_scores(self, results):
+        """The kept score matrix, or scores that are the confidence in the predicted column and 0 elsewhere"""
+        if results.scores is not None:
+            return results.scores
+        n_columns = int(results.predicted.max()) + 1 if len(results.predicted) else 0
+        scores = np.zeros((len(results.predicted), n_columns), dtype=np.float32)
+        scores[np.arange(len(results.predicted)), results.predicted] = results.rounded_confidences()
+        return scores
+
+    @LoggerService.log_function(level='info')
+    def calculate_curve_metrics(self, results):
+        """One-vs-rest ROC/AUC and average precision for every category, computed once for both plots"""
+        results = self._coded(results)
+        curves = one_vs_rest_curves(
+            self._curve_scores(results),
+            results.true_codes,
+            results.categories,
+            max_points=self.config.scoring_config.get('curve_points', 200)
+        )
+        return summarize_curves(curves)
+
+    @LoggerService.log_function(level='info')
+    def calculate_threshold_sweep(self, results):
+        """Coverage, accuracy and F1 at every confidence threshold, plus the recommended operating point"""
+        results = self._coded(results)
+        sweep_config = self.config.scoring_config.get('threshold_sweep', {})
+        fallback_category = sweep_config.get('fallback_category', ExpenseCategory.MISCELLANEOUS.value)
+        if fallback_category not in results.categories:
+            # Nothing can be routed to a category that is neither scored nor labelled
+            fallback_category = None
+        sweep = sweep_thresholds(
+            results.true_codes,
+            results.predicted,
+            results.rounded_confidences(),
+            len(results.categories),
+            None if fallback_category is None else results.categories.index(fallback_category)
+        )
+        summary = summarize_sweep(
+            sweep,
+            sweep_config.get('target_precision', 0.9),
+            fallback_category,
+            self.config.scoring_config.get('curve_points', 200)
+        )
+        recommended = summary['recommended']
+        if recommended is None:
+            self.logger.info(f"No confidence threshold reaches precision {summary['target_precision']}")
+        else:
+            self.logger.info(
+                f"Recommended confidence threshold {recommended['threshold']}: coverage {recommended['coverage']}, "
+                f"accuracy {recommended['accuracy']}"
+            )
+        return summary
 
     @LoggerService.log_function(level='info')
     def evaluate_all_metrics(self, results):
         """Calculate all classification metrics"""
-        metrics = {
-            'basic_metrics': self.calculate_accuracy(results),
-            'detailed_metrics': self.calculate_precision_recall_f1(results),
-            'confidence_stats': self.calculate_confidence_stats(results),
-            'confusion_matrix_data': self.generate_confusion_matrix(results)
-        }
-        
-        return metrics
+        tracer = Tracer()
+        with tracer.span('accumulate_confusion_matrix', items=len(results)):
+            results = self._coded(results)
+            accumulator = self._accumulate(results)
+        with tracer.span('derive_metrics'):
+            # Accuracy, precision/recall/F1, confusion matrix data and confidence stats
+            final_results = accumulator.evaluate()
+        final_results['curve_metrics'] = self.calculate_curve_metrics(results)
+        final_results['threshold_sweep'] = self.calculate_threshold_sweep(results)
+        return final_results
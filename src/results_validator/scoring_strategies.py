@@ -0,0 +1,81 @@
+import numpy as np
+from logger_service.logger import LoggerService
+from results_validator.similarity_engine import SimilarityEngine
+from results_validator.keyword_index import ExactKeywordIndex
+
+MAX_KEYWORD_STRATEGY = 'max_keyword'
+CENTROID_STRATEGY = 'centroid'
+PROTOTYPE_STRATEGY = 'prototype'
+KNN_VOTE_STRATEGY = 'knn_vote'
+
+SCORING_STRATEGIES = [MAX_KEYWORD_STRATEGY, CENTROID_STRATEGY, PROTOTYPE_STRATEGY, KNN_VOTE_STRATEGY]
+
+
+def category_prototypes(category_embeddings, n_prototypes=4, seed=0):
+    """k-means sub-centroids per category; small categories keep their keywords as prototypes"""
+    from sklearn.cluster import KMeans
+
+    prototypes = {}
+    for category, embeddings in category_embeddings.items():
+        if len(embeddings) == 0:
+            continue
+        vectors = SimilarityEngine.normalize(np.atleast_2d(np.asarray(embeddings, dtype=np.float32)))
+        if len(vectors) <= n_prototypes:
+            prototypes[category] = vectors
+            continue
+        kmeans = KMeans(n_clusters=n_prototypes, random_state=seed, n_init=3).fit(vectors)
+        prototypes[category] = SimilarityEngine.normalize(kmeans.cluster_centers_)
+    return prototypes
+
+
+class KeywordVoteClassifier:
+    """Top-k keyword vote: each of the k nearest keywords adds its score to its category.
+
+    The confidence is the best keyword score within the winning category.
+    """
+
+    def __init__(self, category_embeddings, k=5, block_size=1024):
+        self.k = max(1, int(k))
+        self.index = ExactKeywordIndex(block_size=block_size).add_category_embeddings(category_embeddings)
+        self.categories = self.index.categories
+
+    @property
+    def comparisons(self):
+        return self.index.size
+
+    def best_matches(self, query_matrix):
+        scores, rows = self.index.search(query_matrix, self.k)
+        valid = rows >= 0
+        codes = np.where(valid, self.index.category_codes[np.maximum(rows, 0)], 0)
+        weights = np.where(valid, scores, 0).astype(np.float64)
+
+        votes = np.zeros((len(rows), len(self.categories)))
+        np.add.at(votes, (np.arange(len(rows))[:, None], codes), weights)
+        best_idx = np.argmax(votes, axis=1)
+        in_winner = valid & (codes == best_idx[:, None])
+        best_scores = np.max(np.where(in_winner, scores, -np.inf), axis=1).astype(scores.dtype)
+        return best_idx.astype(np.int64), best_scores
+
+
+def build_scoring_strategy(name, category_embeddings, category_centroids=None, scoring_config=None):
+    """Return an object with ``categories``, ``comparisons`` and ``best_matches`` for a strategy"""
+    scoring_config = scoring_config or {}
+    block_size = scoring_config.get('block_size', 1024)
+    if name == MAX_KEYWORD_STRATEGY:
+        engine = SimilarityEngine(category_embeddings, block_size=block_size)
+    elif name == CENTROID_STRATEGY:
+        engine = SimilarityEngine(
+            {category: [centroid] for category, centroid in (category_centroids or {}).items()},
+            block_size=block_size
+        )
+    elif name == PROTOTYPE_STRATEGY:
+        engine = SimilarityEngine(
+            category_prototypes(category_embeddings, scoring_config.get('prototypes_per_category', 4)),
+            block_size=block_size
+        )
+    elif name == KNN_VOTE_STRATEGY:
+        return KeywordVoteClassifier(category_embeddings, scoring_config.get('vote_k', 5), block_size)
+    else:
+        raise ValueError(f"Unknown scoring strategy '{name}'. Available: {SCORING_STRATEGIES}")
+    LoggerService().info(f"Scoring strategy '{name}' compares each query against {engine.comparisons} vectors")
+    return engine
@@ -0,0 +1,83 @@
+import numpy as np
+from logger_service.logger import LoggerService
+
+
+class SimilarityEngine:
+    """Blocked cosine scoring of query vectors against every category keyword.
+
+    All keyword embeddings are L2-normalised once and packed into a single
+    contiguous matrix. ``category_offsets`` holds the first row of each
+    category, so category ``i`` owns rows ``offsets[i]:offsets[i + 1]``.
+    """
+
+    def __init__(self, category_embeddings, block_size=1024, dtype=np.float32):
+        self.logger = LoggerService()
+        self.block_size = max(1, int(block_size))
+        self.dtype = dtype
+        self.categories = []
+        self.keyword_matrix, self.category_offsets = self._build_keyword_matrix(category_embeddings)
+
+    @property
+    def comparisons(self):
+        """Vectors each query is scored against"""
+        return self.keyword_matrix.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.keyword_matrix.nbytes
+
+    @staticmethod
+    def normalize(vectors, dtype=np.float32):
+        """L2-normalise rows, leaving all-zero rows untouched (as sklearn does)"""
+        vectors = np.asarray(vectors, dtype=dtype)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        norms = np.sqrt(np.einsum('ij,ij->i', vectors, vectors))
+        norms[norms == 0.0] = 1.0
+        return vectors / norms[:, np.newaxis]
+
+    def _build_keyword_matrix(self, category_embeddings):
+        """Pack every category's keyword vectors into one normalised matrix"""
+        blocks = []
+        offsets = [0]
+        for category, embeddings in category_embeddings.items():
+            if len(embeddings) == 0:
+                self.logger.warning(f"Category '{category}' has no keyword embeddings and will never be predicted")
+                continue
+            block = np.atleast_2d(np.asarray(embeddings, dtype=self.dtype))
+            blocks.append(block)
+            offsets.append(offsets[-1] + len(block))
+            self.categories.append(category)
+
+        if not blocks:
+            raise ValueError("No category embeddings available for similarity scoring")
+
+        matrix = np.ascontiguousarray(self.normalize(np.vstack(blocks), self.dtype))
+        self.logger.info(
+            f"Built keyword matrix with {matrix.shape[0]} keywords across "
+            f"{len(self.categories)} categories (dim={matrix.shape[1]})"
+        )
+        return matrix, np.asarray(offsets, dtype=np.int64)
+
+    def score_block(self, query_block):
+        """Return the (n_queries, n_categories) max-cosine score matrix for one block"""
+        queries = self.normalize(query_block, self.dtype)
+        keyword_scores = queries @ self.keyword_matrix.T
+        # Segmented max: one reduction per category over its slice of keyword columns
+        return np.maximum.reduceat(keyword_scores, self.category_offsets[:-1], axis=1)
+
+    def iter_blocks(self, query_matrix):
+        """Yield (start, category_scores) for consecutive blocks of queries"""
+        for start in range(0, len(query_matrix), self.block_size):
+            yield start, self.score_block(query_matrix[start:start + self.block_size])
+
+    def best_matches(self, query_matrix):
+        """Return the arg-max category index and its score for every query"""
+        n_queries = len(query_matrix)
+        best_idx = np.empty(n_queries, dtype=np.int64)
+        best_scores = np.empty(n_queries, dtype=self.dtype)
+        for start, scores in self.iter_blocks(query_matrix):
+            stop = start + len(scores)
+            best_idx[start:stop] = np.argmax(scores, axis=1)
+            best_scores[start:stop] = scores[np.arange(len(scores)), best_idx[start:stop]]
+        return best_idx, best_scores
@@ -0,0 +1,156 @@
+import numbers
+from collections.abc import Mapping
+import numpy as np
+
+CONFIDENCE_DECIMALS = 5
+
+
+class SimilarityResults(Mapping):
+    """Columnar similarity results.
+
+    Predictions and ground truth are int32 codes into a shared ``categories``
+    vocabulary (scoring categories first, then any extra true labels), and
+    confidences are float32. Texts stay a reference to the input sequence.
+
+    As a Mapping it still behaves like the old results dict: keys are
+    stringified row ids and each value is built on access as
+    ``{'category', 'confidence', 'actual_text'}``.
+
+    ``scores`` optionally holds the full (N, C) float32 score matrix over the
+    first C categories, possibly as a memmap. It feeds the one-vs-rest
+    curves in the evaluate stage and is not pickled, so it never travels to
+    other stages or into saved artifacts.
+    """
+
+    def __init__(self, categories, predicted, confidence, texts, true_codes=None, ids=None, scores=None):
+        self.categories = list(categories)
+        self.predicted = np.asarray(predicted, dtype=np.int32)
+        self.confidence = np.asarray(confidence, dtype=np.float32)
+        self.texts = texts
+        self.true_codes = None if true_codes is None else np.asarray(true_codes, dtype=np.int32)
+        self.ids = np.arange(len(self.predicted)) if ids is None else np.asarray(ids, dtype=np.int64)
+        self.scores = scores
+        self._positions = None
+
+    def __getstate__(self):
+        return dict(self.__dict__, scores=None, _positions=None)
+
+    @staticmethod
+    def round_confidences(scores):
+        """Round scores the way the results view reports them"""
+        return np.round(np.asarray(scores, dtype=np.float64), CONFIDENCE_DECIMALS)
+
+    @staticmethod
+    def encode_labels(labels, categories):
+        """Map label strings to codes, appending unseen labels to ``categories``"""
+        if len(labels) == 0:
+            return np.empty(0, dtype=np.int32)
+        unique_labels, inverse = np.unique(np.asarray(labels, dtype=str), return_inverse=True)
+        index = {category: code for code, category in enumerate(categories)}
+        unique_codes = np.empty(len(unique_labels), dtype=np.int32)
+        for position, label in enumerate(unique_labels.tolist()):
+            if label not in index:
+                index[label] = len(categories)
+                categories.append(label)
+            unique_codes[position] = index[label]
+        return unique_codes[inverse.reshape(-1)]
+
+    @classmethod
+    def from_dict(cls, results, true_labels=None):
+        """Build columnar results from a legacy {id: {...}} results dict"""
+        if isinstance(results, cls):
+            return results
+        ids = list(results.keys())
+        categories = []
+        predicted = cls.encode_labels([results[idx]['category'] for idx in ids], categories)
+        true_codes = None
+        if true_labels is not None:
+            true_codes = cls.encode_labels([true_labels[idx] for idx in ids], categories)
+        return cls(
+            categories,
+            predicted,
+            [results[idx]['confidence'] for idx in ids],
+            [results[idx]['actual_text'] for idx in ids],
+            true_codes,
+            [int(idx) for idx in ids]
+        )
+
+    def rounded_confidences(self):
+        """Confidences as float64, rounded like the dict view"""
+        return self.round_confidences(self.confidence)
+
+    def predicted_labels(self):
+        return np.asarray(self.categories, dtype=object)[self.predicted]
+
+    def true_labels(self):
+        if self.true_codes is None:
+            return None
+        return np.asarray(self.categories, dtype=object)[self.true_codes]
+
+    @property
+    def nbytes(self):
+        arrays = [self.predicted, self.confidence, self.ids]
+        if self.true_codes is not None:
+            arrays.append(self.true_codes)
+        if self.scores is not None and not isinstance(self.scores, np.memmap):
+            arrays.append(self.scores)
+        return sum(array.nbytes for array in arrays)
+
+    def _position(self, key):
+        if self._positions is None:
+            self._positions = {str(idx): row for row, idx in enumerate(self.ids.tolist())}
+        return self._positions[key]
+
+    def __getitem__(self, key):
+        row = self._position(key)
+        return {
+            'category': self.categories[self.predicted[row]],
+            'confidence': float(format(float(self.confidence[row]), f'.{CONFIDENCE_DECIMALS}f')),
+            'actual_text': self.texts[row]
+        }
+
+    def __iter__(self):
+        return (str(idx) for idx in self.ids.tolist())
+
+    def __len__(self):
+        return len(self.predicted)
+
+
+class IndexedView(Mapping):
+    """Read-only {str(row): item} view over a sequence, for legacy dict consumers.
+
+    With ``rows``, row i is ``items[rows[i]]``, looked up per access so a
+    fanned-out view of deduplicated items is never materialized.
+    """
+
+    def __init__(self, items, rows=None):
+        self.items_ref = items
+        self.rows = rows
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._item(row) for row in range(len(self))[key]]
+        if isinstance(key, numbers.Integral):
+            # Sequence-style access; out of range raises IndexError
+            return self._item(range(len(self))[key])
+        if not isinstance(key, str):
+            raise TypeError(f"{type(self).__name__} keys are str(row), int or slice, not {type(key).__name__}")
+        if not (key.isascii() and key.isdigit()) or str(int(key)) != key or int(key) >= len(self):
+            raise KeyError(key)
+        return self._item(int(key))
+
+    def _item(self, row):
+        return self.items_ref[row if self.rows is None else self.rows[row]]
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except (KeyError, IndexError, TypeError):
+            return False
+        return True
+
+    def __iter__(self):
+        return (str(row) for row in range(len(self)))
+
+    def __len__(self):
+        return len(self.items_ref if self.rows is None else self.rows)
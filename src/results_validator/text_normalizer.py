@@ -0,0 +1,114 @@
+import re
+import unicodedata
+import numpy as np
+
+DEFAULT_STEPS = ['unicode', 'casefold', 'strip_reference_suffix', 'collapse_punctuation', 'collapse_whitespace']
+
+_APOSTROPHES = re.compile(r"['’`]")
+_PUNCTUATION = re.compile(r'[^\w\s]+|_+')
+_REFERENCE_PATTERNS = {}
+
+
+def _reference_pattern(min_digits):
+    # One unbroken trailing token such as " 48213" or " #48213"; amounts ("500.00") and dates
+    # ("12/03/2024") contain punctuation and are kept. Only a \s can start a match, so this is linear.
+    if min_digits not in _REFERENCE_PATTERNS:
+        _REFERENCE_PATTERNS[min_digits] = re.compile(rf'\s[#*]?\d{{{min_digits},}}$')
+    return _REFERENCE_PATTERNS[min_digits]
+
+
+def strip_reference_suffix(text, min_digits=4):
+    """Drop a trailing numeric reference token (at least ``min_digits`` digits), never the whole text"""
+    match = _reference_pattern(min_digits).search(text)
+    if match and match.start() > 0:
+        return text[:match.start()]
+    return text
+
+
+NORMALIZATION_STEPS = {
+    'unicode': lambda text: unicodedata.normalize('NFKC', text),
+    'casefold': str.casefold,
+    'strip_reference_suffix': strip_reference_suffix,
+    # "Lal's" -> "lals", "SWIGGY*ORDER" -> "swiggy order"
+    'collapse_punctuation': lambda text: _PUNCTUATION.sub(' ', _APOSTROPHES.sub('', text)),
+    'collapse_whitespace': lambda text: ' '.join(text.split()),
+}
+
+
+class TextNormalizer:
+    """Configurable transaction text normalization and duplicate collapsing.
+
+    ``steps`` name functions in NORMALIZATION_STEPS and run in order. Texts
+    that normalize to the same string are encoded and scored once; the
+    inverse index fans the results back out to every original row.
+    """
+
+    def __init__(self, steps=None, min_reference_digits=4):
+        steps = DEFAULT_STEPS if steps is None else list(steps)
+        unknown = [step for step in steps if step not in NORMALIZATION_STEPS]
+        if unknown:
+            raise ValueError(f"Unknown normalization steps {unknown}. Available: {list(NORMALIZATION_STEPS)}")
+        self.steps = steps
+        self.min_reference_digits = min_reference_digits
+
+    def normalize(self, text):
+        normalized = text
+        for step in self.steps:
+            if step == 'strip_reference_suffix':
+                normalized = strip_reference_suffix(normalized, self.min_reference_digits)
+            else:
+                normalized = NORMALIZATION_STEPS[step](normalized)
+        # A text made only of punctuation keeps its original form rather than becoming empty
+        return normalized or text
+
+    def collapse(self, texts):
+        """Return (unique normalized texts in first-seen order, int64 row -> unique index)"""
+        return collapse_texts(texts, self.normalize)
+
+
+def collapse_texts(texts, normalize=None):
+    """(unique texts in first-seen order, int64 row -> unique index), keyed by ``normalize(text)`` when given.
+
+    Exact duplicates are collapsed even without a normalizer, so each
+    distinct string is encoded once.
+    """
+    index = {}
+    inverse = np.empty(len(texts), dtype=np.int64)
+    for row, text in enumerate(texts):
+        inverse[row] = index.setdefault(text if normalize is None else normalize(text), len(index))
+    return list(index), inverse
+
+
+def normalization_settings():
+    """Effective ``test_data.normalization`` steps and digits, or None when it is disabled (the default)"""
+    from configuration_manager.config_manager import ConfigManager
+
+    normalization_config = ConfigManager().test_data_config.get('normalization', {})
+    if not normalization_config.get('enabled', False):
+        return None
+    steps = normalization_config.get('steps')
+    return {
+        'steps': DEFAULT_STEPS if steps is None else list(steps),
+        'min_reference_digits': normalization_config.get('min_reference_digits', 4)
+    }
+
+
+def configured_normalizer():
+    """The configured TextNormalizer, or None when normalization is disabled.
+
+    Evaluation, the service and the CLI all build it here, so the texts that
+    are served are normalized exactly like the texts that were evaluated.
+    """
+    settings = normalization_settings()
+    if settings is None:
+        return None
+    return TextNormalizer(settings['steps'], settings['min_reference_digits'])
+
+
+def dedup_stats(n_rows, n_unique):
+    """Rows, unique texts and rows per unique text, for the run summary"""
+    return {
+        'rows': n_rows,
+        'unique': n_unique,
+        'dedup_ratio': float(format(n_rows / n_unique, '.4f')) if n_unique else None
+    }
@@ -0,0 +1,119 @@
+import numpy as np
+
+DECIMALS = 4
+SWEEP_COLUMNS = ('threshold', 'coverage', 'accuracy', 'macro_f1', 'weighted_f1')
+
+
+def _f1(true_positives, predicted, support):
+    """Per-class F1 as 2TP / (predicted + support); 0 where both are 0"""
+    denominator = predicted + support
+    return np.divide(2.0 * true_positives, denominator, out=np.zeros(np.shape(denominator)), where=denominator > 0)
+
+
+def _within_class_counts(classes, flags):
+    """Running count and running sum of ``flags`` within each class, in sequence order (inclusive)"""
+    order = np.argsort(classes, kind='stable')
+    sorted_classes = classes[order]
+    starts = np.flatnonzero(np.r_[True, sorted_classes[1:] != sorted_classes[:-1]])
+    group_start = np.repeat(starts, np.diff(np.r_[starts, len(classes)]))
+    flag_sums = np.cumsum(flags[order])
+    before_group = np.where(group_start > 0, flag_sums[group_start - 1], 0)
+
+    counts = np.empty(len(classes), dtype=np.int64)
+    sums = np.empty(len(classes), dtype=np.int64)
+    counts[order] = np.arange(len(classes)) - group_start + 1
+    sums[order] = flag_sums - before_group
+    return counts, sums
+
+
+def sweep_thresholds(true_codes, pred_codes, confidences, n_categories, fallback_code=None):
+    """Coverage, accuracy on covered rows and macro / weighted F1 at every distinct confidence threshold.
+
+    At threshold t a row keeps its prediction when its confidence is >= t;
+    the rest are routed to ``fallback_code`` or, when that is None, left
+    unpredicted (a human queue). Confidences are sorted once. Each covered
+    row changes the F1 of its predicted class only (and of the fallback
+    class), so every class's F1 term follows from running counts and the
+    sweep is a few cumulative sums. Macro F1 averages the classes that
+    occur in the ground truth; weighted F1 weights every class by support,
+    as ``evaluate_all_metrics`` does.
+
+    Returns a dict of equal-length arrays keyed by SWEEP_COLUMNS, thresholds descending.
+    """
+    true_codes = np.asarray(true_codes, dtype=np.int64)
+    pred_codes = np.asarray(pred_codes, dtype=np.int64)
+    confidences = np.asarray(confidences, dtype=np.float64)
+    n_rows = len(confidences)
+    if n_rows == 0:
+        return {column: np.empty(0) for column in SWEEP_COLUMNS}
+
+    order = np.argsort(-confidences, kind='stable')
+    sorted_confidences = confidences[order]
+    predicted = pred_codes[order]
+    actual = true_codes[order]
+    correct = (predicted == actual).astype(np.int64)
+
+    size = max(n_categories, int(true_codes.max()) + 1, int(pred_codes.max()) + 1)
+    support = np.bincount(true_codes, minlength=size).astype(np.float64)
+    macro_weights = (support > 0) / max(1, int((support > 0).sum()))
+    weighted_weights = support / n_rows
+
+    # F1 change of the predicted class as each row (in confidence order) is covered
+    class_predicted, class_true_positives = _within_class_counts(predicted, correct)
+    class_support = support[predicted]
+    gain = (_f1(class_true_positives, class_predicted, class_support)
+            - _f1(class_true_positives - correct, class_predicted - 1, class_support))
+    if fallback_code is not None:
+        # The fallback class is tracked on its own below
+        gain[predicted == fallback_code] = 0.0
+    macro = np.cumsum(gain * macro_weights[predicted])
+    weighted = np.cumsum(gain * weighted_weights[predicted])
+
+    covered = np.arange(1, n_rows + 1)
+    if fallback_code is not None:
+        # Uncovered rows count as predicted fallback, right when their label is the fallback
+        is_fallback = predicted == fallback_code
+        fallback_predicted = np.cumsum(is_fallback) + (n_rows - covered)
+        fallback_true_positives = (np.cumsum(is_fallback & (correct == 1))
+                                   + support[fallback_code] - np.cumsum(actual == fallback_code))
+        fallback_f1 = _f1(fallback_true_positives, fallback_predicted, support[fallback_code])
+        macro = macro + macro_weights[fallback_code] * fallback_f1
+        weighted = weighted + weighted_weights[fallback_code] * fallback_f1
+
+    # One point per distinct confidence: the last row of each run of ties
+    ends = np.flatnonzero(np.r_[sorted_confidences[1:] != sorted_confidences[:-1], True])
+    return {
+        'threshold': sorted_confidences[ends],
+        'coverage': covered[ends] / n_rows,
+        'accuracy': np.cumsum(correct)[ends] / covered[ends],
+        'macro_f1': macro[ends],
+        'weighted_f1': weighted[ends]
+    }
+
+
+def _point(sweep, index):
+    return {column: float(format(sweep[column][index], f'.{DECIMALS}f')) for column in SWEEP_COLUMNS}
+
+
+def recommend_threshold(sweep, target_precision):
+    """The point with the most coverage whose accuracy on covered rows reaches ``target_precision``, or None"""
+    meets_target = np.flatnonzero(sweep['accuracy'] >= target_precision)
+    if len(meets_target) == 0:
+        return None
+    # Thresholds descend, so the last qualifying point covers the most rows
+    return _point(sweep, meets_target[-1])
+
+
+def summarize_sweep(sweep, target_precision, fallback_category=None, max_points=200):
+    """The final_results entry: recommended point, full-coverage point and a downsampled curve"""
+    n_points = len(sweep['threshold'])
+    keep = np.arange(n_points)
+    if max_points and n_points > max_points:
+        keep = np.unique(np.linspace(0, n_points - 1, max_points).round().astype(int))
+    return {
+        'fallback_category': fallback_category,
+        'target_precision': target_precision,
+        'recommended': recommend_threshold(sweep, target_precision) if n_points else None,
+        'full_coverage': _point(sweep, n_points - 1) if n_points else None,
+        'curve': {column: np.round(sweep[column][keep], DECIMALS).tolist() for column in SWEEP_COLUMNS}
+    }
@@ -0,0 +1,178 @@
+import csv
+import json
+import os
+import numpy as np
+from logger_service.logger import LoggerService
+
+JSON_FORMAT = 'json'
+JSONL_FORMAT = 'jsonl'
+CSV_FORMAT = 'csv'
+
+_EXTENSION_FORMATS = {
+    '.json': JSON_FORMAT,
+    '.jsonl': JSONL_FORMAT,
+    '.ndjson': JSONL_FORMAT,
+    '.csv': CSV_FORMAT,
+}
+
+
+def detect_format(file_path):
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in _EXTENSION_FORMATS:
+        raise ValueError(f"Unsupported transactions file extension '{extension}' for {file_path}")
+    return _EXTENSION_FORMATS[extension]
+
+
+class TransactionReader:
+    """Reads labelled transactions as (text, label) pairs in bounded chunks.
+
+    Supported formats, chosen by file extension:
+    - ``.json``: the original ``{"transaction text": "category", ...}`` object,
+      parsed incrementally so the whole file is never held in memory
+    - ``.jsonl``/``.ndjson``: one ``{"text": ..., "label": ...}`` object per line
+    - ``.csv``: a header row with ``text`` and ``label`` columns
+    """
+
+    def __init__(self, file_path, chunk_size=10000, text_field='text', label_field='label', block_size=1 << 20):
+        self.logger = LoggerService()
+        self.file_path = file_path
+        self.format = detect_format(file_path)
+        self.chunk_size = max(1, int(chunk_size))
+        self.text_field = text_field
+        self.label_field = label_field
+        self.block_size = block_size
+
+    def read_all(self):
+        """Return every (text, label) pair, parsing the file exactly once"""
+        if self.format == JSON_FORMAT:
+            # json.load keeps the original semantics for duplicate keys (last label wins)
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                return list(json.load(f).items())
+        return list(self._iter_pairs())
+
+    def iter_chunks(self):
+        """Yield lists of at most chunk_size (text, label) pairs"""
+        chunk = []
+        for pair in self._iter_pairs():
+            chunk.append(pair)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _iter_pairs(self):
+        if self.format == JSON_FORMAT:
+            return self._iter_json_last_wins()
+        if self.format == JSONL_FORMAT:
+            return self._iter_jsonl()
+        return self._iter_csv()
+
+    def _iter_jsonl(self):
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                try:
+                    yield record[self.text_field], record[self.label_field]
+                except KeyError as e:
+                    raise ValueError(f"{self.file_path}:{line_number} is missing field {e}")
+
+    def _iter_csv(self):
+        with open(self.file_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            missing = {self.text_field, self.label_field} - set(reader.fieldnames or [])
+            if missing:
+                raise ValueError(f"{self.file_path} is missing columns: {sorted(missing)}")
+            for row in reader:
+                yield row[self.text_field], row[self.label_field]
+
+    def _iter_json_last_wins(self):
+        """JSON object pairs with json.load's duplicate-key semantics: first position, last label.
+
+        A first pass keeps one 64-bit hash per key (8 bytes per transaction).
+        Files without duplicates are then streamed as they are; otherwise the
+        last labels of the keys whose hash repeats are collected before the
+        pairs are yielded.
+        """
+        hashes = np.fromiter((hash(key) for key, _ in self._iter_json_object()), dtype=np.int64)
+        values, counts = np.unique(hashes, return_counts=True)
+        repeated = set(values[counts > 1].tolist())
+        del hashes, values, counts
+        if not repeated:
+            yield from self._iter_json_object()
+            return
+
+        # Also holds keys that merely share a hash; each is still yielded exactly once
+        last_labels = {key: label for key, label in self._iter_json_object() if hash(key) in repeated}
+        self.logger.warning(f"{self.file_path} repeats transaction texts; keeping the last label of each, as json.load does")
+        for key, label in self._iter_json_object():
+            if hash(key) not in repeated:
+                yield key, label
+            elif key in last_labels:
+                yield key, last_labels.pop(key)
+
+    def _iter_json_object(self):
+        """Incrementally parse a flat JSON object of string keys to values"""
+        decoder = json.JSONDecoder()
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            buffer = ''
+            pos = 0
+            eof = False
+
+            def refill():
+                nonlocal buffer, pos, eof
+                block = f.read(self.block_size)
+                if not block:
+                    eof = True
+                buffer = buffer[pos:] + block
+                pos = 0
+
+            def next_char():
+                nonlocal pos
+                while True:
+                    while pos < len(buffer) and buffer[pos].isspace():
+                        pos += 1
+                    if pos < len(buffer) or eof:
+                        return buffer[pos] if pos < len(buffer) else ''
+                    refill()
+
+            def decode_value():
+                nonlocal pos
+                # raw_decode does not skip leading whitespace
+                next_char()
+                while True:
+                    try:
+                        value, end = decoder.raw_decode(buffer, pos)
+                        # A value running to the end of the buffer may be truncated
+                        if end < len(buffer) or eof:
+                            pos = end
+                            return value
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                    refill()
+
+            def expect(char):
+                nonlocal pos
+                found = next_char()
+                if found != char:
+                    raise ValueError(f"Malformed transactions file {self.file_path}: expected '{char}', found '{found}'")
+                pos += 1
+
+            expect('{')
+            if next_char() == '}':
+                return
+            while True:
+                key = decode_value()
+                expect(':')
+                value = decode_value()
+                yield key, value
+                separator = next_char()
+                pos += 1
+                if separator == '}':
+                    return
+                if separator != ',':
+                    raise ValueError(f"Malformed transactions file {self.file_path}: expected ',' or '}}', found '{separator}'")
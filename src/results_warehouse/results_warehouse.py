@@ -0,0 +1,352 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+import zlib
+import numpy as np
+from logger_service.logger import LoggerService
+from results_validator.similarity_results import SimilarityResults
+
+# Headline columns of the models table, in insert order; everything the
+# history and comparison queries filter or sort on lives here.
+METRIC_COLUMNS = (
+    'n_transactions', 'accuracy', 'precision', 'recall', 'f1_score', 'macro_auc',
+    'macro_average_precision', 'mean_confidence', 'total_seconds', 'texts_per_second', 'peak_rss_mb'
+)
+INTEGER_COLUMNS = ('n_transactions',)
+# Per-model evaluation entries kept next to final_results
+EXTRA_KEYS = ('index_stats', 'strategy_stats', 'compression_stats', 'memory', 'dedup')
+
+
+def configured_warehouse():
+    """The warehouse named in config, or None when ``warehouse.enabled`` is false"""
+    from configuration_manager.config_manager import ConfigManager
+
+    warehouse_config = ConfigManager().warehouse_config
+    if not warehouse_config.get('enabled', True):
+        return None
+    return ResultsWarehouse(warehouse_config.get('path', 'output/warehouse/results.sqlite'))
+
+
+def run_inputs():
+    """Input hashes and result-relevant settings recorded with every run"""
+    from configuration_manager.config_manager import ConfigManager
+    from pipeline.incremental import code_version, file_digest
+    from results_validator.text_normalizer import normalization_settings
+
+    config = ConfigManager()
+    test_data_config = config.test_data_config
+    settings = {section: config.config_data.get(section) for section in ('test_data', 'embedding_settings', 'scoring')}
+    # Explicit even when the section is absent, so runs with and without normalization are told apart
+    settings['normalization'] = normalization_settings()
+    return {
+        'code_version': code_version(),
+        'categories_hash': file_digest(test_data_config['categories_file']),
+        'transactions_hash': file_digest(test_data_config['transactions_file']),
+        'settings': settings
+    }
+
+
+def new_run_id():
+    """Sortable run id: start time plus a random suffix"""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+def _json_default(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _pack(value):
+    """zlib-compressed JSON, for the large per-model documents"""
+    return zlib.compress(json.dumps(value, default=_json_default, separators=(',', ':')).encode('utf-8'))
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+
+class ResultsWarehouse:
+    """SQLite store of every run's per-model results, keyed by run id and model id.
+
+    ``models`` holds one narrow row of headline metrics, timings and input
+    hashes per (run, model), indexed so history queries over hundreds of
+    runs never touch the large columns. ``details`` keeps final_results
+    (confusion matrix and curves included) and the other per-model stats as
+    compressed JSON, and ``predictions`` the per-transaction columns as raw
+    numpy buffers. Transaction texts are stored once per distinct list in
+    ``texts``. Loaded results have the same shape as the pipeline's
+    model_results, so plots and reports can be rebuilt without loading a
+    model.
+    """
+
+    def __init__(self, db_path):
+        self.logger = LoggerService()
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._initialize_db()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute('PRAGMA busy_timeout = 30000')
+        return conn
+
+    def _initialize_db(self):
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS runs ('
+                ' run_id TEXT PRIMARY KEY,'
+                ' created_at REAL NOT NULL,'
+                ' code_version TEXT,'
+                ' categories_hash TEXT,'
+                ' transactions_hash TEXT,'
+                ' settings TEXT)'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS models ('
+                ' run_id TEXT NOT NULL,'
+                ' model_id TEXT NOT NULL,'
+                ' model_name TEXT NOT NULL,'
+                ' revision TEXT,'
+                ' evaluation_fp TEXT,'
+                + ''.join(
+                    f' {column} {"INTEGER" if column in INTEGER_COLUMNS else "REAL"},' for column in METRIC_COLUMNS
+                ) +
+                ' PRIMARY KEY (run_id, model_id))'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_models_model ON models (model_id, run_id)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_models_fp ON models (evaluation_fp)')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_runs_created ON runs (created_at)')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS details ('
+                ' run_id TEXT NOT NULL,'
+                ' model_id TEXT NOT NULL,'
+                ' final_results BLOB NOT NULL,'
+                ' extras BLOB NOT NULL,'
+                ' PRIMARY KEY (run_id, model_id))'
+            )
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS predictions ('
+                ' run_id TEXT NOT NULL,'
+                ' model_id TEXT NOT NULL,'
+                ' categories TEXT NOT NULL,'
+                ' ids BLOB NOT NULL,'
+                ' predicted BLOB NOT NULL,'
+                ' true_codes BLOB,'
+                ' confidence BLOB NOT NULL,'
+                ' texts_hash TEXT NOT NULL,'
+                ' PRIMARY KEY (run_id, model_id))'
+            )
+            conn.execute('CREATE TABLE IF NOT EXISTS texts (texts_hash TEXT PRIMARY KEY, data BLOB NOT NULL)')
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _metric_row(results, performance):
+        final_results = results['final_results']
+        curve_metrics = final_results.get('curve_metrics') or {}
+        memory = results.get('memory') or {}
+        performance = performance or {}
+        return (
+            int(np.asarray(final_results['confusion_matrix_data']['confusion_matrix']).sum()),
+            final_results['basic_metrics']['accuracy'],
+            final_results['detailed_metrics']['precision'],
+            final_results['detailed_metrics']['recall'],
+            final_results['detailed_metrics']['f1_score'],
+            curve_metrics.get('macro_auc'),
+            curve_metrics.get('macro_average_precision'),
+            final_results['confidence_stats']['mean_confidence'],
+            performance.get('total_seconds'),
+            performance.get('texts_per_second'),
+            memory.get('peak_rss_mb')
+        )
+
+    @staticmethod
+    def _texts_blob(texts):
+        data = zlib.compress(json.dumps(list(texts), separators=(',', ':')).encode('utf-8'))
+        return hashlib.sha256(data).hexdigest(), data
+
+    def find_run(self, evaluation_fps):
+        """Id of a stored run holding exactly these ``{model_id: evaluation fingerprint}``, or None"""
+        if not evaluation_fps or not all(evaluation_fps.values()):
+            return None
+        rows = self._query(
+            'SELECT m.run_id, m.model_id, m.evaluation_fp,'
+            ' (SELECT COUNT(*) FROM models n WHERE n.run_id = m.run_id) AS n_models'
+            f' FROM models m WHERE m.evaluation_fp IN ({",".join("?" * len(evaluation_fps))})'
+            ' ORDER BY m.run_id',
+            tuple(evaluation_fps.values())
+        )
+        matches = {}
+        for row in rows:
+            if row['n_models'] == len(evaluation_fps) and evaluation_fps.get(row['model_id']) == row['evaluation_fp']:
+                matches[row['run_id']] = matches.get(row['run_id'], 0) + 1
+        return next((run_id for run_id, count in matches.items() if count == len(evaluation_fps)), None)
+
+    @LoggerService.log_function(level='info')
+    def record_run(self, run_id, models, inputs=None):
+        """Store one run.
+
+        ``models`` maps model id to ``(model_name, results, performance)``
+        where ``results`` is the pipeline's per-model dict and
+        ``performance`` its tracer summary row (or None). ``inputs`` carries
+        the run's input hashes and settings. When every model's evaluation
+        fingerprint matches an already stored run, nothing is written and
+        that run's id is returned.
+        """
+        from embedding_manager.embedding_cache import resolve_model_revision
+
+        existing = self.find_run({
+            model_id: (results.get('fingerprints') or {}).get('evaluation')
+            for model_id, (_, results, _) in models.items()
+        })
+        if existing is not None:
+            self.logger.info(f"Results already stored as run {existing}; not recording them again")
+            return existing
+
+        inputs = inputs or {}
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute(
+                'INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?)',
+                (run_id, time.time(), inputs.get('code_version'), inputs.get('categories_hash'),
+                 inputs.get('transactions_hash'), json.dumps(inputs.get('settings'), default=_json_default))
+            )
+            for model_id, (model_name, results, performance) in models.items():
+                fingerprints = results.get('fingerprints') or {}
+                conn.execute(
+                    f'INSERT OR REPLACE INTO models VALUES ({",".join("?" * (5 + len(METRIC_COLUMNS)))})',
+                    (run_id, model_id, model_name, resolve_model_revision(model_id), fingerprints.get('evaluation'),
+                     *self._metric_row(results, performance))
+                )
+                extras = {key: results.get(key) for key in EXTRA_KEYS}
+                extras['performance'] = performance
+                conn.execute(
+                    'INSERT OR REPLACE INTO details VALUES (?, ?, ?, ?)',
+                    (run_id, model_id, _pack(results['final_results']), _pack(extras))
+                )
+                raw_results = SimilarityResults.from_dict(results['raw_results'])
+                texts_hash, texts_data = self._texts_blob(raw_results.texts)
+                conn.execute('INSERT OR IGNORE INTO texts VALUES (?, ?)', (texts_hash, texts_data))
+                conn.execute(
+                    'INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (run_id, model_id, json.dumps(raw_results.categories), raw_results.ids.tobytes(),
+                     raw_results.predicted.tobytes(),
+                     None if raw_results.true_codes is None else raw_results.true_codes.tobytes(),
+                     raw_results.confidence.tobytes(), texts_hash)
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        self.logger.info(f"Stored run {run_id} ({len(models)} models) in {self.db_path}")
+        return run_id
+
+    def _query(self, sql, params=()):
+        conn = self._connect()
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+
+    def list_runs(self, limit=None):
+        """Newest runs first, with the models each one evaluated"""
+        return self._query(
+            'SELECT r.run_id, r.created_at, r.code_version, r.categories_hash, r.transactions_hash,'
+            ' GROUP_CONCAT(m.model_id) AS models'
+            ' FROM runs r LEFT JOIN models m ON m.run_id = r.run_id'
+            ' GROUP BY r.run_id ORDER BY r.created_at DESC LIMIT ?',
+            (-1 if limit is None else limit,)
+        )
+
+    def metrics_history(self, model_ids=None, run_ids=None, limit=None):
+        """Headline metric rows per (run, model), newest first; reads only the narrow models table"""
+        conditions, params = [], []
+        for column, values in (('m.model_id', model_ids), ('m.run_id', run_ids)):
+            if values:
+                conditions.append(f'{column} IN ({",".join("?" * len(values))})')
+                params.extend(values)
+        where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+        rows = self._query(
+            'SELECT m.*, r.created_at, r.categories_hash, r.transactions_hash'
+            ' FROM models m JOIN runs r ON r.run_id = m.run_id'
+            f'{where} ORDER BY r.created_at DESC, m.model_id LIMIT ?',
+            (*params, -1 if limit is None else limit)
+        )
+        for row in rows:
+            # Warehouses created before the column was INTEGER hold these as REAL
+            for column in INTEGER_COLUMNS:
+                if row[column] is not None:
+                    row[column] = int(row[column])
+        return rows
+
+    def latest_run_id(self):
+        rows = self._query('SELECT run_id FROM runs ORDER BY created_at DESC LIMIT 1')
+        return rows[0]['run_id'] if rows else None
+
+    @LoggerService.log_function(level='info')
+    def load_model_results(self, selections):
+        """Stored results for ``(run_id, model_id)`` pairs, shaped like the pipeline's model_results.
+
+        Returns ``{(run_id, model_id): {'model_name', 'raw_results', 'final_results',
+        'index_stats', 'strategy_stats', 'compression_stats', 'memory', 'performance'}}``.
+        """
+        loaded = {}
+        conn = self._connect()
+        try:
+            for run_id, model_id in selections:
+                row = conn.execute(
+                    'SELECT m.model_name, d.final_results, d.extras, p.categories, p.ids, p.predicted,'
+                    ' p.true_codes, p.confidence, t.data'
+                    ' FROM models m'
+                    ' JOIN details d ON d.run_id = m.run_id AND d.model_id = m.model_id'
+                    ' JOIN predictions p ON p.run_id = m.run_id AND p.model_id = m.model_id'
+                    ' JOIN texts t ON t.texts_hash = p.texts_hash'
+                    ' WHERE m.run_id = ? AND m.model_id = ?',
+                    (run_id, model_id)
+                ).fetchone()
+                if row is None:
+                    raise KeyError(f"No stored results for model '{model_id}' in run '{run_id}'")
+                model_name, final_results, extras, categories, ids, predicted, true_codes, confidence, texts = row
+                raw_results = SimilarityResults(
+                    json.loads(categories),
+                    np.frombuffer(predicted, dtype=np.int32),
+                    np.frombuffer(confidence, dtype=np.float32),
+                    json.loads(zlib.decompress(texts).decode('utf-8')),
+                    None if true_codes is None else np.frombuffer(true_codes, dtype=np.int32),
+                    np.frombuffer(ids, dtype=np.int64)
+                )
+                loaded[(run_id, model_id)] = dict(
+                    _unpack(extras), model_name=model_name, raw_results=raw_results,
+                    final_results=_unpack(final_results)
+                )
+        finally:
+            conn.close()
+        return loaded
+
+    def resolve_selections(self, selectors):
+        """Expand ``run_id`` / ``run_id:model_id`` / ``latest`` selectors into (run_id, model_id) pairs"""
+        selections = []
+        for selector in selectors:
+            run_id, _, model_id = selector.partition(':')
+            if run_id == 'latest':
+                run_id = self.latest_run_id()
+            if model_id:
+                selections.append((run_id, model_id))
+                continue
+            rows = self._query('SELECT model_id FROM models WHERE run_id = ? ORDER BY model_id', (run_id,))
+            if not rows:
+                raise KeyError(f"No stored run '{run_id}'")
+            selections.extend((run_id, row['model_id']) for row in rows)
+        return list(dict.fromkeys(selections))
@@ -0,0 +1,30 @@
+import argparse
+import asyncio
+from service.classification_service import ClassificationService
+
+async def run(args):
+    service = ClassificationService(args.model)
+    await service.start()
+    try:
+        if args.stdin:
+            await service.serve_stdin()
+        else:
+            await service.serve_http(args.host, args.port)
+    finally:
+        await service.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the category classifier over HTTP or stdin JSONL')
+    parser.add_argument('--model', help='Model to serve (defaults to models.default_model)')
+    parser.add_argument('--host', help='HTTP bind address (defaults to service.host)')
+    parser.add_argument('--port', type=int, help='HTTP port (defaults to service.port)')
+    parser.add_argument('--stdin', action='store_true', help='Read JSON requests from stdin, one per line, instead of HTTP')
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from .classification_service import ClassificationService
+
+__all__ = ['ClassificationService']
@@ -0,0 +1,268 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from logger_service.logger import LoggerService
+from configuration_manager.config_manager import ConfigManager
+from results_validator.scoring_strategies import MAX_KEYWORD_STRATEGY, build_scoring_strategy
+from results_validator.text_normalizer import collapse_texts, configured_normalizer
+from service.latency_stats import LatencyStats
+from service.micro_batcher import MicroBatcher
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+HTTP_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class ClassificationService:
+    """Keeps one model and its category embeddings warm and classifies on request.
+
+    Requests are coalesced by a MicroBatcher and scored with the same
+    strategy the evaluation uses. All model work runs on a single worker
+    thread; reloading ``categories.json`` builds a new engine on that worker
+    and swaps it in between batches, so no request is dropped.
+    """
+
+    def __init__(self, model_name=None):
+        self.logger = LoggerService()
+        self.config = ConfigManager()
+        self.service_config = self.config.service_config
+        self.model_name = model_name or self.config.default_model
+        self.categories_file = self.config.test_data_config['categories_file']
+        self.top_k = self.service_config.get('top_k', 3)
+        # Same normalization as the evaluation, so the reported metrics describe the served classifier
+        self.normalizer = configured_normalizer()
+        self.stats = LatencyStats(self.service_config.get('latency_window', 10000))
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='classifier')
+        self.batcher = MicroBatcher(
+            self.classify_batch,
+            self.executor,
+            max_batch_size=self.service_config.get('max_batch_size', 64),
+            max_wait_ms=self.service_config.get('max_wait_ms', 5),
+            stats=self.stats
+        )
+        self.model_manager = None
+        self.engine = None
+        self.categories_mtime = None
+        self._reloader = None
+
+    @LoggerService.log_function(level='info')
+    def load(self, embeddings_file=None):
+        """Load the model and build the scoring engine.
+
+        Categories come from the categories file, or from a saved embedding
+        store / JSON dump when ``embeddings_file`` is given (which disables
+        hot reload).
+        """
+        from embedding_manager.embedding_manager import EmbeddingManager
+
+        self.model_manager = EmbeddingManager(self.model_name)
+        if embeddings_file is None:
+            self._build_engine()
+            return
+        self.categories_file = None
+        self.model_manager.load_embeddings(embeddings_file)
+        self._set_engine(self.model_manager.embeddings, embeddings_file)
+
+    def _build_engine(self):
+        mtime = os.path.getmtime(self.categories_file)
+        with open(self.categories_file, 'r') as f:
+            categories = json.load(f)
+        self._set_engine(self.model_manager.create_categorical_embeddings(categories), self.categories_file)
+        self.categories_mtime = mtime
+
+    def _set_engine(self, category_vectors, source):
+        centroids = self.model_manager.compute_centroids()
+        strategy = self.config.scoring_config.get('strategy', MAX_KEYWORD_STRATEGY)
+        engine = build_scoring_strategy(
+            strategy,
+            category_vectors,
+            {category: centroids[category] for category in category_vectors if category in centroids},
+            self.config.scoring_config
+        )
+        if not hasattr(engine, 'score_block'):
+            raise ValueError(f"Scoring strategy '{strategy}' does not produce per-category scores for the service")
+        # Single reference swap: batches already running keep the engine they started with
+        self.engine = engine
+        self.logger.info(f"Serving {len(engine.categories)} categories from {source} with {self.model_name}")
+
+    def classify_batch(self, texts):
+        """Blocking: encode and score one micro-batch; runs on the classifier thread"""
+        engine = self.engine
+        # Encoded (and cached) once per unique text in the batch, normalized when enabled
+        if self.normalizer is None:
+            unique_texts, rows = collapse_texts(texts)
+        else:
+            unique_texts, rows = self.normalizer.collapse(texts)
+        scores = engine.score_block(self.model_manager.encode_texts(unique_texts))[rows]
+        k = min(self.top_k, scores.shape[1])
+        top = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+        results = []
+        for row, categories in zip(scores, top):
+            ranked = [
+                {'category': engine.categories[code], 'score': float(format(float(row[code]), '.5f'))}
+                for code in categories.tolist()
+            ]
+            results.append({
+                'category': ranked[0]['category'],
+                'confidence': ranked[0]['score'],
+                'top_k': ranked
+            })
+        return results
+
+    async def _watch_categories(self):
+        interval = self.service_config.get('reload_interval_s', 2.0)
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval)
+            if self.categories_file is None:
+                return
+            try:
+                if os.path.getmtime(self.categories_file) == self.categories_mtime:
+                    continue
+                self.logger.info(f"{self.categories_file} changed; reloading categories")
+                # Queued on the classifier thread, so it runs between batches
+                await loop.run_in_executor(self.executor, self._build_engine)
+            except Exception as e:
+                self.logger.error(f"Category reload failed, keeping the previous categories: {str(e)}")
+
+    async def classify(self, texts):
+        start = time.perf_counter()
+        try:
+            results = await self.batcher.submit(texts)
+        except Exception:
+            self.stats.record_error()
+            raise
+        self.stats.record_request(time.perf_counter() - start, len(texts))
+        return results
+
+    async def handle_payload(self, payload):
+        """Classify ``{"text": ...}`` or ``{"texts": [...]}``; echoes an optional ``id``"""
+        if not isinstance(payload, dict) or ('text' in payload) == ('texts' in payload):
+            raise ValueError("Expected a JSON object with either 'text' or 'texts'")
+        if 'text' in payload:
+            response = {'result': (await self.classify([str(payload['text'])]))[0]}
+        else:
+            texts = payload['texts']
+            if not isinstance(texts, list):
+                raise ValueError("'texts' must be a list")
+            response = {'results': await self.classify([str(text) for text in texts]) if texts else []}
+        if 'id' in payload:
+            response['id'] = payload['id']
+        return response
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.load)
+        self.batcher.start()
+        self._reloader = loop.create_task(self._watch_categories())
+
+    async def stop(self):
+        if self._reloader is not None:
+            self._reloader.cancel()
+        await self.batcher.stop()
+        self.executor.shutdown(wait=True)
+
+    async def serve_http(self, host=None, port=None):
+        """Serve POST /classify, GET /stats and GET /health until cancelled"""
+        host = host or self.service_config.get('host', '127.0.0.1')
+        port = port if port is not None else self.service_config.get('port', 8080)
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        self.logger.info(f"Classification service listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {'error': 'Request body too large'}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                status, response = await self._route(method, path.split('?', 1)[0], body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'model': self.model_name, 'categories': len(self.engine.categories)}
+        if method == 'GET' and path == '/stats':
+            return 200, self.stats.snapshot()
+        if method == 'POST' and path == '/classify':
+            try:
+                return 200, await self.handle_payload(json.loads(body or b'null'))
+            except ValueError as e:
+                return 400, {'error': str(e)}
+            except Exception as e:
+                self.logger.error(f"Classification failed: {str(e)}")
+                return 500, {'error': str(e)}
+        return 404, {'error': f"No route for {method} {path}"}
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive=True):
+        body = json.dumps(payload).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+    async def serve_stdin(self):
+        """Read one JSON request per stdin line and write one JSON response per stdout line.
+
+        Lines are handled concurrently, so a burst of input is micro-batched;
+        responses may be written out of order and echo the request ``id``.
+        A ``{"stats": true}`` line returns the latency counters.
+        """
+        loop = asyncio.get_running_loop()
+        pending = set()
+
+        async def handle(line):
+            payload = None
+            try:
+                payload = json.loads(line)
+                if isinstance(payload, dict) and payload.get('stats'):
+                    response = {'stats': self.stats.snapshot()}
+                else:
+                    response = await self.handle_payload(payload)
+            except Exception as e:
+                response = {'error': str(e)}
+                if isinstance(payload, dict) and 'id' in payload:
+                    response['id'] = payload['id']
+            sys.stdout.write(json.dumps(response) + '\n')
+            sys.stdout.flush()
+
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            if line.strip():
+                task = loop.create_task(handle(line))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
@@ -0,0 +1,43 @@
+import time
+from collections import deque
+import numpy as np
+
+
+class LatencyStats:
+    """Request latency percentiles over a sliding window, plus throughput counters"""
+
+    def __init__(self, window=10000):
+        self.latencies_ms = deque(maxlen=max(1, int(window)))
+        self.started = time.monotonic()
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.errors = 0
+
+    def record_request(self, latency_seconds, n_texts):
+        self.latencies_ms.append(latency_seconds * 1000)
+        self.requests += 1
+        self.texts += n_texts
+
+    def record_batch(self, n_texts):
+        self.batches += 1
+        self.batched_texts += n_texts
+
+    def record_error(self):
+        self.errors += 1
+
+    def snapshot(self):
+        uptime = time.monotonic() - self.started
+        latencies = np.fromiter(self.latencies_ms, dtype=np.float64)
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]).tolist() if latencies.size else (None, None, None)
+        return {
+            'uptime_seconds': uptime,
+            'requests': self.requests,
+            'texts': self.texts,
+            'errors': self.errors,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_texts / self.batches if self.batches else None,
+            'texts_per_second': self.texts / uptime if uptime > 0 else None,
+            'latency_ms': {'p50': p50, 'p95': p95, 'p99': p99, 'window': int(latencies.size)}
+        }
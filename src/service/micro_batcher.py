@@ -0,0 +1,78 @@
+import asyncio
+import time
+
+
+class MicroBatcher:
+    """Coalesces concurrent requests into batches for a blocking handler.
+
+    A batch is flushed once it holds ``max_batch_size`` texts or the oldest
+    waiting request has waited ``max_wait_ms``. ``handler(texts)`` runs on
+    ``executor`` (a single worker keeps the model single-threaded) and must
+    return one result per text.
+    """
+
+    def __init__(self, handler, executor, max_batch_size=64, max_wait_ms=5.0, stats=None):
+        self.handler = handler
+        self.executor = executor
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self.stats = stats
+        self.queue = asyncio.Queue()
+        self._worker = None
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, texts):
+        """Classify a list of texts; resolves when their batch has been scored"""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((list(texts), future))
+        return await future
+
+    async def _collect(self):
+        """Wait for a first request, then keep taking requests until the batch is full or the deadline passes"""
+        batch = [await self.queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                results = await loop.run_in_executor(self.executor, self.handler, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            if self.stats is not None:
+                self.stats.record_batch(len(texts))
+
+            offset = 0
+            for request_texts, future in batch:
+                if not future.done():
+                    future.set_result(results[offset:offset + len(request_texts)])
+                offset += len(request_texts)
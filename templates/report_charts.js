@@ -0,0 +1,301 @@
+/*
+ * Minimal offline chart renderer for the data report (output.report_mode = "data").
+ *
+ * Per-model chart data lives in data/<model>.js files, each a single
+ * ReportCharts.register(name, {...}) call with the JSON payload, so they load
+ * from file:// without a web server. A model's file is only fetched when its
+ * section is opened.
+ */
+(function () {
+    'use strict';
+
+    var PALETTE = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd', '#8c564b',
+                   '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'];
+    var MARGIN = { top: 16, right: 16, bottom: 48, left: 56 };
+    var registered = {};
+    var pending = {};
+
+    function color(i) { return PALETTE[i % PALETTE.length]; }
+
+    function setupCanvas(canvas, height) {
+        var ratio = window.devicePixelRatio || 1;
+        var width = canvas.parentNode.clientWidth || 600;
+        canvas.style.width = width + 'px';
+        canvas.style.height = height + 'px';
+        canvas.width = width * ratio;
+        canvas.height = height * ratio;
+        var ctx = canvas.getContext('2d');
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        ctx.font = '12px sans-serif';
+        return { ctx: ctx, width: width, height: height };
+    }
+
+    function frame(c, xLabel, yLabel) {
+        var plot = {
+            x: MARGIN.left, y: MARGIN.top,
+            w: c.width - MARGIN.left - MARGIN.right,
+            h: c.height - MARGIN.top - MARGIN.bottom
+        };
+        var ctx = c.ctx;
+        ctx.strokeStyle = '#333';
+        ctx.strokeRect(plot.x, plot.y, plot.w, plot.h);
+        ctx.fillStyle = '#333';
+        ctx.textAlign = 'center';
+        if (xLabel) { ctx.fillText(xLabel, plot.x + plot.w / 2, c.height - 8); }
+        if (yLabel) {
+            ctx.save();
+            ctx.translate(14, plot.y + plot.h / 2);
+            ctx.rotate(-Math.PI / 2);
+            ctx.fillText(yLabel, 0, 0);
+            ctx.restore();
+        }
+        return plot;
+    }
+
+    function yTicks(ctx, plot, max, format) {
+        ctx.textAlign = 'right';
+        ctx.fillStyle = '#333';
+        for (var i = 0; i <= 4; i++) {
+            var value = max * i / 4;
+            var y = plot.y + plot.h - plot.h * i / 4;
+            ctx.fillText(format ? format(value) : value.toFixed(2), plot.x - 4, y + 4);
+        }
+    }
+
+    function legend(container, names) {
+        var list = document.createElement('div');
+        list.className = 'small';
+        names.forEach(function (name, i) {
+            var item = document.createElement('span');
+            item.style.marginRight = '12px';
+            item.innerHTML = '<span style="display:inline-block;width:10px;height:10px;background:' +
+                color(i) + '"></span> ';
+            item.appendChild(document.createTextNode(name));
+            list.appendChild(item);
+        });
+        container.appendChild(list);
+    }
+
+    function newCanvas(container, title) {
+        var heading = document.createElement('h5');
+        heading.textContent = title;
+        container.appendChild(heading);
+        var canvas = document.createElement('canvas');
+        container.appendChild(canvas);
+        return canvas;
+    }
+
+    /* Grouped bars: labels along x, one bar per series at each label */
+    function bars(container, title, labels, series, yLabel, format) {
+        var c = setupCanvas(newCanvas(container, title), 300);
+        var plot = frame(c, null, yLabel);
+        var max = 0;
+        series.forEach(function (s) { s.values.forEach(function (v) { max = Math.max(max, v); }); });
+        max = max || 1;
+        yTicks(c.ctx, plot, max, format);
+        var groupWidth = plot.w / labels.length;
+        var barWidth = groupWidth * 0.8 / series.length;
+        labels.forEach(function (label, i) {
+            series.forEach(function (s, j) {
+                var h = plot.h * s.values[i] / max;
+                var x = plot.x + i * groupWidth + groupWidth * 0.1 + j * barWidth;
+                c.ctx.fillStyle = color(j);
+                c.ctx.fillRect(x, plot.y + plot.h - h, barWidth - 1, h);
+                if (series.length === 1 && format) {
+                    c.ctx.fillStyle = '#333';
+                    c.ctx.textAlign = 'center';
+                    c.ctx.fillText(format(s.values[i]), x + barWidth / 2, plot.y + plot.h - h - 4);
+                }
+            });
+            c.ctx.fillStyle = '#333';
+            c.ctx.textAlign = 'center';
+            c.ctx.fillText(label, plot.x + (i + 0.5) * groupWidth, plot.y + plot.h + 16);
+        });
+        if (series.length > 1) { legend(container, series.map(function (s) { return s.name; })); }
+    }
+
+    /* Line series on [0, 1] x [0, 1] axes; a series may mark one {x, y} point */
+    function lines(container, title, series, xLabel, yLabel, diagonal) {
+        var c = setupCanvas(newCanvas(container, title), 360);
+        var plot = frame(c, xLabel, yLabel);
+        yTicks(c.ctx, plot, 1);
+        var ctx = c.ctx;
+        function px(x) { return plot.x + plot.w * x; }
+        function py(y) { return plot.y + plot.h - plot.h * y; }
+        if (diagonal) {
+            ctx.setLineDash([4, 4]);
+            ctx.strokeStyle = '#999';
+            ctx.beginPath();
+            ctx.moveTo(px(0), py(0));
+            ctx.lineTo(px(1), py(1));
+            ctx.stroke();
+            ctx.setLineDash([]);
+        }
+        series.forEach(function (s, i) {
+            ctx.strokeStyle = color(i);
+            ctx.beginPath();
+            s.x.forEach(function (x, j) {
+                if (j === 0) { ctx.moveTo(px(x), py(s.y[j])); } else { ctx.lineTo(px(x), py(s.y[j])); }
+            });
+            ctx.stroke();
+            if (s.point) {
+                ctx.fillStyle = color(i);
+                ctx.beginPath();
+                ctx.arc(px(s.point.x), py(s.point.y), 4, 0, 2 * Math.PI);
+                ctx.fill();
+            }
+        });
+        legend(container, series.map(function (s) {
+            if (s.auc !== undefined) { return s.category + ' (AUC = ' + s.auc.toFixed(2) + ')'; }
+            if (s.average_precision !== undefined) { return s.category + ' (AP = ' + s.average_precision.toFixed(2) + ')'; }
+            return s.category;
+        }));
+    }
+
+    /* Histograms given bin edges and counts; several series are overlaid */
+    function histograms(container, title, series, xLabel) {
+        var c = setupCanvas(newCanvas(container, title), 300);
+        var plot = frame(c, xLabel, 'Frequency');
+        var ctx = c.ctx;
+        var lo = Infinity, hi = -Infinity, max = 0;
+        series.forEach(function (s) {
+            lo = Math.min(lo, s.edges[0]);
+            hi = Math.max(hi, s.edges[s.edges.length - 1]);
+            s.counts.forEach(function (n) { max = Math.max(max, n); });
+        });
+        if (hi <= lo) { hi = lo + 1; }
+        max = max || 1;
+        yTicks(ctx, plot, max, function (v) { return Math.round(v).toString(); });
+        ctx.globalAlpha = series.length > 1 ? 0.5 : 1;
+        series.forEach(function (s, i) {
+            ctx.fillStyle = color(i);
+            s.counts.forEach(function (n, j) {
+                var x0 = plot.x + plot.w * (s.edges[j] - lo) / (hi - lo);
+                var x1 = plot.x + plot.w * (s.edges[j + 1] - lo) / (hi - lo);
+                var h = plot.h * n / max;
+                ctx.fillRect(x0, plot.y + plot.h - h, Math.max(1, x1 - x0 - 1), h);
+            });
+        });
+        ctx.globalAlpha = 1;
+        ctx.fillStyle = '#333';
+        ctx.textAlign = 'center';
+        ctx.fillText(lo.toFixed(2), plot.x, plot.y + plot.h + 16);
+        ctx.fillText(hi.toFixed(2), plot.x + plot.w, plot.y + plot.h + 16);
+        if (series.length > 1) { legend(container, series.map(function (s) { return s.name; })); }
+    }
+
+    /* Confusion matrix; counts are written in the cells while they fit */
+    function heatmap(container, title, categories, counts) {
+        var n = categories.length;
+        var labelled = n <= 30;
+        var c = setupCanvas(newCanvas(container, title), labelled ? 480 : 360);
+        var ctx = c.ctx;
+        var left = labelled ? 140 : MARGIN.left;
+        var bottom = labelled ? 120 : MARGIN.bottom;
+        var size = Math.min(c.width - left - MARGIN.right, c.height - MARGIN.top - bottom);
+        var cell = size / Math.max(n, 1);
+        var max = 0;
+        counts.forEach(function (row) { row.forEach(function (v) { max = Math.max(max, v); }); });
+        max = max || 1;
+        ctx.textAlign = 'center';
+        for (var i = 0; i < n; i++) {
+            for (var j = 0; j < n; j++) {
+                var v = counts[i][j];
+                var shade = Math.round(255 - 200 * v / max);
+                ctx.fillStyle = 'rgb(' + shade + ',' + shade + ',255)';
+                ctx.fillRect(left + j * cell, MARGIN.top + i * cell, Math.ceil(cell), Math.ceil(cell));
+                if (labelled && v) {
+                    ctx.fillStyle = v > max / 2 ? '#fff' : '#000';
+                    ctx.fillText(v, left + (j + 0.5) * cell, MARGIN.top + (i + 0.5) * cell + 4);
+                }
+            }
+        }
+        ctx.fillStyle = '#333';
+        if (labelled) {
+            categories.forEach(function (category, k) {
+                ctx.textAlign = 'right';
+                ctx.fillText(category, left - 4, MARGIN.top + (k + 0.5) * cell + 4);
+                ctx.save();
+                ctx.translate(left + (k + 0.5) * cell, MARGIN.top + size + 6);
+                ctx.rotate(-Math.PI / 4);
+                ctx.fillText(category, 0, 0);
+                ctx.restore();
+            });
+        }
+        ctx.textAlign = 'center';
+        ctx.fillText('Predicted Label', left + size / 2, c.height - 4);
+        ctx.save();
+        ctx.translate(12, MARGIN.top + size / 2);
+        ctx.rotate(-Math.PI / 2);
+        ctx.fillText('True Label', 0, 0);
+        ctx.restore();
+    }
+
+    function percent(v) { return (v * 100).toFixed(2) + '%'; }
+
+    function renderComparison(container, data) {
+        bars(container, 'Model Accuracy Comparison', data.models,
+             [{ name: 'Accuracy', values: data.accuracy }], 'Accuracy', percent);
+        bars(container, 'Model Performance Metrics Comparison', data.models, [
+            { name: 'Precision', values: data.metrics.precision },
+            { name: 'Recall', values: data.metrics.recall },
+            { name: 'F1_score', values: data.metrics.f1_score }
+        ], 'Score');
+        lines(container, 'Coverage vs Accuracy by Confidence Threshold', data.coverage,
+              'Coverage', 'Accuracy on Covered', false);
+        histograms(container, 'Confidence Distribution Comparison', data.models.map(function (model) {
+            return { name: model, edges: data.confidence[model].edges, counts: data.confidence[model].counts };
+        }), 'Confidence Score');
+    }
+
+    function renderModel(container, name, data) {
+        heatmap(container, 'Confusion Matrix - ' + name, data.confusion.categories, data.confusion.counts);
+        lines(container, 'ROC Curves - ' + name, data.roc, 'False Positive Rate', 'True Positive Rate', true);
+        lines(container, 'Precision-Recall Curves - ' + name, data.precision_recall, 'Recall', 'Precision', false);
+        histograms(container, 'Confidence Distribution - ' + name,
+                   [{ name: name, edges: data.confidence.edges, counts: data.confidence.counts }], 'Confidence Score');
+    }
+
+    function load(name, src) {
+        if (registered[name]) { return Promise.resolve(registered[name]); }
+        if (!pending[name]) {
+            pending[name] = new Promise(function (resolve, reject) {
+                var script = document.createElement('script');
+                script.src = src;
+                script.onload = function () {
+                    if (registered[name]) { resolve(registered[name]); } else { reject(new Error('No data in ' + src)); }
+                };
+                script.onerror = function () { reject(new Error('Could not load ' + src)); };
+                document.head.appendChild(script);
+            });
+        }
+        return pending[name];
+    }
+
+    function lazyModelSections() {
+        var sections = document.querySelectorAll('details[data-chart-src]');
+        Array.prototype.forEach.call(sections, function (section) {
+            section.addEventListener('toggle', function () {
+                if (!section.open || section.dataset.rendered) { return; }
+                section.dataset.rendered = '1';
+                var target = section.querySelector('.charts');
+                load(section.dataset.model, section.dataset.chartSrc).then(function (data) {
+                    renderModel(target, section.dataset.model, data);
+                }, function (error) {
+                    target.textContent = error.message;
+                });
+            });
+        });
+    }
+
+    window.ReportCharts = {
+        register: function (name, data) { registered[name] = data; },
+        load: load,
+        renderComparison: renderComparison,
+        renderModel: renderModel,
+        init: function (comparisonData) {
+            renderComparison(document.getElementById('comparison-charts'), comparisonData);
+            lazyModelSections();
+        }
+    };
+})();
@@ -0,0 +1,47 @@
+import json
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from benchmarks import HashingEncoder, generate_categories, generate_transactions, write_dataset
+from benchmarks.benchmark_runner import MEMORY_METRIC, TIME_METRIC, compare_with_baseline
+
+
+def test_hashing_encoder_is_deterministic_and_unit_length():
+    texts = ['swiggy order 123', 'SWIGGY order', '', 'uber trip']
+    vectors = HashingEncoder(dim=64).encode(texts)
+    np.testing.assert_array_equal(vectors, HashingEncoder(dim=64).encode(texts))
+    np.testing.assert_allclose(np.linalg.norm(vectors[[0, 1, 3]], axis=1), 1.0, rtol=1e-6)
+    assert not vectors[2].any()
+    # Shared words make texts closer than unrelated ones
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[3]
+    assert HashingEncoder(dim=64).encode('uber trip').shape == (64,)
+
+
+def test_synthetic_dataset_is_reproducible(tmp_path):
+    categories = generate_categories(5, keywords_per_category=4, seed=3)
+    assert categories == generate_categories(5, keywords_per_category=4, seed=3)
+    assert all(len(keywords) == 4 for keywords in categories.values())
+
+    pairs = list(generate_transactions(categories, 50, seed=3))
+    assert len({text for text, _ in pairs}) == 50
+    assert {label for _, label in pairs} <= set(categories)
+
+    _, transactions_file = write_dataset(str(tmp_path), 5, 50, keywords_per_category=4, seed=3)
+    with open(transactions_file) as f:
+        assert list(json.load(f).items()) == pairs
+
+
+def test_regressions_ignore_noise_below_the_floor():
+    def run(seconds, rss):
+        return {'scales': {'tiny': {'stages': {'score': {TIME_METRIC: seconds, MEMORY_METRIC: rss}}}}}
+
+    baseline = run(1.0, 100.0)
+    assert not compare_with_baseline(run(1.1, 110.0), baseline)[0]['regression']
+    assert compare_with_baseline(run(1.5, 100.0), baseline)[0]['regression']
+    assert compare_with_baseline(run(1.0, 150.0), baseline)[0]['regression']
+    # A 50% slowdown of a 10ms stage is timer noise
+    assert not compare_with_baseline(run(0.015, 100.0), run(0.01, 100.0))[0]['regression']
@@ -0,0 +1,46 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.metrics import average_precision_score, roc_auc_score, roc_curve
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from results_validator.curve_metrics import one_vs_rest_curves, summarize_curves
+
+
+@pytest.mark.parametrize('block_elements', [1 << 22, 500])
+def test_matches_sklearn(block_elements):
+    rng = np.random.default_rng(0)
+    n_rows, categories = 300, ['a', 'b', 'c', 'd', 'e']
+    # Codes 5 and above are true labels outside the scored categories; 'e' never occurs
+    true_codes = rng.choice([0, 1, 2, 3, 5], size=n_rows)
+    # Two decimals, so many scores tie
+    scores = np.round(rng.uniform(size=(n_rows, len(categories))), 2).astype(np.float32)
+    scores[np.arange(n_rows), np.minimum(true_codes, 4)] += 0.3
+
+    curves = one_vs_rest_curves(scores, true_codes, categories, max_points=None, block_elements=block_elements)
+    assert list(curves) == ['a', 'b', 'c', 'd']
+    for code, category in enumerate(curves):
+        positives = true_codes == code
+        assert curves[category]['auc'] == pytest.approx(roc_auc_score(positives, scores[:, code]), abs=1e-4)
+        assert curves[category]['average_precision'] == pytest.approx(
+            average_precision_score(positives, scores[:, code]), abs=1e-4
+        )
+        fpr, tpr, _ = roc_curve(positives, scores[:, code], drop_intermediate=False)
+        np.testing.assert_allclose(curves[category]['roc']['fpr'], fpr, atol=1e-9)
+        np.testing.assert_allclose(curves[category]['roc']['tpr'], tpr, atol=1e-9)
+
+
+def test_downsampling_keeps_the_ends_and_macro_average():
+    rng = np.random.default_rng(1)
+    scores = rng.uniform(size=(1000, 2)).astype(np.float32)
+    true_codes = rng.integers(0, 2, size=1000)
+    curves = one_vs_rest_curves(scores, true_codes, ['a', 'b'], max_points=50)
+    roc = curves['a']['roc']
+    assert len(roc['fpr']) <= 50 and roc['fpr'][0] == 0.0 and roc['fpr'][-1] == 1.0
+
+    summary = summarize_curves(curves)
+    assert summary['macro_auc'] == pytest.approx(np.mean([curves['a']['auc'], curves['b']['auc']]), abs=1e-4)
+    assert summarize_curves({})['macro_auc'] is None
@@ -0,0 +1,52 @@
+import os
+import sqlite3
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from embedding_manager.embedding_cache import EmbeddingCache, text_hash
+
+
+def _stored_bytes(cache):
+    conn = sqlite3.connect(cache.db_path)
+    try:
+        total = conn.execute('SELECT COALESCE(SUM(nbytes), 0) FROM embeddings').fetchone()[0]
+        running = conn.execute("SELECT value FROM cache_meta WHERE key = 'total_bytes'").fetchone()[0]
+    finally:
+        conn.close()
+    assert running == total
+    return total
+
+
+def test_round_trip_by_exact_text(tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    vectors = np.arange(6, dtype=np.float32).reshape(2, 3)
+    cache.put_many('model', 'rev', [text_hash('Swiggy'), text_hash('swiggy')], vectors)
+
+    found = cache.get_many('model', 'rev', [text_hash('swiggy'), text_hash('Swiggy '), text_hash('swiggy')])
+    assert list(found) == [text_hash('swiggy')]
+    np.testing.assert_array_equal(found[text_hash('swiggy')], vectors[1])
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.get_many('model', 'other-rev', [text_hash('swiggy')]) == {}
+
+
+def test_running_total_and_lru_eviction(tmp_path):
+    vector_bytes = 256 * 4
+    cache = EmbeddingCache(str(tmp_path), max_size_mb=3 * vector_bytes / (1024 * 1024))
+    vectors = np.ones((3, 256), dtype=np.float32)
+    cache.put_many('model', 'rev', ['a', 'b', 'c'], vectors)
+    assert _stored_bytes(cache) == 3 * vector_bytes
+
+    # Replacing an entry must not count it twice
+    cache.put_many('model', 'rev', ['a'], vectors[:1])
+    assert _stored_bytes(cache) == 3 * vector_bytes
+
+    cache.get_many('model', 'rev', ['b'])
+    cache.put_many('model', 'rev', ['d'], vectors[:1])
+    assert _stored_bytes(cache) == 3 * vector_bytes
+    assert set(cache.get_many('model', 'rev', ['a', 'b', 'c', 'd'])) == {'a', 'b', 'd'}
+
+    # Reopening keeps the running total
+    assert _stored_bytes(EmbeddingCache(str(tmp_path))) == 3 * vector_bytes
@@ -0,0 +1,60 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from embedding_manager.embedding_store import EmbeddingStore
+
+
+CATEGORY_KEYWORDS = {
+    'Food': ['swiggy', 'zomato', 'amazon'],
+    'Shopping': ['amazon', 'flipkart'],
+}
+
+
+def _category_embeddings(dim=8):
+    rng = np.random.default_rng(0)
+    return {category: rng.normal(size=(len(keywords), dim)).astype(np.float32)
+            for category, keywords in CATEGORY_KEYWORDS.items()}
+
+
+@pytest.mark.parametrize('dtype, atol', [(np.float32, 0), (np.float16, 1e-2), (np.int8, 5e-2)])
+def test_round_trip(tmp_path, dtype, atol):
+    embeddings = _category_embeddings()
+    path = EmbeddingStore.save(str(tmp_path / 'store' / 'model.npy'), embeddings, CATEGORY_KEYWORDS, dtype=dtype)
+    store = EmbeddingStore.load(path)
+
+    loaded = store.category_embeddings()
+    assert list(loaded) == list(embeddings)
+    for category, vectors in embeddings.items():
+        np.testing.assert_allclose(np.asarray(loaded[category], dtype=np.float32), vectors, atol=atol)
+    assert store.category_keywords() == CATEGORY_KEYWORDS
+
+
+def test_keyword_in_two_categories_keeps_both_rows(tmp_path):
+    embeddings = _category_embeddings()
+    store = EmbeddingStore.load(EmbeddingStore.save(str(tmp_path / 'model.npy'), embeddings, CATEGORY_KEYWORDS))
+
+    assert store.keywords['amazon'] == [2, 3]
+    np.testing.assert_array_equal(store.vector_for_keyword('amazon', 'Shopping'), embeddings['Shopping'][0])
+    np.testing.assert_array_equal(store.vector_for_keyword('amazon', 'Food'), embeddings['Food'][2])
+    assert store.vector_for_keyword('flipkart', 'Food') is None
+
+
+def test_reads_version_1_index(tmp_path):
+    path = EmbeddingStore.save(str(tmp_path / 'model.npy'), _category_embeddings(), CATEGORY_KEYWORDS)
+    index_path = str(tmp_path / 'model.index.json')
+    with open(index_path) as f:
+        index = json.load(f)
+    index['version'] = 1
+    index['keywords'] = {keyword: rows[0] for keyword, rows in index['keywords'].items()}
+    with open(index_path, 'w') as f:
+        json.dump(index, f)
+
+    store = EmbeddingStore.load(path)
+    assert store.keywords['amazon'] == [2]
+    assert store.category_keywords()['Food'] == ['swiggy', 'zomato', 'amazon']
@@ -0,0 +1,73 @@
+import copy
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from configuration_manager.config_manager import ConfigManager
+from pipeline.artifacts import save_model_artifact
+from pipeline.incremental import evaluation_fingerprint, plot_fingerprint, reusable_artifact
+
+MODEL = 'org/model'
+
+
+@pytest.fixture
+def config(tmp_path):
+    """The shared config pointed at files under tmp_path, restored afterwards"""
+    config = ConfigManager()
+    original = copy.deepcopy(config.config_data)
+    categories = tmp_path / 'categories.json'
+    categories.write_text('{"Food": ["swiggy"], "Travel": ["uber"]}')
+    transactions = tmp_path / 'transactions.json'
+    transactions.write_text('{"swiggy order": "Food"}')
+    config.config_data['test_data'].update(categories_file=str(categories), transactions_file=str(transactions))
+    config.config_data['output']['artifacts_dir'] = str(tmp_path / 'artifacts')
+    yield config
+    config.config_data = original
+
+
+def test_fingerprint_tracks_result_inputs_only(config, tmp_path):
+    baseline = evaluation_fingerprint(MODEL)
+    assert evaluation_fingerprint(MODEL) == baseline
+    assert evaluation_fingerprint('org/other') != baseline
+
+    # Throughput and file-name settings never change results
+    config.config_data['test_data']['chunk_size'] = 7
+    config.config_data['embedding_settings']['cache'] = {'enabled': False}
+    assert evaluation_fingerprint(MODEL) == baseline
+
+    config.config_data['scoring']['strategy'] = 'centroid'
+    changed_scoring = evaluation_fingerprint(MODEL)
+    assert changed_scoring != baseline
+
+    config.config_data['test_data']['normalization'] = {'enabled': True}
+    assert evaluation_fingerprint(MODEL) != changed_scoring
+
+    transactions = tmp_path / 'transactions.json'
+    before = evaluation_fingerprint(MODEL)
+    transactions.write_text('{"swiggy order": "Food", "uber trip": "Travel"}')
+    assert evaluation_fingerprint(MODEL) != before
+
+
+def test_stale_artifacts_are_not_reused(config, tmp_path):
+    evaluation_fp = evaluation_fingerprint(MODEL)
+    plot_fp = plot_fingerprint(evaluation_fp)
+    save_model_artifact(MODEL, {'final_results': {}, 'spans': [1], 'fingerprints': {'evaluation': evaluation_fp}})
+
+    artifact = reusable_artifact(MODEL, evaluation_fp, plot_fp)
+    assert artifact is not None and 'spans' not in artifact and 'plots' not in artifact
+    assert reusable_artifact(MODEL, 'another evaluation', plot_fp) is None
+    assert reusable_artifact('org/unknown', evaluation_fp, plot_fp) is None
+
+    # Plots are kept only while their fingerprint matches and the images exist
+    image = tmp_path / 'plot.png'
+    image.write_bytes(b'png')
+    config.config_data['output']['output_file'] = str(tmp_path / 'index.html')
+    plot_fp = plot_fingerprint(evaluation_fp)
+    save_model_artifact(MODEL, {'plots': {'confusion': 'plot.png'},
+                                'fingerprints': {'evaluation': evaluation_fp, 'plots': plot_fp}})
+    assert reusable_artifact(MODEL, evaluation_fp, plot_fp)['plots'] == {'confusion': 'plot.png'}
+    image.unlink()
+    assert 'plots' not in reusable_artifact(MODEL, evaluation_fp, plot_fp)
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from results_validator.keyword_index import ExactKeywordIndex, IVFKeywordIndex, measure_recall
+
+
+def _category_embeddings(n_categories=8, per_category=30, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_categories, dim))
+    return {
+        f"cat{c}": centers[c] + 0.1 * rng.normal(size=(per_category, dim))
+        for c in range(n_categories)
+    }
+
+
+class _NoHitIndex(ExactKeywordIndex):
+    """Exact index that finds nothing for odd-numbered queries"""
+
+    def _search(self, queries, k):
+        scores, rows = super()._search(queries, k)
+        scores[1::2], rows[1::2] = -np.inf, -1
+        return scores, rows
+
+
+def test_ivf_recall_matches_exact_when_probing_every_list():
+    embeddings = _category_embeddings()
+    queries = np.concatenate(list(embeddings.values()))[::7] + 0.05
+    exact = ExactKeywordIndex().add_category_embeddings(embeddings)
+    ivf = IVFKeywordIndex(n_lists=4, nprobe=4).add_category_embeddings(embeddings)
+
+    stats = measure_recall(ivf, exact, queries, 5)
+    assert stats['recall_at_k'] == 1.0
+    assert stats['top1_category_agreement'] == 1.0
+    assert stats['no_match_queries'] == 0
+    np.testing.assert_array_equal(ivf.best_matches(queries)[0], exact.best_matches(queries)[0])
+
+
+def test_queries_without_a_hit_are_masked():
+    embeddings = _category_embeddings(n_categories=3, per_category=4)
+    queries = np.stack([embeddings['cat2'][0], embeddings['cat2'][1]])
+    exact = ExactKeywordIndex().add_category_embeddings(embeddings)
+    index = _NoHitIndex().add_category_embeddings(embeddings)
+
+    best_idx, best_scores = index.best_matches(queries)
+    assert best_idx.tolist() == [2, 0]
+    assert best_scores[1] == -np.inf
+
+    stats = measure_recall(index, exact, queries, 1)
+    assert stats['no_match_queries'] == 1
+    assert stats['top1_category_agreement'] == 0.5
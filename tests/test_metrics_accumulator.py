@@ -0,0 +1,58 @@
+import os
+import sys
+
+import numpy as np
+from sklearn.metrics import accuracy_score, confusion_matrix, precision_recall_fscore_support
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from results_validator.metrics_accumulator import MetricsAccumulator
+
+CATEGORIES = ['Bills', 'Food', 'Shopping', 'Travel', 'Unused']
+
+
+def _predictions(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    y_true = rng.choice(CATEGORIES[:4], size=n).tolist()
+    y_pred = [label if rng.random() < 0.6 else str(rng.choice(CATEGORIES[:4])) for label in y_true]
+    confidences = np.round(rng.uniform(-0.2, 1.0, size=n), 5)
+    return y_true, y_pred, confidences
+
+
+def _accumulate(y_true, y_pred, confidences, categories=None):
+    accumulator = MetricsAccumulator(categories)
+    accumulator.update(accumulator.encode(y_true), accumulator.encode(y_pred), confidences)
+    return accumulator
+
+
+def test_matches_sklearn():
+    y_true, y_pred, confidences = _predictions()
+    final_results = _accumulate(y_true, y_pred, confidences, CATEGORIES).evaluate()
+
+    precision, recall, f1, _ = precision_recall_fscore_support(y_true, y_pred, average='weighted', zero_division=0)
+    assert final_results['basic_metrics']['accuracy'] == round(accuracy_score(y_true, y_pred), 4)
+    assert final_results['detailed_metrics'] == {
+        'precision': round(precision, 4), 'recall': round(recall, 4), 'f1_score': round(f1, 4)
+    }
+    labels = sorted(set(y_true) | set(y_pred))
+    assert final_results['confusion_matrix_data'] == {
+        'confusion_matrix': confusion_matrix(y_true, y_pred, labels=labels).tolist(), 'categories': labels
+    }
+    assert final_results['confidence_stats'] == {
+        'mean_confidence': round(float(np.mean(confidences)), 4),
+        'median_confidence': round(float(np.median(confidences)), 4),
+        'min_confidence': round(float(np.min(confidences)), 4),
+        'max_confidence': round(float(np.max(confidences)), 4),
+    }
+
+
+def test_merged_shards_equal_a_single_pass():
+    y_true, y_pred, confidences = _predictions(n=301, seed=1)
+    whole = _accumulate(y_true, y_pred, confidences).evaluate()
+
+    # Shards see their categories in different orders, and one sees only a few
+    shards = [slice(0, 7), slice(7, 150), slice(150, 301)]
+    merged = MetricsAccumulator()
+    for shard in reversed(shards):
+        merged.merge(_accumulate(y_true[shard], y_pred[shard], confidences[shard]))
+    assert merged.evaluate() == whole
@@ -0,0 +1,66 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from model_validator.model_validator import ModelValidator
+
+
+class FakeHubApi:
+    """Stand-in for HfApi: knows ``existing``, hangs on ``slow``, counts lookups"""
+
+    def __init__(self, existing=(), slow=(), delay=2.0):
+        self.existing = set(existing)
+        self.slow = set(slow)
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def model_info(self, repo_id, timeout=None):
+        with self._lock:
+            self.calls.append(repo_id)
+        if repo_id in self.slow:
+            time.sleep(self.delay)
+        if repo_id not in self.existing:
+            raise type('RepositoryNotFoundError', (Exception,), {})(repo_id)
+        return {'id': repo_id}
+
+
+def _validator(tmp_path, api, offline=False, timeout=10):
+    validator = ModelValidator(api=api, offline=offline)
+    validator.cache_file = str(tmp_path / 'validation.json')
+    validator.cache_ttl = 3600
+    validator.timeout = timeout
+    return validator
+
+
+def test_cache_hit_skips_the_hub(tmp_path):
+    api = FakeHubApi(existing={'org/good'})
+    models = ['org/good', 'org/missing']
+    assert _validator(tmp_path, api).validate_models(models) == ['org/good']
+    assert sorted(api.calls) == models
+
+    again = FakeHubApi()
+    assert _validator(tmp_path, again).validate_models(models) == ['org/good']
+    assert again.calls == []
+
+
+def test_offline_accepts_only_local_models(tmp_path):
+    local_model = tmp_path / 'org' / 'local-model'
+    local_model.mkdir(parents=True)
+    api = FakeHubApi(existing={'org/good'})
+    validator = _validator(tmp_path, api, offline=True)
+    assert validator.validate_models([str(local_model), 'org/good']) == [str(local_model)]
+    assert api.calls == []
+
+
+def test_hung_lookup_times_out_without_blocking_others(tmp_path):
+    api = FakeHubApi(existing={'org/good', 'org/hung'}, slow={'org/hung'})
+    validator = _validator(tmp_path, api, timeout=0.2)
+    start = time.monotonic()
+    assert validator.validate_models(['org/hung', 'org/good']) == ['org/good']
+    assert time.monotonic() - start < 3
+    # A timeout is not definitive, so it is not cached
+    assert 'org/hung' not in validator._load_cache()
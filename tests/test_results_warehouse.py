@@ -0,0 +1,56 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from results_validator.similarity_results import SimilarityResults
+from results_warehouse.results_warehouse import ResultsWarehouse
+
+
+def _results(evaluation_fp):
+    raw_results = SimilarityResults(
+        ['Food', 'Travel'], [0, 1, 1], [0.9, 0.8, 0.4], ['swiggy', 'uber', 'ola'], [0, 1, 0]
+    )
+    return {
+        'raw_results': raw_results,
+        'final_results': {
+            'basic_metrics': {'accuracy': 0.6667},
+            'detailed_metrics': {'precision': 0.75, 'recall': 0.6667, 'f1_score': 0.6667},
+            'confusion_matrix_data': {'confusion_matrix': [[1, 1], [0, 1]], 'categories': ['Food', 'Travel']},
+            'confidence_stats': {'mean_confidence': 0.7},
+        },
+        'memory': {'peak_rss_mb': 512.0},
+        'fingerprints': {'evaluation': evaluation_fp},
+    }
+
+
+def test_round_trip(tmp_path):
+    warehouse = ResultsWarehouse(str(tmp_path / 'results.sqlite'))
+    warehouse.record_run('run-1', {'org/model': ('model', _results('fp-a'), {'total_seconds': 1.5})})
+
+    [row] = warehouse.metrics_history()
+    assert row['n_transactions'] == 3 and isinstance(row['n_transactions'], int)
+    assert row['accuracy'] == 0.6667 and row['total_seconds'] == 1.5
+
+    loaded = warehouse.load_model_results([('run-1', 'org/model')])[('run-1', 'org/model')]
+    assert loaded['model_name'] == 'model'
+    assert loaded['final_results']['confusion_matrix_data']['confusion_matrix'] == [[1, 1], [0, 1]]
+    assert loaded['raw_results'].texts == ['swiggy', 'uber', 'ola']
+    np.testing.assert_array_equal(loaded['raw_results'].predicted, [0, 1, 1])
+    np.testing.assert_allclose(loaded['raw_results'].confidence, [0.9, 0.8, 0.4], rtol=1e-6)
+    assert loaded['memory'] == {'peak_rss_mb': 512.0}
+
+
+def test_same_fingerprints_are_recorded_once(tmp_path):
+    warehouse = ResultsWarehouse(str(tmp_path / 'results.sqlite'))
+    models = {'org/a': ('a', _results('fp-a'), None), 'org/b': ('b', _results('fp-b'), None)}
+    assert warehouse.record_run('run-1', models) == 'run-1'
+    assert warehouse.record_run('run-2', models) == 'run-1'
+    assert [run['run_id'] for run in warehouse.list_runs()] == ['run-1']
+
+    # A subset or a changed fingerprint is a different run
+    assert warehouse.record_run('run-3', {'org/a': models['org/a']}) == 'run-3'
+    assert warehouse.record_run('run-4', dict(models, **{'org/b': ('b', _results('fp-c'), None)})) == 'run-4'
+    assert len(warehouse.list_runs()) == 3
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from results_validator.similarity_engine import SimilarityEngine
+
+
+def _baseline_best_matches(query_matrix, category_embeddings):
+    """The original per-keyword cosine_similarity loop: max over keywords, then max over categories"""
+    best_idx, best_scores = [], []
+    for query in query_matrix:
+        category_scores = [
+            max(cosine_similarity([query], [keyword])[0][0] for keyword in embeddings)
+            for embeddings in category_embeddings.values()
+        ]
+        best_idx.append(int(np.argmax(category_scores)))
+        best_scores.append(max(category_scores))
+    return np.array(best_idx), np.array(best_scores)
+
+
+def test_matches_baseline_argmax():
+    rng = np.random.default_rng(0)
+    category_embeddings = {f"cat{c}": rng.normal(size=(int(rng.integers(1, 6)), 24)) for c in range(7)}
+    query_matrix = rng.normal(size=(50, 24))
+
+    # A small block size so queries span several blocks
+    best_idx, best_scores = SimilarityEngine(category_embeddings, block_size=8).best_matches(query_matrix)
+    expected_idx, expected_scores = _baseline_best_matches(query_matrix, category_embeddings)
+    np.testing.assert_array_equal(best_idx, expected_idx)
+    np.testing.assert_allclose(best_scores, expected_scores, atol=1e-5)
+
+
+def test_score_block_is_the_per_category_max():
+    rng = np.random.default_rng(1)
+    category_embeddings = {'a': rng.normal(size=(3, 8)), 'b': rng.normal(size=(1, 8)), 'c': rng.normal(size=(4, 8))}
+    queries = rng.normal(size=(5, 8))
+    scores = SimilarityEngine(category_embeddings).score_block(queries)
+    expected = np.stack([
+        cosine_similarity(queries, vectors).max(axis=1) for vectors in category_embeddings.values()
+    ], axis=1)
+    np.testing.assert_allclose(scores, expected, atol=1e-5)
+
+
+def test_empty_category_is_skipped():
+    engine = SimilarityEngine({'a': np.eye(3)[:1], 'empty': [], 'b': np.eye(3)[1:2]})
+    assert engine.categories == ['a', 'b']
+    best_idx, _ = engine.best_matches(np.array([[0.0, 1.0, 0.0]]))
+    assert engine.categories[best_idx[0]] == 'b'
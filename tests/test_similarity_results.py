@@ -0,0 +1,50 @@
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from results_validator.similarity_results import IndexedView, SimilarityResults
+
+
+LEGACY_RESULTS = {
+    '0': {'category': 'Food', 'confidence': 0.91234, 'actual_text': 'swiggy'},
+    '1': {'category': 'Travel', 'confidence': 0.5, 'actual_text': 'uber'},
+    '2': {'category': 'Food', 'confidence': 0.33333, 'actual_text': 'ola'},
+}
+TRUE_LABELS = {'0': 'Food', '1': 'Travel', '2': 'Travel'}
+
+
+def test_from_dict_keeps_the_dict_view():
+    results = SimilarityResults.from_dict(LEGACY_RESULTS, TRUE_LABELS)
+    assert dict(results) == LEGACY_RESULTS
+    assert results.predicted_labels().tolist() == ['Food', 'Travel', 'Food']
+    assert results.true_labels().tolist() == ['Food', 'Travel', 'Travel']
+    assert results.predicted.dtype == np.int32 and results.confidence.dtype == np.float32
+
+
+def test_encode_labels_appends_unseen_labels():
+    categories = ['Food', 'Travel']
+    codes = SimilarityResults.encode_labels(['Travel', 'Bills', 'Food', 'Bills'], categories)
+    assert codes.tolist() == [1, 2, 0, 2]
+    assert categories == ['Food', 'Travel', 'Bills']
+
+
+def test_pickle_drops_the_score_matrix():
+    results = SimilarityResults(['Food', 'Travel'], [0, 1], [0.9, 0.8], ['swiggy', 'uber'],
+                                scores=np.ones((2, 2), dtype=np.float32))
+    restored = pickle.loads(pickle.dumps(results))
+    assert restored.scores is None
+    assert dict(restored) == dict(results)
+
+
+def test_indexed_view_fans_out_rows():
+    view = IndexedView(['swiggy', 'uber'], np.array([0, 1, 0]))
+    assert list(view.items()) == [('0', 'swiggy'), ('1', 'uber'), ('2', 'swiggy')]
+    assert view[-1] == 'swiggy' and view[1:] == ['uber', 'swiggy']
+    assert '3' not in view and '01' not in view and 1.0 not in view
+    with pytest.raises(TypeError):
+        view[1.0]
@@ -0,0 +1,32 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from results_validator.text_normalizer import TextNormalizer, strip_reference_suffix
+
+
+def test_strips_trailing_reference():
+    assert TextNormalizer().normalize('SWIGGY*ORDER 12345') == 'swiggy order'
+    assert TextNormalizer().normalize('Karachi Bakery #00981') == 'karachi bakery'
+    assert strip_reference_suffix('bus 42') == 'bus 42'
+    assert strip_reference_suffix('2024') == '2024'
+
+
+def test_amounts_and_dates_survive():
+    assert TextNormalizer().normalize('Rs. 500.00') == 'rs 500 00'
+    assert TextNormalizer().normalize('paid 12/03/2024') == 'paid 12 03 2024'
+    assert strip_reference_suffix('UPI/771234 09') == 'UPI/771234 09'
+    normalizer = TextNormalizer()
+    unique, _ = normalizer.collapse(['Rs. 500.00', 'Rs. 750.00'])
+    assert len(unique) == 2
+
+
+def test_long_digit_run_is_linear():
+    text = 'a ' + '1' * 200000 + 'x'
+    start = time.perf_counter()
+    assert strip_reference_suffix(text) == text
+    assert strip_reference_suffix('a' + ' 1' * 100000 + 'x').endswith('x')
+    assert TextNormalizer().normalize(text)
+    assert time.perf_counter() - start < 1.0
@@ -0,0 +1,53 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.metrics import f1_score
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from results_validator.threshold_sweep import recommend_threshold, summarize_sweep, sweep_thresholds
+
+UNASSIGNED = -1
+
+
+def _brute_force(true_codes, pred_codes, confidences, threshold, fallback_code):
+    covered = confidences >= threshold
+    routed = np.where(covered, pred_codes, UNASSIGNED if fallback_code is None else fallback_code)
+    labels = np.unique(true_codes)
+    return {
+        'coverage': covered.mean(),
+        'accuracy': (pred_codes[covered] == true_codes[covered]).mean(),
+        'macro_f1': f1_score(true_codes, routed, labels=labels, average='macro', zero_division=0),
+        'weighted_f1': f1_score(true_codes, routed, labels=labels, average='weighted', zero_division=0),
+    }
+
+
+@pytest.mark.parametrize('fallback_code', [None, 3])
+def test_matches_sklearn_at_every_threshold(fallback_code):
+    rng = np.random.default_rng(0)
+    n_rows = 250
+    true_codes = rng.integers(0, 4, size=n_rows)
+    pred_codes = np.where(rng.random(n_rows) < 0.7, true_codes, rng.integers(0, 5, size=n_rows))
+    confidences = np.round(rng.uniform(0.2, 0.9, size=n_rows), 2)
+
+    sweep = sweep_thresholds(true_codes, pred_codes, confidences, 5, fallback_code)
+    np.testing.assert_array_equal(sweep['threshold'], np.unique(confidences)[::-1])
+    for index, threshold in enumerate(sweep['threshold']):
+        expected = _brute_force(true_codes, pred_codes, confidences, threshold, fallback_code)
+        for column, value in expected.items():
+            assert sweep[column][index] == pytest.approx(value, abs=1e-9), (threshold, column)
+
+
+def test_recommended_threshold_covers_the_most_rows_at_target():
+    true_codes = np.array([0, 1, 0, 1, 0])
+    pred_codes = np.array([0, 1, 1, 1, 1])
+    confidences = np.array([0.9, 0.8, 0.7, 0.6, 0.5])
+    sweep = sweep_thresholds(true_codes, pred_codes, confidences, 2)
+
+    assert recommend_threshold(sweep, 0.75)['threshold'] == 0.6
+    assert recommend_threshold(sweep, 1.01) is None
+    summary = summarize_sweep(sweep, 0.75, max_points=3)
+    assert summary['full_coverage']['coverage'] == 1.0
+    assert summary['curve']['threshold'] == [0.9, 0.7, 0.5]
@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from results_validator.transaction_reader import TransactionReader
+
+
+def _flatten(chunks):
+    return [pair for chunk in chunks for pair in chunk]
+
+
+def test_json_streaming_matches_json_load_for_duplicate_keys(tmp_path):
+    path = tmp_path / 'transactions.json'
+    # A key repeated with a different label, and escapes split across tiny read blocks
+    path.write_text('{"uber ride": "Travel", "swiggy \\"order\\"": "Food", "uber ride": "Food", "caf\\u00e9": "Food"}')
+    expected = list(json.loads(path.read_text()).items())
+
+    reader = TransactionReader(str(path), chunk_size=2, block_size=3)
+    assert reader.read_all() == expected
+    chunks = list(reader.iter_chunks())
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert _flatten(chunks) == expected == [('uber ride', 'Food'), ('swiggy "order"', 'Food'), ('café', 'Food')]
+
+
+def test_jsonl_and_csv_read_the_same_pairs(tmp_path):
+    pairs = [('uber ride', 'Travel'), ('swiggy, order', 'Food'), ('netflix', 'Entertainment')]
+    jsonl = tmp_path / 'transactions.jsonl'
+    jsonl.write_text('\n'.join(json.dumps({'text': text, 'label': label}) for text, label in pairs) + '\n\n')
+    csv_path = tmp_path / 'transactions.csv'
+    csv_path.write_text('text,label\n' + ''.join(f'"{text}",{label}\n' for text, label in pairs))
+
+    for path in (jsonl, csv_path):
+        reader = TransactionReader(str(path), chunk_size=2)
+        assert reader.read_all() == pairs
+        assert _flatten(reader.iter_chunks()) == pairs
+
+
+def test_malformed_input_is_rejected(tmp_path):
+    path = tmp_path / 'transactions.json'
+    path.write_text('{"uber ride": "Travel" "netflix": "Entertainment"}')
+    with pytest.raises(ValueError):
+        list(TransactionReader(str(path)).iter_chunks())
+    with pytest.raises(ValueError):
+        TransactionReader(str(tmp_path / 'transactions.txt'))